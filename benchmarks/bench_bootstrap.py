@@ -0,0 +1,53 @@
+"""
+Benchmark: bootstrap confidence for the evaluator's validators.
+
+Usage:
+    python benchmarks/bench_bootstrap.py                         # 1M rows, 10k resamples
+    python benchmarks/bench_bootstrap.py --workers 4 --resamples 50000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_summary import make_frame
+from src.agents.evaluator_agent import EvaluatorAgent
+from src.utils.metric_cache import MetricCache
+
+HYPOTHESES = [
+    "ROAS declined over the last week",
+    "CTR is below the 2% benchmark",
+    "Instagram platform performs better than Facebook",
+    "Higher spend is reducing returns"
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--resamples", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=0, help="process pool size (0 = in-process)")
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+    evaluator = EvaluatorAgent(model=None, n_resamples=args.resamples, bootstrap_workers=args.workers)
+    cache = MetricCache(df)
+    # Base aggregates are not part of the bootstrap cost
+    for name in ["roas_by_date", "roas_by_platform", "ctr_mean", "spend_roas_corr"]:
+        cache.get(name)
+
+    print(f"{args.rows:,} rows, {args.resamples:,} resamples, workers={args.workers}")
+    total = 0.0
+    for hypothesis in HYPOTHESES:
+        start = time.perf_counter()
+        result = evaluator._validate_hypothesis(cache, {"hypothesis": hypothesis})
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        print(f"  {result['method']:<22} {elapsed:7.3f}s  confidence={result['confidence']}")
+    print(f"  {'total':<22} {total:7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark: drill-down queries on the rollup cube vs. groupbys over raw rows.
+
+Usage:
+    python benchmarks/bench_cube.py                  # 1M rows
+    python benchmarks/bench_cube.py --rows 200000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_summary import make_frame
+from src.utils.rollup_cube import RollupCube
+
+QUERIES = [
+    (["date"], {}),
+    (["platform", "country"], {}),
+    (["campaign_name"], {"platform": "Instagram", "country": "US"}),
+    (["country", "date"], {"platform": "Instagram"}),
+    (["creative_type", "audience_type"], {"country": "US"})
+]
+
+
+def add_dimensions(df, seed=7):
+    """Columns make_frame leaves out but the cube rolls up"""
+    rng = np.random.default_rng(seed)
+    extra = {
+        "adset_name": [f"Adset-{i}" for i in range(8)],
+        "country": ["US", "UK", "IN", "CA", "AU"],
+        "creative_type": ["Image", "Video", "Carousel", "UGC"],
+        "audience_type": ["Broad", "Lookalike", "Retargeting"]
+    }
+    for name, values in extra.items():
+        df[name] = np.array(values, dtype=object)[rng.integers(0, len(values), len(df))]
+    df["impressions"] = rng.integers(1000, 300000, len(df))
+    df["clicks"] = np.round(df["impressions"] * df["ctr"])
+    return df
+
+
+def raw_query(df, by, where):
+    rows = df
+    for dim, value in where.items():
+        rows = rows[rows[dim] == value]
+    sums = rows.groupby(by)[["spend", "revenue", "clicks", "impressions"]].sum()
+    return sums.assign(roas=sums["revenue"] / sums["spend"], ctr=sums["clicks"] / sums["impressions"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    df = add_dimensions(make_frame(args.rows))
+    start = time.perf_counter()
+    cube = RollupCube.build(df)
+    print(f"{args.rows:,} rows -> {len(cube.base):,} base cells, built in {time.perf_counter() - start:.2f}s")
+
+    print(f"{'query':<48} {'raw (s)':>9} {'cube (s)':>9}  match")
+    for by, where in QUERIES:
+        start = time.perf_counter()
+        expected = raw_query(df, by, where)
+        raw_time = time.perf_counter() - start
+        start = time.perf_counter()
+        actual = cube.query(by=by, where=where)
+        cube_time = time.perf_counter() - start
+        match = np.allclose(expected["roas"], actual["roas"]) and np.allclose(expected["ctr"], actual["ctr"])
+        label = f"by {by} where {where}" if where else f"by {by}"
+        print(f"{label:<48} {raw_time:>9.4f} {cube_time:>9.4f}  {match}")
+
+
+if __name__ == "__main__":
+    main()
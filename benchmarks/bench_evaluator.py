@@ -0,0 +1,82 @@
+"""
+Benchmark: per-hypothesis recomputation vs. the evaluator's metric cache.
+
+Usage:
+    python benchmarks/bench_evaluator.py                          # 1M rows, 500 hypotheses
+    python benchmarks/bench_evaluator.py --rows 200000 --hypotheses 100
+
+Also times segment mode over campaign, platform, country and campaign x country.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_summary import make_frame
+from src.agents.evaluator_agent import EvaluatorAgent, DEFAULT_SEGMENT_DIMENSIONS
+from src.utils.metric_cache import MetricCache
+
+HYPOTHESES = [
+    "ROAS declined over the last week",
+    "CTR is below the 2% benchmark",
+    "Instagram platform performs better than Facebook",
+    "Higher spend is reducing returns",
+    "Creative fatigue in retargeting audiences"
+]
+
+
+class UncachedMetrics(MetricCache):
+    """Recomputes every metric and memoized value (e.g. bootstrap results) on each request (the pre-cache behaviour)"""
+
+    def memo(self, key, compute):
+        return compute()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--hypotheses", type=int, default=500)
+    parser.add_argument("--countries", type=int, default=20, help="distinct countries for segment mode")
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+    df["country"] = np.array([f"C{i:02d}" for i in range(args.countries)], dtype=object)[
+        np.random.default_rng(7).integers(0, args.countries, args.rows)
+    ]
+    insights = [{"hypothesis": HYPOTHESES[i % len(HYPOTHESES)], "confidence": 0.7}
+                for i in range(args.hypotheses)]
+    evaluator = EvaluatorAgent(model=None)
+
+    start = time.perf_counter()
+    expected = evaluator.evaluate(df, insights, metrics=UncachedMetrics(df))
+    uncached = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = evaluator.evaluate(df, insights)
+    cached = time.perf_counter() - start
+
+    print(f"{args.rows:,} rows, {args.hypotheses} hypotheses")
+    print(f"  uncached: {uncached:.3f}s")
+    print(f"  cached:   {cached:.3f}s  ({uncached / cached:.1f}x, match={expected == actual})")
+
+    texts = [item["hypothesis"] for item in insights] * 100
+    start = time.perf_counter()
+    for text in texts:
+        evaluator.rules.match(text)
+    elapsed = time.perf_counter() - start
+    print(f"  matching: {len(texts) / elapsed:,.0f} hypotheses/s through the rule registry")
+
+    segments = DEFAULT_SEGMENT_DIMENSIONS + [["campaign_name", "country"]]
+    start = time.perf_counter()
+    segmented = evaluator.evaluate(df, insights, segments=segments)
+    elapsed = time.perf_counter() - start
+    checked = sum(v["segments_checked"] for v in segmented)
+    print(f"  segments: {elapsed:.3f}s  ({checked:,} hypothesis x segment checks)")
+
+
+if __name__ == "__main__":
+    main()
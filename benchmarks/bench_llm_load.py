@@ -0,0 +1,117 @@
+"""
+Benchmark: orchestration throughput and tail latency against the fake LLM provider.
+
+Runs --queries analyses (--workers at a time) against one loaded dataset,
+with every agent going through its LLM path (prompt encoding, the shared
+client's concurrency limit and retries, fenced-JSON parsing). No network
+or API key is needed.
+
+Usage:
+    python benchmarks/bench_llm_load.py                                    # 40 queries, 8 workers, ~0.8s median calls
+    python benchmarks/bench_llm_load.py --queries 200 --workers 32 --max-concurrency 16
+    python benchmarks/bench_llm_load.py --error-rate 0.1 --malformed-rate 0.05 --sigma 1.0 --out /tmp/load.json
+    python benchmarks/bench_llm_load.py --sigma 1.0 --deadline 2 --hedge-after 1.5   # tail: budgets and hedging
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from src.llm.fake_model import latency_percentiles
+from src.orchestrator.orchestrator import Orchestrator
+
+QUERIES = [
+    "Analyze ROAS drop in last 7 days",
+    "Why is CTR low and how to improve it?",
+    "Which platform performs better?",
+    "Suggest new ad copy for low-CTR campaigns"
+]
+
+
+def load_config(args):
+    """config.yaml with the fake provider and the requested load parameters"""
+    with open(os.path.join(ROOT, "config", "config.yaml"), "r") as f:
+        config = yaml.safe_load(f)
+    llm = config.setdefault("llm", {})
+    llm["provider"] = "fake"
+    llm["max_concurrency"] = args.max_concurrency
+    llm["backoff_base_s"] = args.backoff
+    llm["deadlines_s"] = dict.fromkeys(["planner", "insight_agent", "creative_generator"], args.deadline)
+    llm["hedge_after_s"] = args.hedge_after
+    llm["fake"] = {
+        "latency": {"distribution": "lognormal", "median_s": args.median, "sigma": args.sigma},
+        "error_rate": args.error_rate,
+        "fatal_error_rate": args.fatal_error_rate,
+        "malformed_rate": args.malformed_rate,
+        "seed": args.seed
+    }
+    return config
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=8, help="analyses in flight")
+    parser.add_argument("--max-concurrency", type=int, default=4, help="LLM calls in flight (llm.max_concurrency)")
+    parser.add_argument("--median", type=float, default=0.8, help="median fake call latency in seconds")
+    parser.add_argument("--sigma", type=float, default=0.5, help="lognormal spread; larger means a heavier tail")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--fatal-error-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--backoff", type=float, default=0.05, help="retry backoff base in seconds")
+    parser.add_argument("--deadline", type=float, help="per-stage LLM budget in seconds (llm.deadlines_s); default none")
+    parser.add_argument("--hedge-after", type=float, help="send a duplicate request after this many seconds (llm.hedge_after_s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    with contextlib.redirect_stdout(io.StringIO()):
+        orchestrator = Orchestrator(config=load_config(args))
+        shared = orchestrator.load_data()
+
+    def run_one(i):
+        query = f"{QUERIES[i % len(QUERIES)]} (#{i})"  # distinct prompts, so no two runs share a response
+        start = time.perf_counter()
+        orchestrator.run(query, shared=shared, save=False)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            durations = list(pool.map(run_one, range(args.queries)))
+    elapsed = time.perf_counter() - start
+
+    llm = orchestrator.model.stats()
+    results = {
+        "options": vars(args),
+        "elapsed_s": round(elapsed, 4),
+        "queries_per_s": round(args.queries / elapsed, 4),
+        "query_latency_s": latency_percentiles(sorted(durations)),
+        "llm": llm,
+        "llm_paths": orchestrator.llm.path_stats()
+    }
+    print(f"{args.queries} queries, {args.workers} workers, {args.max_concurrency} LLM calls in flight")
+    print(f"  throughput: {results['queries_per_s']:.2f} queries/s ({elapsed:.2f}s)")
+    print(f"  query latency: {results['query_latency_s']}")
+    print(f"  LLM calls: {llm['calls']} {llm['outcomes']}")
+    print(f"  LLM call latency: {llm['latency_s']}")
+    print(f"  LLM call paths: {results['llm_paths']}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=4)
+        print(f"💾 Results saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
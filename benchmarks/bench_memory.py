@@ -0,0 +1,47 @@
+"""
+Benchmark: in-memory size of the default read_csv layout vs. the explicit schema.
+
+Usage:
+    python benchmarks/bench_memory.py                # 1M synthetic rows
+    python benchmarks/bench_memory.py --rows 200000
+    python benchmarks/bench_memory.py --csv data/synthetic_fb_ads_undergarments.csv
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_cube import add_dimensions
+from bench_summary import make_frame
+from src.utils import schema, summary_engine
+
+
+def print_report(report, title):
+    print(f"\n{title}: {report['rows']:,} rows")
+    print(f"{'column':<18} {'default (MB)':>13} {'schema (MB)':>12}  dtype")
+    for name, column in report["columns"].items():
+        print(f"{name:<18} {column['default_bytes'] / 2**20:>13.2f} {column['schema_bytes'] / 2**20:>12.2f}  {column['schema_dtype']}")
+    print(f"{'total':<18} {report['default_bytes'] / 2**20:>13.2f} {report['schema_bytes'] / 2**20:>12.2f}  ({report['reduction']:.0%} smaller)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--csv", help="Measure an existing export instead of synthetic rows")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.csv
+        if path is None:
+            path = os.path.join(tmp, "ads.csv")
+            df = add_dimensions(make_frame(args.rows))
+            df.to_csv(path, index=False)
+
+        print_report(schema.memory_report(path), "All columns")
+        print_report(schema.memory_report(path, usecols=summary_engine.SUMMARY_COLUMNS), "Summary-only plan (usecols projection)")
+
+
+if __name__ == "__main__":
+    main()
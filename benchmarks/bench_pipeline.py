@@ -0,0 +1,210 @@
+"""
+Benchmark: pipeline stages over synthetic exports of increasing size.
+
+Times DataAgent.load_and_summarize, the fallback InsightAgent, PlannerAgent
+and CreativeGenerator, EvaluatorAgent.evaluate and a full Orchestrator.run
+(without an API key, so every agent uses its fallback logic). Results are
+saved as JSON; --compare prints the change against an earlier results file.
+
+Usage:
+    python benchmarks/bench_pipeline.py                                  # 10k, 100k, 1M rows
+    python benchmarks/bench_pipeline.py --rows 10000000 50000000 --repeats 1 --stages load_and_summarize
+    python benchmarks/bench_pipeline.py --compare benchmarks/results/pipeline-1e0e394.json --max-regression 0.2
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from src.agents.creative_generator import CreativeGenerator
+from src.agents.data_agent import DataAgent
+from src.agents.evaluator_agent import EvaluatorAgent
+from src.agents.insight_agent import InsightAgent
+from src.agents.planner import PlannerAgent
+from src.orchestrator.orchestrator import Orchestrator
+from src.utils import synthetic_data
+
+QUERY = "Analyze ROAS drop in last 7 days"
+STAGES = ["load_and_summarize", "planner", "insight_agent", "evaluate", "creative_generator", "orchestrator_run"]
+
+
+def dataset(args, rows):
+    """Path of the synthetic export for ``rows`` (generated once per parameter set)"""
+    name = f"ads_{rows}r_{args.campaigns}c_{args.days}d_{args.platforms}p_{args.countries}k_s{args.seed}.csv"
+    path = os.path.join(args.data_dir, name)
+    if not os.path.exists(path):
+        start = time.perf_counter()
+        synthetic_data.write_csv(
+            path + ".tmp", rows, seed=args.seed, campaigns=args.campaigns, days=args.days,
+            platforms=args.platforms, countries=args.countries
+        )
+        os.replace(path + ".tmp", path)
+        print(f"  generated {rows:,} rows in {time.perf_counter() - start:.1f}s -> {path}")
+    return path
+
+
+def timed(fn, repeats):
+    """Wall times of ``repeats`` calls (agent output silenced) and the last result"""
+    times = []
+    result = None
+    for _ in range(repeats):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = fn()
+            times.append(time.perf_counter() - start)
+    return times, result
+
+
+def orchestrator_run(path, tmp):
+    """One cold Orchestrator.run over ``path``: empty caches, outputs in ``tmp``"""
+    orchestrator = Orchestrator()
+    run_dir = tempfile.mkdtemp(dir=tmp)
+    data = orchestrator.config.setdefault("data", {})
+    data["csv_path"] = path
+    for key in ("cache_dir", "cube_dir", "campaign_names"):
+        if data.get(key):
+            data[key] = os.path.join(run_dir, key)
+    return orchestrator.run(QUERY, output_dir=os.path.join(run_dir, "out"))
+
+
+def bench_size(args, rows, tmp):
+    """Timings of the selected stages for one dataset size"""
+    path = dataset(args, rows)
+    stages = {}
+
+    def record(stage, fn):
+        if stage not in args.stages:
+            return None
+        times, result = timed(fn, args.repeats)
+        stages[stage] = {
+            "best_s": round(min(times), 4),
+            "median_s": round(statistics.median(times), 4),
+            "runs": len(times),
+            "rows_per_s": round(rows / min(times)) if min(times) > 0 else None
+        }
+        print(f"  {stage:<20} {min(times):>9.3f}s best  {statistics.median(times):>9.3f}s median")
+        return result
+
+    # The later stages need a frame, summary and insights even when their
+    # producers are not being timed
+    df, summary = record("load_and_summarize", lambda: _loaded(path)) or _loaded(path)
+    record("planner", lambda: PlannerAgent(model=None).create_plan(QUERY))
+    insights = record("insight_agent", lambda: InsightAgent(model=None).generate_insights(summary))
+    if insights is None:
+        insights = InsightAgent(model=None).generate_insights(summary)
+    record("evaluate", lambda: EvaluatorAgent(model=None, random_seed=args.seed).evaluate(df, insights))
+    record("creative_generator", lambda: CreativeGenerator(model=None).generate(summary))
+    record("orchestrator_run", lambda: orchestrator_run(path, tmp))
+    return {"csv_mb": round(os.path.getsize(path) / 2**20, 2), "stages": stages}
+
+
+def _loaded(path):
+    """Load and fully summarize ``path`` with a cache-free DataAgent"""
+    df, summary = DataAgent(model=None).load_and_summarize(path)
+    summary.prefetch(list(summary))
+    return df, summary
+
+
+def environment():
+    """Commit and machine details stored with the results"""
+    def git(*cmd):
+        try:
+            return subprocess.run(["git", *cmd], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    return {
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.platform(),
+        "cpus": os.cpu_count()
+    }
+
+
+def compare(current, baseline_path, max_regression):
+    """Print median changes against a baseline; returns the regressions over ``max_regression``"""
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f)
+    print(f"\nvs. {baseline['environment']['commit']} ({baseline_path})")
+    regressions = []
+    for rows, result in current["results"].items():
+        for stage, timing in result["stages"].items():
+            before = baseline["results"].get(rows, {}).get("stages", {}).get(stage)
+            if before is None or before["median_s"] <= 0:
+                continue
+            change = timing["median_s"] / before["median_s"] - 1
+            flag = ""
+            if max_regression is not None and change > max_regression:
+                flag = "  ❌ regression"
+                regressions.append((int(rows), stage, change))
+            print(f"  {int(rows):>12,} {stage:<20} {before['median_s']:>9.3f}s -> {timing['median_s']:>9.3f}s  {change:+.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--campaigns", type=int, default=20)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--platforms", type=int, default=2)
+    parser.add_argument("--countries", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default=os.path.join(ROOT, ".cache", "synthetic"), help="generated exports are kept here")
+    parser.add_argument("--out", help="results file (default benchmarks/results/pipeline-<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare medians against")
+    parser.add_argument("--max-regression", type=float, default=None, help="exit 1 if a median slows down by more than this share")
+    args = parser.parse_args()
+    args.data_dir = os.path.abspath(args.data_dir)
+    out = os.path.abspath(args.out) if args.out else None
+    baseline = os.path.abspath(args.compare) if args.compare else None
+
+    # Orchestrator reads config/config.yaml relative to the repo root, and
+    # the agents' fallback logic is what is measured (no network calls)
+    os.chdir(ROOT)
+    for key in ("GOOGLE_API_KEY", "GEMINI_API_KEY"):
+        os.environ.pop(key, None)
+
+    current = {
+        "environment": environment(),
+        "options": {k: getattr(args, k) for k in ("repeats", "campaigns", "days", "platforms", "countries", "seed")},
+        "results": {}
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            print(f"\n{rows:,} rows")
+            current["results"][str(rows)] = bench_size(args, rows, tmp)
+
+    out = out or os.path.join(ROOT, "benchmarks", "results", f"pipeline-{current['environment']['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(current, f, indent=4)
+    print(f"\n💾 Results saved to {out}")
+
+    if baseline:
+        regressions = compare(current, baseline, args.max_regression)
+        if regressions:
+            print(f"❌ {len(regressions)} stage(s) slowed down by more than {args.max_regression:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark: CLI startup cost (import + Orchestrator construction).
+
+Each sample runs in a fresh interpreter, as `python run.py` would.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 20 --budget-ms 300   # exit 1 on regression
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Measured inside the child so interpreter boot itself is excluded
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from src.orchestrator.orchestrator import Orchestrator
+Orchestrator()
+elapsed = time.perf_counter() - start
+heavy = [m for m in ("pandas", "numpy", "google.generativeai") if m in sys.modules]
+print(json.dumps({"ms": elapsed * 1000, "heavy_modules": heavy}))
+"""
+
+
+def sample():
+    """One cold start in a child interpreter without an API key"""
+    env = {k: v for k, v in os.environ.items() if k not in ("GOOGLE_API_KEY", "GEMINI_API_KEY")}
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if the median exceeds this")
+    args = parser.parse_args()
+
+    samples = [sample() for _ in range(args.runs)]
+    times = [s["ms"] for s in samples]
+    median = statistics.median(times)
+    print(f"startup over {args.runs} runs: median {median:.1f} ms, min {min(times):.1f} ms, max {max(times):.1f} ms")
+    print(f"heavy modules loaded at startup: {samples[-1]['heavy_modules'] or 'none'}")
+
+    if args.budget_ms is not None and median > args.budget_ms:
+        print(f"❌ median startup {median:.1f} ms exceeds budget {args.budget_ms:.1f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark: legacy multi-groupby summary vs. the single-pass summary engine.
+
+Usage:
+    python benchmarks/bench_summary.py                 # 1M and 10M rows
+    python benchmarks/bench_summary.py --rows 200000   # quick check
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils import summary_engine
+
+
+def make_frame(rows, seed=42, campaigns=400, days=90):
+    """Random frame with the columns the summary reads"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2025-01-01", periods=days).strftime("%Y-%m-%d").to_numpy()
+    names = np.array([f"Campaign {i}" for i in range(campaigns)], dtype=object)
+    messages = np.array([f"Creative message {i}" for i in range(50)], dtype=object)
+    spend = rng.gamma(2.0, 250.0, rows)
+    roas = np.round(rng.lognormal(1.5, 0.8, rows), 2)
+    return pd.DataFrame({
+        "campaign_name": names[rng.integers(0, campaigns, rows)],
+        "date": dates[rng.integers(0, days, rows)],
+        "spend": spend,
+        "ctr": np.round(rng.beta(2, 120, rows), 4),
+        "purchases": rng.poisson(60, rows),
+        "revenue": spend * roas,
+        "roas": roas,
+        "creative_message": messages[rng.integers(0, len(messages), rows)],
+        "platform": np.array(["Facebook", "Instagram"], dtype=object)[rng.integers(0, 2, rows)]
+    })
+
+
+def legacy_summary(df):
+    """The original DataAgent.load_and_summarize body, kept as the baseline"""
+    return {
+        "date_range": f"{df['date'].min()} to {df['date'].max()}",
+        "total_campaigns": df['campaign_name'].nunique(),
+        "total_spend": round(df["spend"].sum(), 2),
+        "total_revenue": round(df["revenue"].sum(), 2),
+        "overall_roas": round(df["revenue"].sum() / df["spend"].sum(), 4) if df["spend"].sum() > 0 else 0,
+        "avg_metrics": {
+            "roas": round(df["roas"].mean(), 4),
+            "ctr": round(df["ctr"].mean(), 4),
+            "spend": round(df["spend"].mean(), 4),
+            "purchases": round(df["purchases"].mean(), 4)
+        },
+        "platform_performance": df.groupby("platform").agg({
+            "roas": "mean", "ctr": "mean", "spend": "sum"
+        }).round(4).to_dict(orient="index"),
+        "roas_trend_7d": df.groupby("date")["roas"].mean().tail(7).round(4).to_dict(),
+        "top_5_campaigns": df.groupby("campaign_name").agg({
+            "roas": "mean", "spend": "sum"
+        }).nlargest(5, "roas").round(4).reset_index().to_dict(orient="records"),
+        "bottom_5_campaigns": df.groupby("campaign_name").agg({
+            "roas": "mean", "ctr": "mean"
+        }).nsmallest(5, "roas").round(4).reset_index().to_dict(orient="records"),
+        "low_ctr_campaigns": df[df["ctr"] < 0.02].nsmallest(5, "ctr")[
+            ["campaign_name", "ctr", "creative_message"]
+        ].to_dict(orient="records")
+    }
+
+
+def best_of(fn, df, repeats):
+    """Best wall time over ``repeats`` runs, plus the last result"""
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(df)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'legacy (s)':>12} {'engine (s)':>12} {'speedup':>9}  match")
+    for rows in args.rows:
+        df = make_frame(rows)
+        legacy_time, expected = best_of(legacy_summary, df, args.repeats)
+        # dict() forces every field; the summary itself is computed lazily
+        engine_time, actual = best_of(lambda frame: dict(summary_engine.summarize(frame)), df, args.repeats)
+        print(f"{rows:>12,} {legacy_time:>12.3f} {engine_time:>12.3f} {legacy_time / engine_time:>8.2f}x  {expected == actual}")
+        del df
+
+
+if __name__ == "__main__":
+    main()
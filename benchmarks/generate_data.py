@@ -0,0 +1,52 @@
+"""
+Generate a synthetic ads export with the bundled CSV's schema.
+
+Usage:
+    python benchmarks/generate_data.py --rows 1000000 --out data/synthetic_1m.csv
+    python benchmarks/generate_data.py --rows 50000000 --campaigns 400 --days 365 --countries 10 --out /tmp/ads_50m.csv
+    python benchmarks/generate_data.py --rows 10000 --platforms Facebook Instagram --countries US UK IN
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils import synthetic_data
+
+
+def names_or_count(values):
+    """A single number is a count, anything else a list of names"""
+    return int(values[0]) if len(values) == 1 and values[0].isdigit() else values
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--out", default="data/synthetic_generated.csv")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--campaigns", type=int, default=20)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--adsets", type=int, default=5, help="adsets per campaign")
+    parser.add_argument("--platforms", nargs="+", default=["2"], help="count or names")
+    parser.add_argument("--countries", nargs="+", default=["3"], help="count or names")
+    parser.add_argument("--name-noise", type=float, default=0.35, help="share of rows with a variant campaign spelling")
+    parser.add_argument("--missing", type=float, default=0.025, help="share of blank spend/clicks/revenue/roas cells")
+    parser.add_argument("--start", default="2025-01-01", help="first date")
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    synthetic_data.write_csv(
+        args.out, args.rows, seed=args.seed, chunk_rows=args.chunk_rows, campaigns=args.campaigns,
+        days=args.days, adsets=args.adsets, platforms=names_or_count(args.platforms),
+        countries=names_or_count(args.countries), name_noise=args.name_noise, missing=args.missing,
+        start=args.start
+    )
+    size_mb = os.path.getsize(args.out) / 2**20
+    print(f"✅ Wrote {args.rows:,} rows ({size_mb:.1f} MB) to {args.out} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,45 @@
 from src.orchestrator.orchestrator import Orchestrator
-import sys
+import argparse
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Agentic Facebook Ads performance analyst")
+    parser.add_argument("query", nargs="?", default="Analyze ROAS", help="question to analyze")
+    parser.add_argument("--batch", metavar="QUERIES_JSONL", help="run every query in a JSONL file against one loaded dataset")
+    parser.add_argument("--workers", type=int, default=None, help="queries run in parallel in batch mode")
+    parser.add_argument("--output-dir", default="reports/batch", help="batch output root (one subdirectory per query)")
+    parser.add_argument("--serve", action="store_true", help="run a resident HTTP server that keeps data and agents warm")
+    parser.add_argument("--host", default=None, help="server bind address")
+    parser.add_argument("--port", type=int, default=None, help="server port")
+    parser.add_argument("--profile", action="store_true", help="capture cProfile stats per agent into the logs folder")
+    args = parser.parse_args()
+    if args.profile and (args.batch or args.serve):
+        # Concurrent runs would share one process-wide profiler
+        parser.error("--profile profiles a single query; it cannot be combined with --batch or --serve")
+    return args
+
 
 if __name__ == "__main__":
-    query = sys.argv[1] if len(sys.argv) > 1 else "Analyze ROAS"
-    Orchestrator().run(query)
-    print("Analysis complete! Check the 'reports' folder for insights.json, creatives.json, and report.md")
+    args = parse_args()
+    orchestrator = Orchestrator(profile=args.profile)
+
+    if args.serve:
+        from src.orchestrator.server import AnalysisServer
+        server_config = orchestrator.config.get("server", {})
+        server = AnalysisServer(
+            orchestrator,
+            host=args.host or server_config.get("host", "127.0.0.1"),
+            port=args.port or server_config.get("port", 8080)
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.shutdown()
+    elif args.batch:
+        from src.orchestrator.batch import BatchRunner
+        workers = args.workers or orchestrator.config.get("batch", {}).get("workers", 4)
+        BatchRunner(orchestrator, workers=workers).run(args.batch, output_dir=args.output_dir)
+        print(f"Batch complete! Per-query outputs are in '{args.output_dir}'")
+    else:
+        orchestrator.run(args.query)
+        print("Analysis complete! Check the 'reports' folder for insights.json, creatives.json, and report.md")
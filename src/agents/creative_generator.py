@@ -1,10 +1,18 @@
-import json
 import os
+from src.llm.client import LLMClient, LLMDeadlineExceeded
+from src.llm.json_stream import ObjectArrayParser
+from src.llm.prompt_encoder import PromptEncoder, CREATIVE_PRIORITY, CREATIVE_FIELDS, estimate_tokens, render_template
 
 class CreativeGenerator:
-    def __init__(self, model=None):
-        """Initialize Creative Generator with LLM model"""
+    def __init__(self, model=None, token_budget=None, deadline=None):
+        """Initialize Creative Generator with LLM model (deadline: seconds before falling back)"""
         self.model = model
+        self.deadline = deadline
+        # Shared client (timeouts, retries, concurrency limit) around the model
+        self.llm = LLMClient.wrap(model)
+        # Compact summary serialization, trimmed to the per-agent token budget
+        self.encoder = PromptEncoder(CREATIVE_PRIORITY, token_budget=token_budget)
+        self.last_prompt_stats = None
         self.prompt_template = self._load_prompt("prompts/creative_prompt.md")
     
     def _load_prompt(self, filepath):
@@ -12,33 +20,63 @@ class CreativeGenerator:
         with open(filepath, 'r', encoding='utf-8') as f:
             return f.read()
     
-    def generate(self, summary):
-        """Generate creative recommendations using LLM or fallback"""
+    def generate(self, summary, on_creative=None):
+        """
+        Generate creative recommendations using LLM or fallback
+
+        The response is streamed and ``on_creative(item)`` is called for each
+        campaign's recommendation as soon as its JSON object is complete. If
+        the response is cut off, the complete recommendations are kept.
+        """
         if not self.model:
-            return self._fallback_creatives(summary)
+            return self._emit(self._fallback_creatives(summary), on_creative)
+        
+        # Fill prompt with compact data summary
+        data_summary, prompt_stats = self.encoder.encode(summary, fields=CREATIVE_FIELDS)
+        filled_prompt = render_template(self.prompt_template, data_summary=data_summary)
+        prompt_stats["prompt_tokens"] = estimate_tokens(filled_prompt)
+        self.last_prompt_stats = prompt_stats
         
-        # Fill prompt with data summary
-        filled_prompt = self.prompt_template.format(
-            data_summary=json.dumps(summary, indent=2)
-        )
+        parser = ObjectArrayParser()
+        creatives = []
+        
+        def on_chunk(chunk):
+            for item in parser.feed(chunk):
+                creatives.append(item)
+                if on_creative:
+                    on_creative(item)
         
         try:
-            # Generate creatives using LLM
-            response = self.model.generate_content(filled_prompt)
-            creatives_text = response.text.strip()
-            
-            # Extract JSON from response
-            if "```json" in creatives_text:
-                creatives_text = creatives_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in creatives_text:
-                creatives_text = creatives_text.split("```")[1].split("```")[0].strip()
-            
-            creatives = json.loads(creatives_text)
+            # Stream creatives from the LLM, parsing the JSON array as it arrives
+            creatives_text = self.llm.stream(filled_prompt, on_chunk, deadline=self.deadline)
+            prompt_stats["response_tokens"] = estimate_tokens(creatives_text)
+            if not parser.done:
+                raise ValueError("response ended before the JSON array closed")
             return creatives
         
+        except LLMDeadlineExceeded:
+            # The late answer is still cached for the next identical prompt
+            if creatives:
+                print(f"⏱️ LLM creative generation exceeded its {self.deadline}s budget. Keeping {len(creatives)} complete recommendations.")
+                return creatives
+            print(f"⏱️ LLM creative generation exceeded its {self.deadline}s budget. Using fallback.")
+            return self._emit(self._fallback_creatives(summary), on_creative)
+        
         except Exception as e:
+            # Don't keep serving a cached response that failed to parse
+            self.llm.invalidate(filled_prompt)
+            if creatives:
+                print(f"⚠️ LLM creative response incomplete: {e}. Keeping {len(creatives)} complete recommendations.")
+                return creatives
             print(f"⚠️ LLM creative generation failed: {e}. Using fallback.")
-            return self._fallback_creatives(summary)
+            return self._emit(self._fallback_creatives(summary), on_creative)
+
+    def _emit(self, creatives, on_creative):
+        """Pass already complete recommendations to the callback one by one"""
+        for item in creatives:
+            if on_creative:
+                on_creative(item)
+        return creatives
     
     def _fallback_creatives(self, summary):
         """Rule-based fallback creatives if LLM fails"""
@@ -1,56 +1,122 @@
 import pandas as pd
 import os
+from src.utils.ingest_cache import IngestCache, hash_file
+from src.utils import schema, summary_engine
+from src.utils.campaign_names import CampaignNames
+from src.utils.tracing import span
+from src.utils.incremental_state import IncrementalSummary
+from src.utils.rollup_cube import CubeStore, RollupCube, DIMENSIONS, MEASURES, ROW_RATES
 
 class DataAgent:
-    def __init__(self, model=None):
+    def __init__(self, model=None, cache_dir=None, incremental=False, cube_dir=None, trend_days=7, names_path=None):
         """Initialize Data Agent (doesn't need LLM for summary generation)"""
         self.model = model
         self.prompt_template = self._load_prompt("prompts/data_agent_prompt.md")
+        # Binary column cache; None disables it and always parses the CSV
+        self.ingest_cache = IngestCache(cache_dir) if cache_dir else None
+        # Keep summary aggregates next to the dataset and only fold appended rows
+        self.incremental = incremental
+        # Persisted rollup cube per dataset version; None aggregates the frame directly
+        self.cube_store = CubeStore(cube_dir) if cube_dir else None
+        # Number of most recent dates in the summary's ROAS trend window
+        self.trend_days = trend_days
+        # Persisted raw -> canonical campaign name mapping; None keeps names as exported
+        self.campaign_names = CampaignNames(names_path) if names_path else None
     
     def _load_prompt(self, filepath):
         """Load prompt template from file"""
         with open(filepath, 'r', encoding='utf-8') as f:
             return f.read()
     
+    def load(self, path, columns=None):
+        """
+        Load CSV with the explicit schema (categoricals, 32-bit numbers),
+        reusing the binary ingest cache when enabled. ``columns`` projects
+        the frame to those columns (None loads all of them).
+        """
+        with span("load_csv", "io", path=path, ingest_cache=self.ingest_cache is not None) as s:
+            if self.ingest_cache:
+                df = schema.downcast(self.ingest_cache.load(path, usecols=columns, categories=schema.CATEGORY_COLUMNS))
+            else:
+                df = schema.read_csv(path, usecols=columns)
+            s.set(rows=len(df), columns=len(df.columns), frame_mb=round(df.memory_usage(index=False, deep=True).sum() / 2**20, 2))
+        return self.clean(df)
+
+    def clean(self, df):
+        """Replace campaign name spelling variants with their canonical name (when enabled)"""
+        if self.campaign_names is None or "campaign_name" not in df.columns:
+            return df
+        with span("canonicalize_names", "clean") as s:
+            df["campaign_name"] = self.campaign_names.canonicalize(df["campaign_name"])
+            s.set(new_spellings=self.campaign_names.last_new)
+        if self.campaign_names.last_new:
+            print(f"🧹 Normalized {self.campaign_names.last_new} new campaign name spellings")
+        return df
+
+    def required_columns(self, columns=None):
+        """
+        Columns to load for a plan: what downstream agents read from the frame
+        (``columns``; None means everything) plus what the summary and cube need
+        """
+        if columns is None:
+            return None
+        required = set(columns) | set(summary_engine.SUMMARY_COLUMNS)
+        if self.cube_store:
+            # A persisted cube is shared by later runs, so it always gets every dimension
+            required |= set(DIMENSIONS + MEASURES + ROW_RATES)
+        return sorted(required)
+
+    def summarize(self, df, cube=None):
+        """Generate statistical summary with one grouped pass per key (or from the rollup cube)"""
+        return summary_engine.summarize(df, trend_days=self.trend_days, cube=cube)
+
     def load_and_summarize(self, path):
         """Load CSV and generate statistical summary"""
-        df = pd.read_csv(path)
-
-        summary = {
-            "date_range": f"{df['date'].min()} to {df['date'].max()}",
-            "total_campaigns": df['campaign_name'].nunique(),
-            "total_spend": round(df["spend"].sum(), 2),
-            "total_revenue": round(df["revenue"].sum(), 2),
-            "overall_roas": round(df["revenue"].sum() / df["spend"].sum(), 4) if df["spend"].sum() > 0 else 0,
-            
-            "avg_metrics": {
-                "roas": round(df["roas"].mean(), 4),
-                "ctr": round(df["ctr"].mean(), 4),
-                "spend": round(df["spend"].mean(), 4),
-                "purchases": round(df["purchases"].mean(), 4)
-            },
-            
-            "platform_performance": df.groupby("platform").agg({
-                "roas": "mean",
-                "ctr": "mean",
-                "spend": "sum"
-            }).round(4).to_dict(orient="index"),
-            
-            "roas_trend_7d": df.groupby("date")["roas"].mean().tail(7).round(4).to_dict(),
-            
-            "top_5_campaigns": df.groupby("campaign_name").agg({
-                "roas": "mean",
-                "spend": "sum"
-            }).nlargest(5, "roas").round(4).reset_index().to_dict(orient="records"),
-            
-            "bottom_5_campaigns": df.groupby("campaign_name").agg({
-                "roas": "mean",
-                "ctr": "mean"
-            }).nsmallest(5, "roas").round(4).reset_index().to_dict(orient="records"),
-            
-            "low_ctr_campaigns": df[df["ctr"] < 0.02].nsmallest(5, "ctr")[
-                ["campaign_name", "ctr", "creative_message"]
-            ].to_dict(orient="records")
-        }
-
-        return df, summary
+        dataset = self.load_dataset(path)
+        return dataset["dataframe"], dataset["data_summary"]
+
+    def load_dataset(self, path, columns=None):
+        """
+        Load CSV with its rollup cube (None when disabled) and summary.
+        In incremental mode a plan that reads no frame columns (``columns=[]``)
+        gets the summary only: neither the frame nor the cube is rebuilt, so
+        the cost follows the appended rows instead of the full history.
+        """
+        if self.incremental and columns == []:
+            return {"data_summary": self.incremental_summarize(path)}
+        df = self.load(path, self.required_columns(columns))
+        cube = self.load_cube(path, df) if self.cube_store else None
+        if self.incremental:
+            summary = self.incremental_summarize(path)
+        else:
+            summary = self.summarize(df, cube=cube)
+        return {"dataframe": df, "data_summary": summary, "cube": cube}
+
+    def load_cube(self, path, df):
+        """Rollup cube for the current version of the CSV, built on first sight of that version"""
+        variant = "canonical" if self.campaign_names else ""
+
+        def build():
+            with span("cube.build", "groupby", rows=len(df)):
+                return RollupCube.build(df)
+
+        with span("load_cube", "cache"):
+            version = self.ingest_cache.version(path) if self.ingest_cache else hash_file(path)
+            return self.cube_store.get(path, version, build, variant=variant)
+
+    def incremental_summarize(self, path):
+        """Summary from persisted aggregates, folding in only rows appended since the last run"""
+        tracker = IncrementalSummary(path, clean=self.clean if self.campaign_names else None)
+        return tracker.summary(trend_days=self.trend_days)
+
+    def stream_summarize(self, path, chunksize=500_000):
+        """
+        Summarize a CSV too large for memory by reading it in bounded chunks.
+        Produces the same summary as load_and_summarize but never holds the
+        full frame, so no DataFrame is returned.
+        """
+        chunks = pd.read_csv(path, usecols=summary_engine.SUMMARY_COLUMNS, chunksize=chunksize)
+        state = summary_engine.aggregate_chunks(self.clean(chunk) for chunk in chunks)
+        if state is None:
+            raise ValueError(f"No rows found in {path}")
+        return summary_engine.finalize_summary(state, trend_days=self.trend_days)
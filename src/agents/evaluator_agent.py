@@ -1,35 +1,70 @@
 import json
 import os
+import re
+import numpy as np
+import pandas as pd
+from src.utils.bootstrap import Bootstrap, interval
+from src.utils.metric_cache import MetricCache
+from src.utils.rule_registry import Rule, RuleRegistry
+
+# Segment dimensions checked in segment mode; multi-column entries are crossed
+DEFAULT_SEGMENT_DIMENSIONS = [["campaign_name"], ["platform"], ["country"]]
+# Frame columns the validators read (segment dimensions come on top)
+FRAME_COLUMNS = ["date", "roas", "ctr", "platform", "country", "spend"]
+# Dimensions of the InsightAgent's ROAS drilldown segments
+DRILLDOWN_DIMENSIONS = ("platform", "country")
 
 class EvaluatorAgent:
-    def __init__(self, model=None):
+    def __init__(self, model=None, random_seed=42, n_resamples=10000, bootstrap_workers=0, trend_days=7, min_segment_rows=5):
         """Initialize Evaluator Agent"""
         self.model = model
         self.prompt_template = self._load_prompt("prompts/evaluator_prompt.md")
         self.confidence_threshold = 0.6
+        # Number of most recent dates in the ROAS trend window
+        self.trend_days = trend_days
+        # Confidence is the bootstrap probability that the hypothesis holds
+        self.bootstrap = Bootstrap(seed=random_seed, n_resamples=n_resamples, workers=bootstrap_workers)
+        # Segment samples with fewer rows than this don't validate (resampling one row is always certain)
+        self.min_segment_rows = min_segment_rows
+        # Hypothesis validators; add more with self.rules.register(Rule(...))
+        self.rules = RuleRegistry(self._default_rules())
     
     def _load_prompt(self, filepath):
         """Load prompt template from file"""
         with open(filepath, 'r', encoding='utf-8') as f:
             return f.read()
     
-    def evaluate(self, df, insights):
+    def evaluate(self, df, insights, metrics=None, segments=None):
         """
         Validate hypotheses quantitatively using DataFrame
         Returns only insights with confidence >= threshold
+
+        Base aggregates are memoized in ``metrics`` (a MetricCache over df),
+        so each is computed at most once however many hypotheses use it.
+        Pass a shared cache to reuse them across calls on the same frame.
+
+        ``segments`` (a list of column lists, e.g. [["campaign_name", "country"]])
+        also validates each hypothesis per segment; validated insights then
+        carry the segments it holds for and how many were checked.
         """
+        if metrics is None:
+            metrics = MetricCache(df)
         evaluated = []
 
-        for item in insights:
+        # Match every hypothesis first so the metrics its rule needs are computed up front
+        matched = [self.rules.match(self._hypothesis_text(item), item.get("category")) for item in insights]
+        self._prefetch(metrics, matched)
+
+        for item, rule in zip(insights, matched):
             hypothesis = item.get("hypothesis", item.get("insight", ""))
             reasoning = item.get("reasoning", item.get("reason", ""))
             
             # Perform quantitative validation
-            validation_result = self._validate_hypothesis(df, item)
+            validation_result = self._validate_hypothesis(metrics, item, rule)
             
             # Only include if confidence meets threshold
             if validation_result["confidence"] >= self.confidence_threshold:
-                evaluated.append({
+                validated = {
                     "hypothesis": hypothesis,
                     "reasoning": reasoning,
                     "validation_evidence": validation_result["evidence"],
@@ -37,74 +72,445 @@ class EvaluatorAgent:
                     "metrics_checked": validation_result["metrics"],
                     "validation_method": validation_result["method"],
                     "status": "validated"
-                })
+                }
+                if segments:
+                    validated.update(self.validate_segments(metrics, item, segments, rule))
+                evaluated.append(validated)
 
         return evaluated
+
+    def prevalidate(self, metrics, insight, segments=None):
+        """
+        Compute what validating one insight reads (metrics, bootstraps,
+        segment tables) into ``metrics``, e.g. while later insights are still
+        being generated. A following ``evaluate`` on the same cache then
+        finds them memoized.
+        """
+        rule = self.rules.match(self._hypothesis_text(insight), insight.get("category"))
+        self._prefetch(metrics, [rule])
+        self._validate_hypothesis(metrics, insight, rule)
+        if segments:
+            self.validate_segments(metrics, insight, segments, rule)
+
+    def validate_segments(self, cache, insight, dimensions=None, rule=None):
+        """
+        Check one hypothesis in every segment of each dimension at once.
+
+        Each validator is a single grouped computation over the whole frame
+        (no per-segment slicing). Returns {"segments_checked", "segments"},
+        where ``segments`` lists the segments meeting the confidence
+        threshold, strongest first.
+        """
+        rule = rule or self.rules.match(self._hypothesis_text(insight), insight.get("category"))
+        checked = 0
+        holding = []
+        for keys in dimensions or DEFAULT_SEGMENT_DIMENSIONS:
+            keys = tuple(keys)
+            # Every hypothesis of the same kind shares one result per dimension
+            segment_checked, segment_holding = cache.memo(
+                ("segments", rule.name if rule else None, keys, self.confidence_threshold),
+                lambda: self._segment_results(cache, rule, keys)
+            )
+            checked += segment_checked
+            holding.extend(segment_holding)
+        holding.sort(key=lambda s: s["confidence"], reverse=True)
+        return {"segments_checked": checked, "segments": holding}
+
+    def _segment_results(self, cache, rule, keys):
+        """(segments checked, passing segment records) for one validator and dimension"""
+        if rule is None or rule.segments is None or not set(keys) <= set(cache.df.columns):
+            return 0, []
+        table = rule.segments(cache, keys)
+        if table is None:
+            return 0, []
+        passing = table[table["confidence"] >= self.confidence_threshold]
+        dimension = " × ".join(keys)
+        return len(table), [
+            {
+                "dimension": dimension,
+                "segment": " / ".join(map(str, segment)) if isinstance(segment, tuple) else str(segment),
+                "confidence": round(float(row.confidence), 2),
+                "evidence": row.evidence
+            }
+            for segment, row in zip(passing.index, passing.itertuples(index=False))
+        ]
+
+    def _default_rules(self):
+        """Built-in validators, in priority order"""
+        return [
+            Rule("roas_concentration", [["roas"], ["concentrated"]], self._validate_roas_concentration,
+                 categories=["roas_concentration"], metrics=[("roas_trend", self.trend_days)]),
+            Rule("roas_decline", [["roas"], ["decreas", "drop", "decline"]], self._validate_roas_decline,
+                 categories=["roas_decline"], metrics=[("roas_trend", self.trend_days)],
+                 segments=self._segments_roas_decline),
+            Rule("low_ctr", [["ctr"], ["low", "below"]], self._validate_low_ctr,
+                 categories=["ctr_issue"], metrics=[("ctr_mean",), ("ctr_below_pct", 0.02)],
+                 segments=self._segments_low_ctr),
+            Rule("platform_comparison", [["platform"], ["perform", "better"]], self._validate_platform_comparison,
+                 categories=["platform_efficiency"], metrics=[("roas_by_platform",)],
+                 segments=self._segments_platform_comparison),
+            Rule("spend_correlation", [["spend"]], self._validate_spend_correlation,
+                 metrics=[("spend_roas_corr",)],
+                 segments=self._segments_spend_correlation)
+        ]
+
+    def _hypothesis_text(self, insight):
+        """Hypothesis text of an insight (LLM output may use either key)"""
+        return insight.get("hypothesis", insight.get("insight", ""))
+
+    def _prefetch(self, cache, rules):
+        """Compute each metric the matched rules declare, once"""
+        for spec in dict.fromkeys(m for rule in rules if rule for m in rule.metrics):
+            cache.get(*spec)
+
+    # Segment validators: confidence is the share of bootstrap resamples in
+    # which the hypothesis holds for the segment, the segments of a table
+    # resampled together in bounded batches (see Bootstrap.iter_segment_sums).
+    # Segments where the observed value already contradicts the hypothesis
+    # are capped below the threshold like the account-wide checks, so only
+    # the others are resampled.
+
+    def _segments_roas_decline(self, cache, keys):
+        trend = cache.get("roas_trend_by", keys, self.trend_days)
+        declined = (trend["days"] >= 2) & (trend["last"] < trend["first"])
+        probability = self._aligned(self._bootstrap_segment_decline(cache, keys, trend.index[declined]), trend.index)
+        trend = trend.assign(confidence=np.where(declined, probability, 0.2), probability=probability)
+        return self._with_evidence(trend, lambda r: (
+            f"ROAS dropped from {r.first:.2f} to {r.last:.2f} "
+            f"({(r.first - r.last) / r.first * 100:.1f}% decline) over its last {int(r.days)} days; "
+            f"held in {r.probability:.0%} of bootstrap resamples."
+        ))
+
+    def _segments_low_ctr(self, cache, keys):
+        ctr = cache.get("ctr_by", keys, 0.02)
+        below = ctr["mean"] < 0.02
+        probability = self._aligned(self._bootstrap_segment_below(cache, keys, ctr.index[below], "ctr", 0.02), ctr.index)
+        ctr = ctr.assign(confidence=np.where(below, probability, 0.3), probability=probability)
+        return self._with_evidence(ctr, lambda r: (
+            f"CTR mean is {r.mean:.4f}, below 0.02 threshold in {r.probability:.0%} of bootstrap resamples. "
+            f"{r.pct_below:.1f}% of rows have CTR < 2%."
+        ))
+
+    def _segments_platform_comparison(self, cache, keys):
+        if "platform" in keys:
+            return None
+        platform_roas = cache.get("platform_roas_by", keys)
+        compared = platform_roas[platform_roas.notna().sum(axis=1) >= 2]
+        table = compared.assign(
+            best=compared.idxmax(axis=1), worst=compared.idxmin(axis=1),
+            best_roas=compared.max(axis=1), worst_roas=compared.min(axis=1)
+        )
+        probability = self._aligned(self._bootstrap_segment_difference(cache, keys, table), table.index)
+        table = table.assign(confidence=probability, probability=probability)
+        return self._with_evidence(table, lambda r: (
+            f"{r.best} avg ROAS: {r.best_roas:.2f}, {r.worst} avg ROAS: {r.worst_roas:.2f} "
+            f"({(r.best_roas - r.worst_roas) / r.worst_roas * 100:.1f}% difference; "
+            f"{r.best} ahead in {r.probability:.0%} of bootstrap resamples)"
+        ))
+
+    def _segments_spend_correlation(self, cache, keys):
+        corr = cache.get("spend_roas_corr_by", keys).to_frame("correlation")
+        strong = corr["correlation"].abs() > 0.3
+        probability = self._aligned(self._bootstrap_segment_correlation(cache, keys, corr.index[strong], 0.3), corr.index)
+        corr = corr.assign(confidence=np.where(strong, probability, 0.4))
+        return self._with_evidence(corr, lambda r: f"Spend-ROAS correlation: {r.correlation:.3f}")
+
+    def _with_evidence(self, table, describe):
+        """Attach evidence text, formatted only for segments that pass the threshold"""
+        passing = table["confidence"] >= self.confidence_threshold
+        evidence = [describe(r) for r in table[passing].itertuples()]
+        table = table.assign(evidence="")
+        table.loc[passing, "evidence"] = evidence
+        return table
     
-    def _validate_hypothesis(self, df, insight):
-        """Validate individual hypothesis against DataFrame"""
-        hypothesis = insight.get("hypothesis", insight.get("insight", "")).lower()
-        confidence = 0.7  # Base confidence
-        evidence = ""
-        metrics = []
-        method = "threshold_test"
-        
-        # Validation 1: ROAS decline
-        if "roas" in hypothesis and ("decreas" in hypothesis or "drop" in hypothesis or "decline" in hypothesis):
-            trend = df.groupby("date")["roas"].mean().tail(7)
-            if len(trend) >= 2 and trend.iloc[-1] < trend.iloc[0]:
-                decline_pct = ((trend.iloc[0] - trend.iloc[-1]) / trend.iloc[0]) * 100
-                evidence = f"ROAS dropped from {trend.iloc[0]:.2f} to {trend.iloc[-1]:.2f} ({decline_pct:.1f}% decline). Confirmed via 7-day trend analysis."
-                confidence = 0.92
-                metrics = ["roas", "date"]
-                method = "trend_confirmation"
-            else:
-                evidence = "No ROAS decline detected in data."
-                confidence = 0.2
-
-        # Validation 2: Low CTR
-        elif "ctr" in hypothesis and ("low" in hypothesis or "below" in hypothesis):
-            avg_ctr = df["ctr"].mean()
-            if avg_ctr < 0.02:
-                pct_below = (df["ctr"] < 0.02).sum() / len(df) * 100
-                evidence = f"CTR mean is {avg_ctr:.4f}, below 0.02 threshold. {pct_below:.1f}% of campaigns have CTR < 2%."
-                confidence = 0.86
-                metrics = ["ctr"]
-                method = "threshold_test"
-            else:
-                evidence = f"CTR mean is {avg_ctr:.4f}, above threshold."
-                confidence = 0.3
-
-        # Validation 3: Platform performance
-        elif "platform" in hypothesis and ("perform" in hypothesis or "better" in hypothesis):
-            platform_roas = df.groupby("platform")["roas"].mean()
-            if len(platform_roas) >= 2:
-                best = platform_roas.idxmax()
-                worst = platform_roas.idxmin()
-                diff_pct = ((platform_roas[best] - platform_roas[worst]) / platform_roas[worst]) * 100
-                evidence = f"{best} avg ROAS: {platform_roas[best]:.2f}, {worst} avg ROAS: {platform_roas[worst]:.2f} ({diff_pct:.1f}% difference)"
-                confidence = 0.89
-                metrics = ["platform", "roas"]
-                method = "comparative_analysis"
-
-        # Validation 4: Spend correlation
-        elif "spend" in hypothesis:
-            correlation = df[["spend", "roas"]].corr().iloc[0, 1]
-            evidence = f"Spend-ROAS correlation: {correlation:.3f}"
-            confidence = 0.75 if abs(correlation) > 0.3 else 0.4
-            metrics = ["spend", "roas"]
-            method = "correlation"
-
-        # Default validation
+    def _validate_hypothesis(self, cache, insight, rule=None):
+        """Validate individual hypothesis against cached DataFrame metrics"""
+        rule = rule or self.rules.match(self._hypothesis_text(insight), insight.get("category"))
+        if rule is None:
+            # Default validation
+            result = {
+                "confidence": insight.get("confidence", 0.7),
+                "evidence": "Generic validation applied.",
+                "metrics": insight.get("evidence_metrics", []),
+                "method": "rule_based"
+            }
         else:
-            evidence = "Generic validation applied."
-            confidence = insight.get("confidence", 0.7)
-            metrics = insight.get("evidence_metrics", [])
-            method = "rule_based"
+            result = rule.validate(cache, insight)
+        result["confidence"] = round(result["confidence"], 2)
+        return result
+
+    def _validate_roas_decline(self, cache, insight):
+        """Trend confirmation: last day of the trend window below the first"""
+        trend = cache.get("roas_trend", self.trend_days).dropna()
+        if len(trend) < 2:
+            return {"confidence": 0.2, "evidence": "No ROAS decline detected in data.", "metrics": [], "method": "threshold_test"}
+        test = self._bootstrapped(cache, ("roas_decline", self.trend_days), lambda: self._bootstrap_decline(cache, trend.index[0], trend.index[-1]))
+        if trend.iloc[-1] >= trend.iloc[0]:
+            return {
+                "confidence": min(test["probability"], 0.2),
+                "evidence": "No ROAS decline detected in data.",
+                "metrics": [],
+                "method": "threshold_test"
+            }
+        decline_pct = ((trend.iloc[0] - trend.iloc[-1]) / trend.iloc[0]) * 100
+        low, high = test["interval"]
+        return {
+            "confidence": test["probability"],
+            "evidence": (
+                f"ROAS dropped from {trend.iloc[0]:.2f} to {trend.iloc[-1]:.2f} ({decline_pct:.1f}% decline, "
+                f"95% CI {low:.1f}% to {high:.1f}%). Confirmed via {self.trend_days}-day trend analysis; "
+                f"the decline held in {test['probability']:.0%} of {self.bootstrap.n_resamples} bootstrap resamples."
+            ),
+            "metrics": ["roas", "date"],
+            "method": "trend_confirmation"
+        }
+
+    def _validate_roas_concentration(self, cache, insight):
+        """Segment comparison: the named platform/country's ROAS fell further than the rest of the account's"""
+        segment = self._drilldown_segment(insight)
+        trend = cache.get("roas_trend", self.trend_days).dropna()
+        missing = {"confidence": 0.0, "evidence": "Segment not found in the data.", "metrics": [], "method": "segment_comparison"}
+        if segment is None or len(trend) < 2 or not set(DRILLDOWN_DIMENSIONS) <= set(cache.df.columns):
+            return missing
+        cells = cache.get("roas_trend_by", DRILLDOWN_DIMENSIONS, self.trend_days)
+        if segment not in cells.index or cells.at[segment, "days"] < 2:
+            return missing
+        first, last = cells.at[segment, "first"], cells.at[segment, "last"]
+        test = self._bootstrapped(cache, ("roas_concentration", segment, self.trend_days),
+                                  lambda: self._bootstrap_concentration(cache, segment, trend.index[0], trend.index[-1]))
+        name = " / ".join(segment)
+        if last >= first:
+            return {
+                "confidence": min(test["probability"], 0.2),
+                "evidence": f"No ROAS decline on {name}: {first:.2f} to {last:.2f}.",
+                "metrics": [],
+                "method": "segment_comparison"
+            }
+        low, high = test["interval"]
+        return {
+            "confidence": test["probability"],
+            "evidence": (
+                f"{name} ROAS dropped from {first:.2f} to {last:.2f} ({(first - last) / first * 100:.1f}% decline, "
+                f"95% CI {low:.1f}% to {high:.1f}%) vs {(trend.iloc[0] - trend.iloc[-1]) / trend.iloc[0] * 100:.1f}% account-wide; "
+                f"steeper than the rest of the account in {test['probability']:.0%} of bootstrap resamples."
+            ),
+            "metrics": ["roas", "platform", "country", "date"],
+            "method": "segment_comparison"
+        }
+
+    def _drilldown_segment(self, insight):
+        """(platform, country) a drilldown insight names, from its ``segment`` field or its text"""
+        segment = insight.get("segment")
+        if isinstance(segment, dict) and all(segment.get(key) for key in DRILLDOWN_DIMENSIONS):
+            return tuple(str(segment[key]) for key in DRILLDOWN_DIMENSIONS)
+        found = re.search(r"concentrated (?:on|in) (.+?) in (.+?)\.?$", self._hypothesis_text(insight).strip())
+        return (found.group(1), found.group(2)) if found else None
 
+    def _validate_low_ctr(self, cache, insight):
+        """Threshold test: mean CTR below 0.02"""
+        avg_ctr = cache.get("ctr_mean")
+        test = self._bootstrapped(cache, "low_ctr", lambda: self._bootstrap_below(cache, "ctr", 0.02))
+        low, high = test["interval"]
+        if avg_ctr >= 0.02:
+            return {
+                "confidence": min(test["probability"], 0.3),
+                "evidence": f"CTR mean is {avg_ctr:.4f} (95% CI {low:.4f} to {high:.4f}), above threshold.",
+                "metrics": [],
+                "method": "threshold_test"
+            }
+        pct_below = cache.get("ctr_below_pct", 0.02)
         return {
-            "confidence": round(confidence, 2),
-            "evidence": evidence,
-            "metrics": metrics,
-            "method": method
+            "confidence": test["probability"],
+            "evidence": (
+                f"CTR mean is {avg_ctr:.4f} (95% CI {low:.4f} to {high:.4f}), below 0.02 threshold "
+                f"in {test['probability']:.0%} of bootstrap resamples. {pct_below:.1f}% of campaigns have CTR < 2%."
+            ),
+            "metrics": ["ctr"],
+            "method": "threshold_test"
         }
+
+    def _validate_platform_comparison(self, cache, insight):
+        """Comparative analysis: best vs. worst platform mean ROAS"""
+        platform_roas = cache.get("roas_by_platform")
+        if len(platform_roas) < 2:
+            return {"confidence": 0.7, "evidence": "", "metrics": [], "method": "threshold_test"}
+        best = platform_roas.idxmax()
+        worst = platform_roas.idxmin()
+        diff_pct = ((platform_roas[best] - platform_roas[worst]) / platform_roas[worst]) * 100
+        test = self._bootstrapped(cache, "platform_comparison", lambda: self._bootstrap_difference(cache, best, worst))
+        low, high = test["interval"]
+        return {
+            "confidence": test["probability"],
+            "evidence": (
+                f"{best} avg ROAS: {platform_roas[best]:.2f}, {worst} avg ROAS: {platform_roas[worst]:.2f} "
+                f"({diff_pct:.1f}% difference, 95% CI {low:.1f}% to {high:.1f}%; "
+                f"{best} ahead in {test['probability']:.0%} of bootstrap resamples)"
+            ),
+            "metrics": ["platform", "roas"],
+            "method": "comparative_analysis"
+        }
+
+    def _validate_spend_correlation(self, cache, insight):
+        """Correlation: |spend-ROAS r| above 0.3"""
+        correlation = cache.get("spend_roas_corr")
+        test = self._bootstrapped(cache, "spend_correlation", lambda: self._bootstrap_correlation(cache, 0.3))
+        low, high = test["interval"]
+        return {
+            "confidence": test["probability"] if abs(correlation) > 0.3 else min(test["probability"], 0.4),
+            "evidence": f"Spend-ROAS correlation: {correlation:.3f} (95% CI {low:.3f} to {high:.3f})",
+            "metrics": ["spend", "roas"],
+            "method": "correlation"
+        }
+
+    def _bootstrapped(self, cache, name, compute):
+        """Memoize a bootstrap test on the frame's cache (keyed by seed and resample count)"""
+        return cache.memo(("bootstrap", name, self.bootstrap.seed, self.bootstrap.n_resamples), compute)
+
+    def _bootstrap_decline(self, cache, first_date, last_date):
+        """P(last day's mean ROAS < first day's) and CI of the decline percent"""
+        roas = cache.df["roas"].to_numpy(dtype="float64")
+        index = cache.get("date_index")
+        first_rows, last_rows = roas[index.day_rows(first_date)], roas[index.day_rows(last_date)]
+        first = self.bootstrap.resample_means(f"roas:{first_date}", first_rows[~np.isnan(first_rows)])
+        last = self.bootstrap.resample_means(f"roas:{last_date}", last_rows[~np.isnan(last_rows)])
+        return {"probability": float(np.mean(last < first)), "interval": interval((first - last) / first * 100)}
+
+    def _bootstrap_concentration(self, cache, segment, first_date, last_date):
+        """P(the segment's ROAS decline % exceeds the rest of the account's) and CI of the segment's decline"""
+        roas = cache.df["roas"].to_numpy(dtype="float64")
+        in_segment = np.logical_and.reduce([(cache.df[key] == value).to_numpy() for key, value in zip(DRILLDOWN_DIMENSIONS, segment)])
+        index = cache.get("date_index")
+        means = {}
+        for day, date in (("first", first_date), ("last", last_date)):
+            rows = index.day_rows(date)
+            for part, mask in (("segment", in_segment[rows]), ("rest", ~in_segment[rows])):
+                values = roas[rows][mask]
+                values = values[~np.isnan(values)]
+                if len(values) == 0:
+                    return {"probability": 0.0, "interval": (float("nan"), float("nan"))}
+                means[part, day] = self.bootstrap.resample_means(f"roas:{part}:{'/'.join(segment)}:{date}", values)
+        decline = {part: (means[part, "first"] - means[part, "last"]) / means[part, "first"] * 100 for part in ("segment", "rest")}
+        return {
+            "probability": float(np.mean((decline["segment"] > decline["rest"]) & (decline["segment"] > 0))),
+            "interval": interval(decline["segment"])
+        }
+
+    def _bootstrap_below(self, cache, column, threshold):
+        """P(column mean < threshold) and CI of the mean"""
+        means = self.bootstrap.resample_means(column, cache.df[column].dropna())
+        return {"probability": float(np.mean(means < threshold)), "interval": interval(means)}
+
+    def _bootstrap_difference(self, cache, best, worst):
+        """P(best platform's mean ROAS > worst's) and CI of the percent difference"""
+        df = cache.df
+        best_means = self.bootstrap.resample_means(f"roas:{best}", df.loc[df["platform"] == best, "roas"].dropna())
+        worst_means = self.bootstrap.resample_means(f"roas:{worst}", df.loc[df["platform"] == worst, "roas"].dropna())
+        return {
+            "probability": float(np.mean(best_means > worst_means)),
+            "interval": interval((best_means - worst_means) / worst_means * 100)
+        }
+
+    def _bootstrap_segment_decline(self, cache, keys, segments):
+        """Per segment: P(mean ROAS on its last day in the trend window < on its first day)"""
+        codes = self._segment_rows(cache, keys, segments)
+        positions, day_numbers = cache.get("date_index").window_rows(self.trend_days)
+        roas = cache.df["roas"].to_numpy(dtype="float64")[positions]
+        codes = np.where(np.isnan(roas), -1, codes[positions])
+        # Each segment's own first and last day with data, like roas_trend_by
+        first_day = np.full(len(segments), np.iinfo("int64").max)
+        last_day = np.full(len(segments), -1)
+        rows = codes >= 0
+        np.minimum.at(first_day, codes[rows], day_numbers[rows])
+        np.maximum.at(last_day, codes[rows], day_numbers[rows])
+        at_first = rows & (day_numbers == first_day[np.maximum(codes, 0)])
+        at_last = rows & (day_numbers == last_day[np.maximum(codes, 0)])
+        first = self._segment_means(f"roas_first:{keys}", np.where(at_first, codes, -1), roas, len(segments))
+        last = self._segment_means(f"roas_last:{keys}", np.where(at_last, codes, -1), roas, len(segments), stream=1)
+        probabilities = np.zeros(len(segments))
+        for (batch, first_means), (_, last_means) in zip(first, last):
+            probabilities[batch] = _share(last_means < first_means, ~np.isnan(first_means) & ~np.isnan(last_means))
+        return pd.Series(probabilities, index=segments)
+
+    def _bootstrap_segment_below(self, cache, keys, segments, column, threshold):
+        """Per segment: P(column mean < threshold)"""
+        values = cache.df[column].to_numpy(dtype="float64")
+        codes = np.where(np.isnan(values), -1, self._segment_rows(cache, keys, segments))
+        probabilities = np.zeros(len(segments))
+        for batch, means in self._segment_means(f"{column}:{keys}", codes, values, len(segments)):
+            probabilities[batch] = _share(means < threshold, ~np.isnan(means))
+        return pd.Series(probabilities, index=segments)
+
+    def _bootstrap_segment_difference(self, cache, keys, table):
+        """Per segment of ``table``: P(its best platform's mean ROAS > its worst's)"""
+        platform_codes, platforms = pd.factorize(cache.df["platform"])
+        number = {platform: i for i, platform in enumerate(platforms)}
+        best = np.array([number.get(platform, -2) for platform in table["best"]] + [-2])
+        worst = np.array([number.get(platform, -2) for platform in table["worst"]] + [-2])
+        roas = cache.df["roas"].to_numpy(dtype="float64")
+        codes = np.where(np.isnan(roas), -1, self._segment_rows(cache, keys, table.index))
+        # codes of -1 pick the trailing -2, which matches no platform
+        best_batches = self._segment_means(f"roas_best:{keys}", np.where(platform_codes == best[codes], codes, -1), roas, len(table))
+        worst_batches = self._segment_means(f"roas_worst:{keys}", np.where(platform_codes == worst[codes], codes, -1), roas, len(table), stream=1)
+        probabilities = np.zeros(len(table))
+        for (batch, best_means), (_, worst_means) in zip(best_batches, worst_batches):
+            probabilities[batch] = _share(best_means > worst_means, ~np.isnan(best_means) & ~np.isnan(worst_means))
+        return pd.Series(probabilities, index=table.index)
+
+    def _bootstrap_segment_correlation(self, cache, keys, segments, strength):
+        """Per segment: P(|spend-ROAS correlation| > strength)"""
+        x = cache.df["spend"].to_numpy(dtype="float64")
+        y = cache.df["roas"].to_numpy(dtype="float64")
+        codes = np.where(np.isnan(x) | np.isnan(y), -1, self._segment_rows(cache, keys, segments))
+        codes = self._min_rows(codes, len(segments))
+        x, y = np.nan_to_num(x), np.nan_to_num(y)
+        probabilities = np.zeros(len(segments))
+        for batch, sums in self.bootstrap.iter_segment_sums(f"spend_roas:{keys}", codes, np.column_stack([x, y, x * y, x * x, y * y]), len(segments)):
+            n, sx, sy, sxy, sxx, syy = np.moveaxis(sums, -1, 0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                r = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx ** 2) * (n * syy - sy ** 2))
+            probabilities[batch] = _share(np.abs(r) > strength, ~np.isnan(r))
+        return pd.Series(probabilities, index=segments)
+
+    def _segment_rows(self, cache, keys, segments):
+        """Each row's position in ``segments`` (labels of the keys' segments), -1 for other rows"""
+        codes, labels = cache.get("segment_codes", keys)
+        position = {label: i for i, label in enumerate(segments)}
+        # One extra slot so rows without a segment (-1) stay -1
+        remap = np.array([position.get(label, -1) for label in labels] + [-1])
+        return remap[codes]
+
+    def _segment_means(self, name, codes, values, n_segments, stream=0):
+        """
+        Yield (segment slice, (batch x resamples) bootstrap means) in bounded
+        batches; NaN where a resample drew none of the segment's rows
+        """
+        codes = self._min_rows(codes, n_segments)
+        for batch, sums in self.bootstrap.iter_segment_sums(f"segments:{name}", codes, np.nan_to_num(values), n_segments, stream):
+            with np.errstate(invalid="ignore", divide="ignore"):
+                yield batch, sums[..., 1] / sums[..., 0]
+
+    def _min_rows(self, codes, n_segments):
+        """Drop the rows of segments with fewer than ``min_segment_rows`` rows (they never hold)"""
+        sizes = np.bincount(codes[codes >= 0], minlength=n_segments)
+        return np.where((codes >= 0) & (sizes[np.maximum(codes, 0)] >= self.min_segment_rows), codes, -1)
+
+    def _aligned(self, values, index):
+        """Values of a per-segment Series in the order of another table's index (0 where absent)"""
+        lookup = dict(zip(values.index, values.to_numpy()))
+        return np.array([lookup.get(key, 0.0) for key in index], dtype="float64")
+
+    def _bootstrap_correlation(self, cache, strength):
+        """P(|spend-ROAS correlation| > strength) and CI of the correlation"""
+        pairs = cache.df[["spend", "roas"]].dropna().to_numpy(dtype="float64")
+        x, y = pairs[:, 0], pairs[:, 1]
+        sums = self.bootstrap.resample_sums("spend_roas", np.column_stack([x, y, x * y, x * x, y * y]))
+        n, sx, sy, sxy, sxx, syy = sums.T
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx ** 2) * (n * syy - sy ** 2))
+        return {"probability": float(np.mean(np.abs(r) > strength)), "interval": interval(r)}
+
+
+def _share(holds, valid):
+    """Per row of a (segments x resamples) array: share of valid resamples in which ``holds``"""
+    counts = valid.sum(axis=1)
+    return np.where(counts > 0, (holds & valid).sum(axis=1) / np.maximum(counts, 1), 0.0)
@@ -1,10 +1,18 @@
-import json
 import os
+from src.llm.client import LLMClient, LLMDeadlineExceeded
+from src.llm.json_stream import ObjectArrayParser
+from src.llm.prompt_encoder import PromptEncoder, INSIGHT_PRIORITY, INSIGHT_FIELDS, estimate_tokens, render_template
 
 class InsightAgent:
-    def __init__(self, model=None):
-        """Initialize Insight Agent with LLM model"""
+    def __init__(self, model=None, token_budget=None, deadline=None):
+        """Initialize Insight Agent with LLM model (deadline: seconds before falling back)"""
         self.model = model
+        self.deadline = deadline
+        # Shared client (timeouts, retries, concurrency limit) around the model
+        self.llm = LLMClient.wrap(model)
+        # Compact summary serialization, trimmed to the per-agent token budget
+        self.encoder = PromptEncoder(INSIGHT_PRIORITY, token_budget=token_budget)
+        self.last_prompt_stats = None
         self.prompt_template = self._load_prompt("prompts/insight_prompt.md")
     
     def _load_prompt(self, filepath):
@@ -12,35 +20,66 @@ class InsightAgent:
         with open(filepath, 'r', encoding='utf-8') as f:
             return f.read()
     
-    def generate_insights(self, summary):
-        """Generate hypotheses using LLM or fallback to rule-based"""
+    def generate_insights(self, summary, cube=None, on_insight=None):
+        """
+        Generate hypotheses using LLM or fallback to rule-based (drilling into the rollup cube if given)
+
+        The response is streamed and ``on_insight(item)`` is called for each
+        hypothesis as soon as its JSON object is complete, so validation can
+        start before generation ends. If the response is cut off, the
+        complete hypotheses are kept; only an answer without any falls back.
+        """
         if not self.model:
-            return self._fallback_insights(summary)
+            return self._emit(self._fallback_insights(summary, cube), on_insight)
+        
+        # Fill prompt with compact data summary
+        data_summary, prompt_stats = self.encoder.encode(summary, fields=INSIGHT_FIELDS)
+        filled_prompt = render_template(self.prompt_template, data_summary=data_summary)
+        prompt_stats["prompt_tokens"] = estimate_tokens(filled_prompt)
+        self.last_prompt_stats = prompt_stats
+        
+        parser = ObjectArrayParser()
+        insights = []
         
-        # Fill prompt with data summary
-        filled_prompt = self.prompt_template.format(
-            data_summary=json.dumps(summary, indent=2)
-        )
+        def on_chunk(chunk):
+            for item in parser.feed(chunk):
+                insights.append(item)
+                if on_insight:
+                    on_insight(item)
         
         try:
-            # Generate insights using LLM
-            response = self.model.generate_content(filled_prompt)
-            insights_text = response.text.strip()
-            
-            # Extract JSON from response
-            if "```json" in insights_text:
-                insights_text = insights_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in insights_text:
-                insights_text = insights_text.split("```")[1].split("```")[0].strip()
-            
-            insights = json.loads(insights_text)
+            # Stream insights from the LLM, parsing the JSON array as it arrives
+            insights_text = self.llm.stream(filled_prompt, on_chunk, deadline=self.deadline)
+            prompt_stats["response_tokens"] = estimate_tokens(insights_text)
+            if not parser.done:
+                raise ValueError("response ended before the JSON array closed")
             return insights
         
+        except LLMDeadlineExceeded:
+            # The late answer is still cached for the next identical prompt
+            if insights:
+                print(f"⏱️ LLM insight generation exceeded its {self.deadline}s budget. Keeping {len(insights)} complete hypotheses.")
+                return insights
+            print(f"⏱️ LLM insight generation exceeded its {self.deadline}s budget. Using fallback.")
+            return self._emit(self._fallback_insights(summary, cube), on_insight)
+        
         except Exception as e:
+            # Don't keep serving a cached response that failed to parse
+            self.llm.invalidate(filled_prompt)
+            if insights:
+                print(f"⚠️ LLM insight response incomplete: {e}. Keeping {len(insights)} complete hypotheses.")
+                return insights
             print(f"⚠️ LLM insight generation failed: {e}. Using fallback.")
-            return self._fallback_insights(summary)
+            return self._emit(self._fallback_insights(summary, cube), on_insight)
+
+    def _emit(self, insights, on_insight):
+        """Pass already complete insights to the callback one by one"""
+        for item in insights:
+            if on_insight:
+                on_insight(item)
+        return insights
     
-    def _fallback_insights(self, summary):
+    def _fallback_insights(self, summary, cube=None):
         """Rule-based fallback insights if LLM fails"""
         insights = []
 
@@ -81,4 +120,35 @@ class InsightAgent:
                 "category": "platform_efficiency"
             })
 
+        # Where the ROAS decline is concentrated (needs the rollup cube)
+        drilldown = self._roas_drilldown(summary, cube)
+        if drilldown:
+            insights.append(drilldown)
+
         return insights
+
+    def _roas_drilldown(self, summary, cube):
+        """Platform x country segment with the steepest ROAS drop across the trend window"""
+        # The trend is already in calendar order (string sorting breaks non-ISO dates)
+        dates = list(summary.get("roas_trend_7d") or {})
+        if cube is None or len(dates) < 2 or not cube.has("platform", "country", "date"):
+            return None
+
+        first, last = dates[0], dates[-1]
+        # Mean row ROAS, like the summary trend and the evaluator's check
+        daily = cube.query(by=["platform", "country", "date"], where={"date": [first, last]})["avg_roas"].unstack("date")
+        if first not in daily or last not in daily:
+            return None
+        change = ((daily[last] - daily[first]) / daily[first]).dropna()
+        if change.empty or change.min() >= 0:
+            return None
+
+        platform, country = change.idxmin()
+        return {
+            "hypothesis": f"ROAS decline is concentrated on {platform} in {country}",
+            "reasoning": f"THINK: {platform}/{country} ROAS went from {daily.at[(platform, country), first]:.2f} on {first} to {daily.at[(platform, country), last]:.2f} on {last} ({change.min():.0%}), the steepest drop of any platform-country segment. ANALYZE: A localized drop points to segment-specific causes rather than an account-wide trend. CONCLUDE: Review creatives and audiences running in this segment first.",
+            "confidence": 0.7,
+            "evidence_metrics": ["roas", "platform", "country", "date"],
+            "category": "roas_concentration",
+            "segment": {"platform": platform, "country": country}
+        }
@@ -1,11 +1,29 @@
 import json
 import os
-import google.generativeai as genai
+from src.utils.plan import validate_plan
+from src.llm.client import LLMClient, LLMDeadlineExceeded
+from src.llm.prompt_encoder import CREATIVE_FIELDS, INSIGHT_FIELDS, render_template
+
+# Summary fields each agent reads when running its rule-based logic
+AGENT_SUMMARY_FIELDS = {
+    "data_agent": ["total_campaigns"],
+    "insight_agent": ["roas_trend_7d", "avg_metrics", "platform_performance"],
+    "evaluator_agent": [],
+    "creative_generator": ["low_ctr_campaigns"]
+}
+# With a model, the fields the insight and creative prompts encode instead
+PROMPT_SUMMARY_FIELDS = {
+    "insight_agent": INSIGHT_FIELDS,
+    "creative_generator": CREATIVE_FIELDS
+}
 
 class PlannerAgent:
-    def __init__(self, model=None):
-        """Initialize Planner Agent with LLM model"""
+    def __init__(self, model=None, deadline=None):
+        """Initialize Planner Agent with LLM model (deadline: seconds before falling back)"""
         self.model = model
+        self.deadline = deadline
+        # Shared client (timeouts, retries, concurrency limit) around the model
+        self.llm = LLMClient.wrap(model)
         self.prompt_template = self._load_prompt("prompts/planner_prompt.md")
     
     def _load_prompt(self, filepath):
@@ -23,12 +41,11 @@ class PlannerAgent:
             return self._fallback_plan(user_query)
         
         # Fill prompt template with user query
-        filled_prompt = self.prompt_template.format(user_query=user_query)
+        filled_prompt = render_template(self.prompt_template, user_query=user_query)
         
         try:
             # Generate plan using LLM
-            response = self.model.generate_content(filled_prompt)
-            plan_text = response.text.strip()
+            plan_text = self.llm.generate(filled_prompt, deadline=self.deadline).strip()
             
             # Extract JSON from response (handle markdown code blocks)
             if "```json" in plan_text:
@@ -37,9 +54,20 @@ class PlannerAgent:
                 plan_text = plan_text.split("```")[1].split("```")[0].strip()
             
             plan = json.loads(plan_text)
+            # Reject plans with unknown dependencies or cycles (falls back below)
+            validate_plan(plan.get("subtasks", []))
+            if "summary_fields" not in plan:
+                plan["summary_fields"] = self.summary_fields(plan.get("subtasks", []))
             return plan
         
+        except LLMDeadlineExceeded:
+            # The late answer is still cached for the next identical query
+            print(f"⏱️ LLM planning exceeded its {self.deadline}s budget. Using fallback plan.")
+            return self._fallback_plan(user_query)
+        
         except Exception as e:
+            # Don't keep serving a cached response that failed to parse
+            self.llm.invalidate(filled_prompt)
             print(f"⚠️ LLM planning failed: {e}. Using fallback plan.")
             return self._fallback_plan(user_query)
     
@@ -56,8 +84,21 @@ class PlannerAgent:
         
         return {
             "user_query": query,
-            "subtasks": subtasks
+            "subtasks": subtasks,
+            "summary_fields": self.summary_fields(subtasks)
         }
+
+    def summary_fields(self, subtasks):
+        """
+        Summary fields the plan's agents read, so they can be computed up
+        front in one batch (with a model, the fields their prompts encode)
+        """
+        fields = []
+        for subtask in subtasks:
+            agent = subtask.get("agent")
+            declared = PROMPT_SUMMARY_FIELDS.get(agent) if self.model else None
+            fields.extend(f for f in declared or AGENT_SUMMARY_FIELDS.get(agent, []) if f not in fields)
+        return fields
     
     def plan(self, query):
         """Legacy method for backwards compatibility"""
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+def cache_key(model_name, generation_config, prompt):
+    """Content address of one request: model, generation params and rendered prompt"""
+    payload = json.dumps(
+        {"model": model_name, "params": generation_config or {}, "prompt": prompt},
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Persistent LLM response cache backed by SQLite.
+
+    Entries are keyed by ``cache_key`` and evicted least-recently-used once
+    the total size exceeds ``max_bytes``; entries older than ``max_age_s``
+    are treated as misses and purged. SQLite's file locking (WAL mode, busy
+    timeout) makes the cache safe to share between concurrent processes,
+    and each operation opens its own connection so threads never share one.
+    """
+
+    def __init__(self, path=".cache/llm/responses.sqlite", max_bytes=256 * 1024 * 1024, max_age_s=7 * 24 * 3600):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON responses (accessed_at)")
+
+    def get(self, key):
+        """Return the cached response text, or None on a miss or expired entry"""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM responses WHERE key = ? AND created_at >= ?",
+                (key, now - self.max_age_s)
+            ).fetchone()
+            if row is not None:
+                conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return row[0] if row is not None else None
+
+    def put(self, key, value):
+        """Store a response and evict old or least-recently-used entries"""
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now)
+            )
+            self._evict(conn, now)
+
+    def delete(self, key):
+        """Drop one entry (e.g. a response that turned out to be unusable)"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def stats(self):
+        """Hit/miss counters for this process plus current on-disk usage"""
+        with self._connect() as conn:
+            entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": total}
+
+    def _evict(self, conn, now):
+        """Purge expired rows, then the least recently used until under the size cap"""
+        conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.max_age_s,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        freed = 0
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at ASC"):
+            if total - freed <= self.max_bytes:
+                break
+            victims.append((key,))
+            freed += size
+        conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+
+    def _connect(self):
+        """New connection per operation; waits on locks held by other processes"""
+        return _ClosingConnection(sqlite3.connect(self.path, timeout=30))
+
+
+class _ClosingConnection:
+    """Context manager that commits (or rolls back) and always closes the connection"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.conn.commit()
+            else:
+                self.conn.rollback()
+        finally:
+            self.conn.close()
+        return False
@@ -0,0 +1,524 @@
+import asyncio
+import contextvars
+import queue
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+from src.llm.cache import ResponseCache, cache_key
+from src.utils.tracing import span
+
+# Provider exception class names worth retrying (google.api_core and friends),
+# matched by name so this module does not import any SDK
+TRANSIENT_ERROR_NAMES = {
+    "ResourceExhausted",
+    "TooManyRequests",
+    "ServiceUnavailable",
+    "InternalServerError",
+    "DeadlineExceeded",
+    "GatewayTimeout",
+    "Aborted"
+}
+
+
+# How calls ended: served from cache, answered by the first or the hedged
+# request, given up at the caller's deadline, failed; plus late answers cached
+PATHS = ("cache", "primary", "hedge", "deadline", "failed", "late_cached")
+
+
+class LLMTimeoutError(TimeoutError):
+    """Raised when a single LLM call exceeds its timeout"""
+
+
+class LLMDeadlineExceeded(Exception):
+    """Raised when a call runs past the caller's latency budget (never retried; callers fall back)"""
+
+
+def is_transient(error):
+    """True for rate limits, timeouts and 5xx-style provider errors"""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    return type(error).__name__ in TRANSIENT_ERROR_NAMES
+
+
+class LLMClient:
+    """
+    Shared, thread-safe wrapper around a ``generate_content`` model.
+
+    All agents call the provider through one client so that the number of
+    requests in flight is bounded by ``max_concurrency`` across the whole
+    run. Each attempt has a timeout, and transient errors are retried with
+    full-jitter exponential backoff; a retry first waits for the requests of
+    a timed-out attempt (and uses their answer if one comes), so retries of
+    one prompt never hold more than one slot. ``generate`` is the blocking entry
+    point; ``stream`` hands over text as it is generated, and
+    ``agenerate`` and ``generate_many`` let callers overlap calls.
+    With a ``ResponseCache`` attached, identical requests are served from
+    disk without contacting the provider.
+
+    ``deadline`` (seconds) bounds a whole call, including waits for a free
+    slot and retries; past it ``LLMDeadlineExceeded`` is raised at once so
+    the caller can use its rule-based fallback, while the request in flight
+    finishes in the background and its answer is cached for next time.
+    A slot is held by the worker running the provider request and freed
+    only when that request returns, so abandoned requests still count
+    against ``max_concurrency``. ``request_timeout`` is passed to the
+    provider as the limit for one whole request (streams stop reading at
+    it too), so abandoned requests end by then; workers are daemon threads
+    and never hold up interpreter exit.
+    With ``hedge_after`` set, a call with no answer (no first chunk when
+    streaming) after that many seconds sends one duplicate request if a
+    slot is free, and the first to answer wins; a losing stream stops at
+    its next chunk, a losing blocking call still runs to completion.
+    ``paths`` counts how calls ended (see PATHS).
+    """
+
+    def __init__(self, model, model_name="unknown", generation_config=None, max_concurrency=4,
+                 timeout=60.0, max_retries=3, backoff_base=1.0, backoff_max=20.0, cache=None, hedge_after=None,
+                 request_timeout=120.0):
+        self.model = model
+        self.model_name = model_name
+        self.generation_config = generation_config or {}
+        self.cache = cache
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_after = hedge_after
+        self.request_timeout = request_timeout
+        self.paths = dict.fromkeys(PATHS, 0)
+        self._paths_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    @classmethod
+    def from_config(cls, model, llm_config):
+        """Build a client from the ``llm`` section of config.yaml"""
+        generation_config = {}
+        if "temperature" in llm_config:
+            generation_config["temperature"] = llm_config["temperature"]
+        if "max_tokens" in llm_config:
+            generation_config["max_output_tokens"] = llm_config["max_tokens"]
+
+        cache = None
+        cache_config = llm_config.get("cache", {})
+        if cache_config.get("enabled", False):
+            cache = ResponseCache(
+                path=cache_config.get("path", ".cache/llm/responses.sqlite"),
+                max_bytes=int(cache_config.get("max_mb", 256) * 1024 * 1024),
+                max_age_s=cache_config.get("max_age_hours", 168) * 3600
+            )
+
+        return cls(
+            model,
+            model_name=llm_config.get("model", "unknown"),
+            generation_config=generation_config,
+            max_concurrency=llm_config.get("max_concurrency", 4),
+            timeout=llm_config.get("timeout_s", 60.0),
+            request_timeout=llm_config.get("request_timeout_s", 120.0),
+            max_retries=llm_config.get("max_retries", 3),
+            backoff_base=llm_config.get("backoff_base_s", 1.0),
+            cache=cache,
+            hedge_after=llm_config.get("hedge_after_s")
+        )
+
+    @classmethod
+    def wrap(cls, model):
+        """Return ``model`` as a client (None stays None, clients pass through)"""
+        if model is None or isinstance(model, cls):
+            return model
+        return cls(model)
+
+    def generate(self, prompt, deadline=None):
+        """Send one prompt and return the response text, retrying transient failures"""
+        with span("llm.generate", "llm", model=self.model_name, prompt_chars=len(prompt)) as s:
+            key = self._cache_key(prompt)
+            if key is not None:
+                cached = self.cache.get(key)
+                s.set(cache_hit=cached is not None)
+                if cached is not None:
+                    self._count("cache")
+                    s.set(response_chars=len(cached), path="cache")
+                    return cached
+
+            expires = time.perf_counter() + deadline if deadline is not None else None
+            attempt = 0
+            try:
+                while True:
+                    try:
+                        text, path = self._call_hedged(prompt, expires, key)
+                        break
+                    except LLMDeadlineExceeded:
+                        raise
+                    except Exception as e:
+                        if attempt >= self.max_retries or not is_transient(e):
+                            raise
+                        late = self._await_pending(getattr(e, "pending", ()), expires, key)
+                        if late is not None:
+                            text, path = late, "primary"
+                            break
+                        self._sleep_backoff(attempt, expires)
+                        attempt += 1
+            except LLMDeadlineExceeded:
+                self._count("deadline")
+                s.set(path="deadline", retries=attempt)
+                raise
+            except Exception:
+                self._count("failed")
+                raise
+            self._count(path)
+            s.set(response_chars=len(text), retries=attempt, path=path)
+
+            if key is not None:
+                self.cache.put(key, text)
+            return text
+
+    def stream(self, prompt, on_chunk, deadline=None):
+        """
+        Send one prompt, calling ``on_chunk(text)`` for each piece of the
+        response as it arrives; returns the full text.
+
+        The timeout applies to the wait for each chunk, not the whole
+        response; ``deadline`` bounds the whole call. Transient errors are
+        retried only until the first chunk has been delivered; after that
+        they propagate, and whatever ``on_chunk`` already received stays
+        with the caller. Only complete responses are cached (a cached one
+        arrives as a single chunk).
+        """
+        with span("llm.stream", "llm", model=self.model_name, prompt_chars=len(prompt)) as s:
+            key = self._cache_key(prompt)
+            if key is not None:
+                cached = self.cache.get(key)
+                s.set(cache_hit=cached is not None)
+                if cached is not None:
+                    self._count("cache")
+                    s.set(response_chars=len(cached), path="cache")
+                    on_chunk(cached)
+                    return cached
+
+            start = time.perf_counter()
+            expires = start + deadline if deadline is not None else None
+            parts = []
+            path = "primary"
+            attempt = 0
+            try:
+                while True:
+                    try:
+                        for chunk, path in self._stream_hedged(prompt, expires, key):
+                            if not parts:
+                                s.set(first_chunk_s=round(time.perf_counter() - start, 4))
+                            parts.append(chunk)
+                            on_chunk(chunk)
+                        break
+                    except LLMDeadlineExceeded:
+                        raise
+                    except Exception as e:
+                        if parts or attempt >= self.max_retries or not is_transient(e):
+                            raise
+                        self._await_pending(getattr(e, "pending", ()), expires)
+                        self._sleep_backoff(attempt, expires)
+                        attempt += 1
+            except LLMDeadlineExceeded:
+                self._count("deadline")
+                s.set(chunks=len(parts), response_chars=sum(map(len, parts)), retries=attempt, path="deadline")
+                raise
+            except Exception:
+                self._count("failed")
+                s.set(chunks=len(parts), response_chars=sum(map(len, parts)), retries=attempt)
+                raise
+            text = "".join(parts)
+            self._count(path)
+            s.set(chunks=len(parts), response_chars=len(text), retries=attempt, path=path)
+
+            if key is not None:
+                self.cache.put(key, text)
+            return text
+
+    def path_stats(self):
+        """Copy of the per-path call counts"""
+        with self._paths_lock:
+            return dict(self.paths)
+
+    def invalidate(self, prompt):
+        """Forget a cached response, e.g. when it could not be parsed"""
+        key = self._cache_key(prompt)
+        if key is not None:
+            self.cache.delete(key)
+
+    async def agenerate(self, prompt):
+        """Async variant of generate (runs the blocking call off the event loop)"""
+        return await asyncio.to_thread(self.generate, prompt)
+
+    def generate_many(self, prompts):
+        """Send several prompts concurrently; results keep the input order"""
+        async def gather():
+            return await asyncio.gather(*(self.agenerate(p) for p in prompts))
+        return list(asyncio.run(gather()))
+
+    def _cache_key(self, prompt):
+        """Cache key for ``prompt``, or None when caching is disabled"""
+        if self.cache is None:
+            return None
+        return cache_key(self.model_name, self.generation_config, prompt)
+
+    def _call_hedged(self, prompt, expires=None, key=None):
+        """
+        One attempt: returns (text, "primary" | "hedge"), raising
+        LLMTimeoutError after ``self.timeout`` and LLMDeadlineExceeded at
+        ``expires``. Provider calls cannot be interrupted, so abandoned ones
+        finish in the background on their slots, at most until the
+        provider's ``request_timeout`` (answers past the deadline are cached).
+        """
+        self._acquire(expires)
+        start = time.perf_counter()
+        futures = {self._submit(self._call, prompt): "primary"}
+        hedge_at = start + self.hedge_after if self.hedge_after is not None else None
+        error = None
+        while futures:
+            limits = [start + self.timeout] + [t for t in (expires, hedge_at) if t is not None]
+            done, _ = wait(list(futures), timeout=max(0.0, min(limits) - time.perf_counter()), return_when=FIRST_COMPLETED)
+            for future in done:
+                source = futures.pop(future)
+                if future.exception() is None:
+                    return future.result(), source
+                error = future.exception()
+            if not futures:
+                break
+            now = time.perf_counter()
+            if expires is not None and now >= expires:
+                self._cache_late(futures, key)
+                raise LLMDeadlineExceeded("LLM call ran past its deadline")
+            if now >= start + self.timeout:
+                error = LLMTimeoutError(f"LLM call exceeded {self.timeout}s")
+                # Still running on their slots; a retry waits for them first
+                error.pending = list(futures)
+                raise error
+            if hedge_at is not None and now >= hedge_at:
+                hedge_at = None
+                hedge = self._submit_hedge(self._call, prompt)
+                if hedge is not None:
+                    futures[hedge] = "hedge"
+        raise error
+
+    def _stream_hedged(self, prompt, expires=None, key=None):
+        """
+        Yield (chunk, "primary" | "hedge") from the first request to produce
+        a chunk, giving up when one takes longer than ``self.timeout`` or at
+        ``expires``. Once one request wins, the other stops reading its
+        stream and frees its slot. A stream abandoned at the deadline keeps
+        its slot until it completes and is then cached (without a cache it
+        stops too); any other exit stops both.
+        """
+        chunks = queue.Queue()
+        done = object()
+        lock = threading.Lock()
+        stopped = set()  # requests whose stream is no longer wanted
+        complete = {}    # request -> full text of a finished stream
+        late = []        # non-empty once the caller gave up at its deadline
+
+        def produce(source):
+            parts = []
+            cutoff = time.perf_counter() + self.request_timeout
+            stream = self._call_stream(prompt)
+            try:
+                for chunk in stream:
+                    if source in stopped:
+                        return
+                    if time.perf_counter() > cutoff:
+                        raise LLMTimeoutError(f"LLM stream exceeded {self.request_timeout}s")
+                    parts.append(chunk)
+                    chunks.put((source, chunk))
+                with lock:
+                    if source in stopped:
+                        return
+                    complete[source] = "".join(parts)
+                    abandoned = bool(late)
+                    if abandoned:
+                        stopped.update(("primary", "hedge"))
+                if abandoned:
+                    self._cache_late_text(key, complete[source])
+                chunks.put((source, done))
+            except Exception as e:
+                chunks.put((source, e))
+            finally:
+                stream.close()
+
+        self._acquire(expires)
+        producers = [self._submit(contextvars.copy_context().run, produce, "primary")]
+        alive = {"primary"}
+        winner = None
+        last = time.perf_counter()
+        hedge_at = last + self.hedge_after if self.hedge_after is not None else None
+        try:
+            while True:
+                now = time.perf_counter()
+                if expires is not None and now >= expires:
+                    with lock:
+                        late.append(True)
+                        text = complete.get(winner) if winner is not None else next(iter(complete.values()), None)
+                        if key is None or text is not None:
+                            stopped.update(("primary", "hedge"))
+                    if text is not None:
+                        self._cache_late_text(key, text)
+                    raise LLMDeadlineExceeded("LLM stream ran past its deadline")
+                if now >= last + self.timeout:
+                    raise LLMTimeoutError(f"No LLM response chunk within {self.timeout}s")
+                if hedge_at is not None and now >= hedge_at:
+                    hedge_at = None
+                    hedge = self._submit_hedge(contextvars.copy_context().run, produce, "hedge")
+                    if hedge is not None:
+                        producers.append(hedge)
+                        alive.add("hedge")
+                limits = [last + self.timeout] + [t for t in (expires, hedge_at) if t is not None]
+                try:
+                    source, item = chunks.get(timeout=max(0.0, min(limits) - now))
+                except queue.Empty:
+                    continue
+                if winner is not None and source != winner:
+                    continue
+                if item is done:
+                    return
+                if isinstance(item, Exception):
+                    alive.discard(source)
+                    if winner is None and alive:
+                        continue
+                    raise item
+                if winner is None:
+                    winner, hedge_at = source, None
+                    # The losing request stops at its next chunk and frees its slot
+                    stopped.add("hedge" if winner == "primary" else "primary")
+                last = time.perf_counter()
+                yield item, winner
+        except LLMDeadlineExceeded:
+            raise
+        except Exception as e:
+            # Requests that have not stopped yet still hold slots; a retry waits for them first
+            e.pending = [future for future in producers if not future.done()]
+            raise
+        finally:
+            with lock:
+                if not late:
+                    stopped.update(("primary", "hedge"))
+
+    def _await_pending(self, futures, expires=None, key=None):
+        """
+        Wait, no later than ``expires``, for the requests of a failed attempt
+        that still hold slots, so retries of one prompt never hold two.
+        Returns the first answer among them, or None.
+        """
+        pending = set(futures)
+        while pending:
+            timeout = None if expires is None else max(0.0, expires - time.perf_counter())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None and future.result() is not None:
+                    return future.result()
+            if not done:
+                self._cache_late(pending, key)
+                raise LLMDeadlineExceeded("Request of a timed-out LLM attempt still running at the deadline")
+        return None
+
+    def _submit_hedge(self, fn, *args):
+        """Run a duplicate request if a slot is free (held until it finishes); None otherwise"""
+        if not self._slots.acquire(blocking=False):
+            return None
+        return self._submit(fn, *args)
+
+    def _submit(self, fn, *args):
+        """
+        Run ``fn`` on a new daemon thread under an already acquired slot,
+        released when ``fn`` returns; returns its Future. Slots bound the
+        threads alive, and daemon threads let the process exit while
+        abandoned requests are still out.
+        """
+        future = Future()
+
+        def run():
+            try:
+                if future.set_running_or_notify_cancel():
+                    future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                self._slots.release()
+        try:
+            threading.Thread(target=run, name="llm", daemon=True).start()
+        except BaseException:
+            self._slots.release()
+            raise
+        return future
+
+    def _cache_late(self, futures, key):
+        """Cache the first successful answer among calls still in flight"""
+        if key is None:
+            return
+        stored = []
+        lock = threading.Lock()
+
+        def store(future):
+            if future.exception() is not None:
+                return
+            with lock:
+                if stored:
+                    return
+                stored.append(True)
+            self.cache.put(key, future.result())
+            self._count("late_cached")
+
+        for future in futures:
+            future.add_done_callback(store)
+
+    def _cache_late_text(self, key, text):
+        """Cache the full text of a stream that completed after its caller gave up"""
+        if key is None:
+            return
+        self.cache.put(key, text)
+        self._count("late_cached")
+
+    def _acquire(self, expires=None):
+        """Take one of the ``max_concurrency`` slots, waiting no later than ``expires``"""
+        timeout = None if expires is None else max(0.0, expires - time.perf_counter())
+        if not self._slots.acquire(timeout=timeout):
+            raise LLMDeadlineExceeded("No free LLM slot before the deadline")
+
+    def _sleep_backoff(self, attempt, expires=None):
+        """Back off before a retry, unless the retry could not start before ``expires``"""
+        delay = self._backoff(attempt)
+        if expires is not None and time.perf_counter() + delay >= expires:
+            raise LLMDeadlineExceeded("LLM retry would start past the deadline")
+        time.sleep(delay)
+
+    def _count(self, path):
+        with self._paths_lock:
+            self.paths[path] += 1
+
+    def _call_stream(self, prompt):
+        """Single streaming provider request; models without streaming yield one chunk"""
+        response = self.model.generate_content(prompt, stream=True, **self._request_kwargs())
+        try:
+            for chunk in (response if hasattr(response, "__iter__") else [response]):
+                if chunk.text:
+                    yield chunk.text
+        finally:
+            # Stops the provider stream when the reader quits early
+            close = getattr(response, "close", None)
+            if close is not None:
+                close()
+
+    def _call(self, prompt):
+        """Single provider request"""
+        response = self.model.generate_content(prompt, **self._request_kwargs())
+        return response.text
+
+    def _request_kwargs(self):
+        """Generation config and the provider-side request timeout, when set"""
+        kwargs = {}
+        if self.generation_config:
+            kwargs["generation_config"] = self.generation_config
+        if self.request_timeout is not None:
+            kwargs["request_options"] = {"timeout": self.request_timeout}
+        return kwargs
+
+    def _backoff(self, attempt):
+        """Full-jitter exponential backoff delay for the given retry attempt"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
@@ -0,0 +1,324 @@
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+
+# First line of each prompt template -> kind of answer it asks for
+PROMPT_KINDS = {
+    "# Task Planning Agent": "plan",
+    "# Insight Generation Agent": "insights",
+    "# Creative Improvement Generator": "creatives"
+}
+CREATIVE_KEYWORDS = ("creative", "ad copy", "ctr", "message", "headline")
+LATENCY_DISTRIBUTIONS = ("constant", "uniform", "exponential", "lognormal")
+
+
+class ResourceExhausted(Exception):
+    """Injected rate-limit error (same class name as google.api_core's 429, so it is retried)"""
+
+
+class InvalidArgument(Exception):
+    """Injected permanent error (not retried; the agent falls back)"""
+
+
+class DeadlineExceeded(Exception):
+    """Raised past ``request_options["timeout"]`` (same class name as google.api_core's 504, so it is retried)"""
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """
+    Local stand-in for a ``generate_content`` model, for load tests without
+    network access or an API key (``llm.provider: fake``).
+
+    Answers are built from the prompt itself: the planner prompt gets a plan
+    for its user query, and the insight and creative prompts get hypotheses
+    and variations citing the numbers in their encoded data summary. Every
+    answer comes in a fenced JSON block, as real responses do, so the
+    agents' extraction and parsing paths run. With ``stream=True`` the
+    answer arrives in ``chunk_chars`` pieces: the first after
+    ``first_chunk_share`` of the call's latency, the rest spread over the
+    remainder.
+
+    Each call sleeps for a latency drawn from ``latency`` and may raise an
+    injected error (``error_rate`` transient, ``fatal_error_rate``
+    permanent) or return a truncated answer (``malformed_rate``). The draw
+    for a call depends only on ``seed``, the prompt and how many times that
+    prompt was sent before, so runs are reproducible even when agents call
+    concurrently. Like the real SDK, a call given
+    ``request_options={"timeout": t}`` gives up after ``t`` seconds.
+    """
+
+    def __init__(self, seed=42, latency=None, error_rate=0.0, fatal_error_rate=0.0, malformed_rate=0.0,
+                 chunk_chars=64, first_chunk_share=0.3):
+        self.seed = seed
+        self.latency = dict(latency or {"distribution": "constant", "mean_s": 0.0})
+        if self.latency.get("distribution", "constant") not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution {self.latency['distribution']!r}, expected one of {LATENCY_DISTRIBUTIONS}")
+        self.error_rate = error_rate
+        self.fatal_error_rate = fatal_error_rate
+        self.malformed_rate = malformed_rate
+        self.chunk_chars = chunk_chars
+        self.first_chunk_share = first_chunk_share
+        self.calls = 0
+        self.outcomes = {"ok": 0, "error": 0, "fatal_error": 0, "malformed": 0, "timeout": 0}
+        self.latencies = []
+        self._sent = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, fake_config, seed=42):
+        """Build from the ``llm.fake`` section of config.yaml"""
+        return cls(
+            seed=fake_config.get("seed", seed),
+            latency=fake_config.get("latency"),
+            error_rate=fake_config.get("error_rate", 0.0),
+            fatal_error_rate=fake_config.get("fatal_error_rate", 0.0),
+            malformed_rate=fake_config.get("malformed_rate", 0.0),
+            chunk_chars=fake_config.get("chunk_chars", 64),
+            first_chunk_share=fake_config.get("first_chunk_share", 0.3)
+        )
+
+    def generate_content(self, prompt, stream=False, request_options=None, **kwargs):
+        """Sleep, then answer ``prompt`` (or fail, as configured); ``stream=True`` returns chunks"""
+        delay, outcome, text = self._draw(prompt)
+        timeout = (request_options or {}).get("timeout")
+        if stream:
+            return self._stream(delay, outcome, text, timeout)
+        self._sleep(delay, timeout)
+        self._record(outcome, delay)
+        self._raise_injected(outcome)
+        return FakeResponse(text)
+
+    def _draw(self, prompt):
+        """(latency, outcome, text) for one call"""
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        with self._lock:
+            self.calls += 1
+            attempt = self._sent.get(digest, 0)
+            self._sent[digest] = attempt + 1
+        rng = random.Random(f"{self.seed}:{digest}:{attempt}")
+
+        delay = self._draw_latency(rng)
+        roll = rng.random()
+        if roll < self.error_rate:
+            return delay, "error", None
+        if roll < self.error_rate + self.fatal_error_rate:
+            return delay, "fatal_error", None
+        text = f"```json\n{json.dumps(self.answer(prompt), indent=2)}\n```"
+        if rng.random() < self.malformed_rate:
+            # Cut inside the JSON, like a response that hit its token limit
+            return delay, "malformed", text[:rng.randint(8, max(9, len(text) // 2))]
+        return delay, "ok", text
+
+    def _stream(self, delay, outcome, text, timeout=None):
+        """
+        Chunks of ``self.chunk_chars`` characters: the first after
+        ``first_chunk_share`` of the latency, the rest spread over the remainder
+        """
+        elapsed = delay * self.first_chunk_share
+        self._sleep(elapsed, timeout)
+        if outcome in ("error", "fatal_error"):
+            self._record(outcome, elapsed)
+            self._raise_injected(outcome)
+        pieces = [text[i:i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)]
+        pause = delay * (1 - self.first_chunk_share) / max(len(pieces) - 1, 1)
+        for n, piece in enumerate(pieces):
+            if n:
+                self._sleep(pause, None if timeout is None else timeout - elapsed)
+                elapsed += pause
+            yield FakeResponse(piece)
+        self._record(outcome, delay)
+
+    def _sleep(self, seconds, timeout=None):
+        """Sleep ``seconds``, or only ``timeout`` and raise DeadlineExceeded when that is shorter"""
+        if timeout is None or seconds <= timeout:
+            time.sleep(seconds)
+            return
+        time.sleep(max(timeout, 0.0))
+        self._record("timeout", timeout)
+        raise DeadlineExceeded(f"504 Deadline Exceeded after {timeout}s (request timeout)")
+
+    def _raise_injected(self, outcome):
+        if outcome == "error":
+            raise ResourceExhausted("429 Resource has been exhausted (injected)")
+        if outcome == "fatal_error":
+            raise InvalidArgument("400 Request contains an invalid argument (injected)")
+
+    def answer(self, prompt):
+        """The JSON answer for a prompt (a plan, hypotheses or creatives)"""
+        kind = PROMPT_KINDS.get(prompt.lstrip().split("\n", 1)[0].strip())
+        if kind == "plan":
+            return _plan(_section(prompt, "User Query"))
+        summary = _decode_summary(_section(prompt, "Data Summary"))
+        if kind == "insights":
+            return _insights(summary)
+        if kind == "creatives":
+            return _creatives(summary)
+        return {"response": "ok"}
+
+    def stats(self):
+        """Call counts per outcome and latency percentiles so far"""
+        with self._lock:
+            latencies = sorted(self.latencies)
+            outcomes = dict(self.outcomes)
+        return {"calls": self.calls, "outcomes": outcomes, "latency_s": latency_percentiles(latencies)}
+
+    def _draw_latency(self, rng):
+        """Seconds to sleep for one call"""
+        config = self.latency
+        distribution = config.get("distribution", "constant")
+        if distribution == "uniform":
+            return rng.uniform(config.get("min_s", 0.0), config.get("max_s", 1.0))
+        if distribution == "exponential":
+            mean = config.get("mean_s", 1.0)
+            return rng.expovariate(1.0 / mean) if mean > 0 else 0.0
+        if distribution == "lognormal":
+            # median_s is the typical call, sigma widens the tail
+            median = config.get("median_s", 1.0)
+            return median * rng.lognormvariate(0.0, config.get("sigma", 0.5)) if median > 0 else 0.0
+        return config.get("mean_s", 0.0)
+
+    def _record(self, outcome, delay):
+        with self._lock:
+            self.outcomes[outcome] += 1
+            self.latencies.append(delay)
+
+
+def latency_percentiles(latencies):
+    """p50/p95/p99/max of a sorted list of seconds"""
+    if not latencies:
+        return {}
+    def pick(q):
+        return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))], 4)
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": round(latencies[-1], 4)}
+
+
+def _section(prompt, title):
+    """Body of a ``## title`` section of a rendered prompt"""
+    match = re.search(rf"^## {re.escape(title)}\n(.*?)(?=^## |\Z)", prompt, re.S | re.M)
+    return match.group(1).strip() if match else ""
+
+
+def _decode_summary(text):
+    """Summary sections from PromptEncoder lines (``name: {json}``), tables back to records"""
+    summary = {}
+    for line in text.splitlines():
+        name, sep, value = line.partition(": ")
+        if not sep or not re.fullmatch(r"\w+", name):
+            continue
+        try:
+            decoded = json.loads(value)
+        except ValueError:
+            continue
+        if isinstance(decoded, dict) and set(decoded) == {"cols", "rows"}:
+            decoded = [dict(zip(decoded["cols"], row)) for row in decoded["rows"]]
+        if name == "overview" and isinstance(decoded, dict):
+            summary.update(decoded)
+        else:
+            summary[name] = decoded
+    return summary
+
+
+def _plan(query):
+    """Plan following the planner prompt's quality criteria"""
+    subtasks = [
+        {"task_id": 1, "task": "Load data and summarize metrics", "agent": "data_agent", "dependencies": []},
+        {"task_id": 2, "task": f"Generate hypotheses for: {query}", "agent": "insight_agent", "dependencies": [1]},
+        {"task_id": 3, "task": "Validate hypotheses quantitatively", "agent": "evaluator_agent", "dependencies": [1, 2]}
+    ]
+    if any(k in query.lower() for k in CREATIVE_KEYWORDS) or "improve" in query.lower():
+        subtasks.append({"task_id": 4, "task": "Generate creative recommendations for low-CTR campaigns", "agent": "creative_generator", "dependencies": [1]})
+    return {"user_query": query, "subtasks": subtasks}
+
+
+def _insights(summary):
+    """Hypotheses citing the summary's trend, CTR and platform numbers"""
+    insights = []
+    trend = summary.get("roas_trend_7d")
+    if isinstance(trend, dict) and len(trend) >= 2:
+        dates = list(trend)
+        first, last = trend[dates[0]], trend[dates[-1]]
+        if first and last is not None:
+            direction = "decreased" if last < first else "increased"
+            insights.append({
+                "hypothesis": f"ROAS has {direction} in recent days",
+                "reasoning": f"THINK: ROAS went from {first:.2f} on {dates[0]} to {last:.2f} on {dates[-1]}. ANALYZE: The change ({(last - first) / first:+.1%}) spans the whole trend window. CONCLUDE: Check creative fatigue and audience saturation.",
+                "confidence": 0.74,
+                "evidence_metrics": ["roas", "roas_trend_7d"],
+                "category": "roas_decline"
+            })
+    ctr = (summary.get("avg_metrics") or {}).get("ctr")
+    if isinstance(ctr, (int, float)):
+        below = ctr < 0.02
+        insights.append({
+            "hypothesis": "Average CTR is below industry standard" if below else "Average CTR meets the 2% benchmark",
+            "reasoning": f"THINK: Average CTR is {ctr:.4f} against a 0.02 benchmark. ANALYZE: Engagement {'lags' if below else 'keeps up with'} spend. CONCLUDE: {'Refresh creative messaging' if below else 'Creatives are not the bottleneck'}.",
+            "confidence": 0.71,
+            "evidence_metrics": ["ctr", "avg_metrics"],
+            "category": "ctr_issue"
+        })
+    platforms = [row for row in summary.get("platform_performance") or [] if isinstance(row.get("roas"), (int, float))]
+    if len(platforms) >= 2:
+        best = max(platforms, key=lambda row: row["roas"])
+        worst = min(platforms, key=lambda row: row["roas"])
+        insights.append({
+            "hypothesis": f"{best['key']} platform performs better than {worst['key']}",
+            "reasoning": f"THINK: {best['key']} ROAS is {best['roas']:.2f} vs {worst['roas']:.2f} on {worst['key']}. ANALYZE: Audience fit differs by platform. CONCLUDE: Shift budget towards {best['key']}.",
+            "confidence": 0.77,
+            "evidence_metrics": ["platform_performance", "roas"],
+            "category": "platform_efficiency"
+        })
+    return insights
+
+
+def _creatives(summary):
+    """Three framework variations for each low-CTR campaign in the summary"""
+    creatives = []
+    seen = set()
+    for row in summary.get("low_ctr_campaigns") or []:
+        name = row.get("campaign_name")
+        if name in seen:
+            continue
+        seen.add(name)
+        ctr = row.get("ctr") or 0
+        creatives.append({
+            "campaign_name": name,
+            "current_ctr": ctr,
+            "current_creative_message": row.get("creative_message", ""),
+            "creative_variations": [
+                {
+                    "variation_id": 1,
+                    "headline": f"Feel the {name} Comfort All Day",
+                    "message": "Soft, breathable fabric that moves with you from morning to night. No pinching, no ride-up, just comfort you forget you are wearing.",
+                    "cta": "Shop Comfort Now",
+                    "framework": "emotional",
+                    "reasoning": f"CTR of {ctr:.2%} is under the 2% benchmark; a sensory comfort hook replaces the generic message."
+                },
+                {
+                    "variation_id": 2,
+                    "headline": "Premium Fabric, 30% Off This Week",
+                    "message": "The same premium modal and cotton, now 30% off with free shipping over $50. Built to last wash after wash.",
+                    "cta": "Claim 30% Off",
+                    "framework": "logical",
+                    "reasoning": "Specific price and quality details give a concrete reason to click."
+                },
+                {
+                    "variation_id": 3,
+                    "headline": "Restock Sells Out by Friday",
+                    "message": "Our best-selling fit is back in limited sizes. Grab yours before this restock is gone.",
+                    "cta": "Shop Before Friday",
+                    "framework": "urgency",
+                    "reasoning": "A time limit lifts click-through on low-engagement campaigns."
+                }
+            ]
+        })
+        if len(creatives) == 3:
+            break
+    return creatives
@@ -0,0 +1,88 @@
+import json
+
+
+class ObjectArrayParser:
+    """
+    Incremental parser for a JSON array of objects arriving in chunks.
+
+    ``feed`` returns the objects completed by each chunk, so callers can act
+    on the first ones while the rest is still being generated. Text around
+    the array (prose, a ```json fence) is ignored: the array starts at the
+    first ``[`` whose next non-space character is ``{`` or ``]``. ``done``
+    turns True at the closing ``]``; when a response stops before that
+    (truncated output), the objects already returned are still complete.
+    Any other item (a scalar or nested array) raises ValueError. Only the
+    unfinished item is buffered, so long responses are scanned once.
+    """
+
+    def __init__(self):
+        self.done = False
+        self.started = False
+        self._buffer = ""        # text from the start of the unfinished item
+        self._pos = 0            # next character to scan in the buffer
+        self._offset = 0         # characters dropped before the buffer
+        self._candidate = False  # saw "[" and waiting to see what follows
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._item_start = None
+
+    def feed(self, chunk):
+        """Add text; returns the list of objects it completed"""
+        text = self._buffer + chunk
+        items = []
+        while self._pos < len(text) and not self.done:
+            i = self._pos
+            ch = text[i]
+            self._pos += 1
+            if not self.started:
+                self._find_start(ch)
+                if self.started and ch == "{":
+                    self._open(i)
+                elif self.started and ch == "]":
+                    self.done = True
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if self._depth == 0 and ch not in "{]," and not ch.isspace():
+                raise ValueError(f"Expected an object at offset {self._offset + i}, found {ch!r}")
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._open(i)
+            elif ch in "}]":
+                if self._depth == 0:
+                    self.done = True
+                    continue
+                self._depth -= 1
+                if self._depth == 0:
+                    items.append(json.loads(text[self._item_start:i + 1]))
+                    self._item_start = None
+        # Keep only the unfinished item
+        keep = self._pos if self._item_start is None else self._item_start
+        self._buffer = text[keep:]
+        self._pos -= keep
+        self._offset += keep
+        if self._item_start is not None:
+            self._item_start = 0
+        return items
+
+    def _find_start(self, ch):
+        """Track the "[" that opens an array of objects"""
+        if ch == "[":
+            self._candidate = True
+        elif self._candidate and not ch.isspace():
+            self._candidate = False
+            self.started = ch in "{]"
+
+    def _open(self, i):
+        if self._depth == 0:
+            self._item_start = i
+        self._depth += 1
+
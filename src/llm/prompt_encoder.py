@@ -0,0 +1,140 @@
+import json
+import math
+import numbers
+import re
+
+# Section priority per agent, most valuable first; trimming drops from the end
+INSIGHT_PRIORITY = [
+    "overview", "avg_metrics", "roas_trend_7d", "platform_performance",
+    "bottom_5_campaigns", "top_5_campaigns", "low_ctr_campaigns"
+]
+CREATIVE_PRIORITY = [
+    "overview", "low_ctr_campaigns", "avg_metrics", "bottom_5_campaigns",
+    "platform_performance", "top_5_campaigns", "roas_trend_7d"
+]
+# Summary fields each agent's prompt encodes (only these are computed)
+INSIGHT_FIELDS = [
+    "date_range", "total_campaigns", "total_spend", "total_revenue", "overall_roas",
+    "avg_metrics", "roas_trend_7d", "platform_performance", "bottom_5_campaigns", "top_5_campaigns"
+]
+CREATIVE_FIELDS = [
+    "total_campaigns", "overall_roas", "low_ctr_campaigns", "avg_metrics", "bottom_5_campaigns"
+]
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token for English/JSON text)"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def render_template(template, **values):
+    """
+    Fill ``{name}`` placeholders without str.format, so literal JSON braces
+    in the prompt files are left alone.
+    """
+    def replace(match):
+        name = match.group(1)
+        return str(values[name]) if name in values else match.group(0)
+    return re.sub(r"\{(\w+)\}", replace, template)
+
+
+class PromptEncoder:
+    """
+    Compact serializer for the DataAgent summary.
+
+    Compared with ``json.dumps(summary, indent=2)`` it drops whitespace,
+    rounds numbers, truncates long text (e.g. creative messages) and turns
+    lists of records into ``{"cols": [...], "rows": [[...]]}`` tables so
+    keys are not repeated per row. With a ``token_budget`` the lowest
+    priority sections are dropped until the estimate fits. Only the
+    ``fields`` passed to ``encode`` are read, so a lazy summary computes
+    nothing else. Section and column names are kept in full: agents copy
+    them back into their answers (e.g. ``campaign_name``). With
+    ``measure_baseline`` the stats also estimate the pretty-printed JSON
+    size for comparison, at the cost of a second serialization.
+    """
+
+    def __init__(self, priority, token_budget=None, max_text_chars=60, measure_baseline=False):
+        self.priority = priority
+        self.token_budget = token_budget
+        self.max_text_chars = max_text_chars
+        self.measure_baseline = measure_baseline
+
+    def encode(self, summary, fields=None):
+        """Return (encoded text, stats) for the ``fields`` of a summary (None means every field)"""
+        summary = {field: summary[field] for field in (summary if fields is None else fields) if field in summary}
+        sections = self._sections(summary)
+        lines = [f"{name}: {self._dumps(value)}" for name, value in sections]
+
+        dropped = []
+        # Never drop the first section: without it the prompt has no context
+        while self.token_budget and len(lines) > 1 and estimate_tokens("\n".join(lines)) > self.token_budget:
+            lines.pop()
+            dropped.append(sections[len(lines)][0])
+
+        text = "\n".join(lines)
+        stats = {
+            "encoded_tokens": estimate_tokens(text),
+            "token_budget": self.token_budget,
+            "dropped_sections": dropped
+        }
+        if self.measure_baseline:
+            stats["baseline_tokens"] = estimate_tokens(json.dumps(summary, indent=2, default=str))
+        return text, stats
+
+    def _sections(self, summary):
+        """Scalars grouped into an overview, then remaining keys in priority order"""
+        overview = {k: v for k, v in summary.items() if not isinstance(v, (dict, list))}
+        nested = {k: v for k, v in summary.items() if isinstance(v, (dict, list))}
+
+        sections = [("overview", overview)] if overview else []
+        sections.extend(nested.items())
+        # Unknown sections rank last; sort is stable so they keep summary order
+        sections.sort(key=lambda s: self.priority.index(s[0]) if s[0] in self.priority else len(self.priority))
+        return [(name, self._compact(value)) for name, value in sections]
+
+    def _compact(self, value):
+        """Recursively round numbers, shorten text and tabulate record lists"""
+        if isinstance(value, dict):
+            if value and all(isinstance(v, dict) for v in value.values()):
+                # {key: {col: value}} -> table with the key as first column
+                cols = list(next(iter(value.values())).keys())
+                return {
+                    "cols": ["key"] + cols,
+                    "rows": [[self._compact(k)] + [self._compact(row.get(c)) for c in cols] for k, row in value.items()]
+                }
+            return {str(k): self._compact(v) for k, v in value.items()}
+        if isinstance(value, list):
+            if value and all(isinstance(v, dict) for v in value):
+                cols = list(value[0].keys())
+                return {"cols": cols, "rows": [[self._compact(row.get(c)) for c in cols] for row in value]}
+            return [self._compact(v) for v in value]
+        if isinstance(value, bool) or value is None:
+            return value
+        if isinstance(value, numbers.Integral):
+            return int(value)
+        if isinstance(value, numbers.Real):
+            return _round(float(value))
+        if isinstance(value, str):
+            if len(value) > self.max_text_chars:
+                return value[:self.max_text_chars - 1] + "…"
+            return value
+        return self._compact(str(value))
+
+    def _dumps(self, value):
+        """Minified JSON"""
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def _round(x):
+    """Keep ~3 significant digits for small values, fewer decimals for large ones"""
+    if math.isnan(x) or math.isinf(x):
+        return None
+    magnitude = abs(x)
+    if magnitude >= 100:
+        return round(x)
+    if magnitude >= 1:
+        return round(x, 2)
+    return float(f"{x:.3g}")
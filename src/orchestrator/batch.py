@@ -0,0 +1,115 @@
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def load_queries(path):
+    """
+    Read a JSONL file of queries.
+    Each line needs a ``query`` (or ``title``) field; ``id``/``request_id`` names
+    the output directory and defaults to the line number. Duplicate ids are
+    rejected; distinct ids that map to the same directory name (e.g.
+    "ctr/low" and "ctr_low") get a numeric suffix.
+    """
+    queries = []
+    seen = {}
+    dirs = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            text = record.get("query") or record.get("title")
+            if not text:
+                raise ValueError(f"{path}:{line_no}: missing 'query' field")
+            query_id = str(record.get("id") or record.get("request_id") or f"query-{line_no:04d}")
+            if query_id in seen:
+                raise ValueError(f"{path}:{line_no}: duplicate id {query_id!r} (first on line {seen[query_id]})")
+            seen[query_id] = line_no
+            queries.append({"id": query_id, "query": text, "dir": _unique_name(query_id, dirs)})
+    return queries
+
+
+class BatchRunner:
+    """
+    Run many queries against one loaded dataset.
+
+    The dataset is loaded and summarized once; every query then runs its own
+    plan against the shared ``dataframe``/``data_summary`` (the data_agent
+    subtask becomes a no-op), with up to ``workers`` queries in flight.
+    Each query writes its reports and execution log to
+    ``<output_dir>/<query id>/``.
+    """
+
+    def __init__(self, orchestrator, workers=4):
+        self.orchestrator = orchestrator
+        self.workers = workers
+
+    def run(self, queries_path, output_dir="reports/batch"):
+        """Process every query in the file and return throughput stats"""
+        queries = load_queries(queries_path)
+        os.makedirs(output_dir, exist_ok=True)
+
+        load_start = time.perf_counter()
+        shared = self.orchestrator.load_data()
+        load_time = time.perf_counter() - load_start
+        print(f"📦 Dataset loaded once in {load_time:.2f}s for {len(queries)} queries\n")
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            outcomes = list(pool.map(lambda q: self._run_one(q, shared, output_dir), queries))
+        elapsed = time.perf_counter() - start
+
+        stats = {
+            "queries": len(queries),
+            "failed": sum(1 for o in outcomes if o["status"] == "failed"),
+            "workers": self.workers,
+            "data_load_seconds": round(load_time, 4),
+            "elapsed_seconds": round(elapsed, 4),
+            "queries_per_second": round(len(queries) / elapsed, 4) if elapsed > 0 else None,
+            "results": outcomes
+        }
+        with open(os.path.join(output_dir, "batch_summary.json"), "w") as f:
+            json.dump(stats, f, indent=4)
+
+        print(f"✅ Processed {stats['queries']} queries in {elapsed:.2f}s "
+              f"({stats['queries_per_second']} queries/s, {stats['failed']} failed)")
+        return stats
+
+    def _run_one(self, item, shared, output_dir):
+        """Run one query into its own output directory; failures are recorded, not raised"""
+        query_dir = os.path.join(output_dir, item["dir"])
+        start = time.perf_counter()
+        try:
+            self.orchestrator.run(item["query"], shared=shared, output_dir=query_dir)
+            status, error = "completed", None
+        except Exception as e:
+            print(f"⚠️ Query {item['id']} failed: {e}")
+            status, error = "failed", str(e)
+        return {
+            "id": item["id"],
+            "query": item["query"],
+            "status": status,
+            "error": error,
+            "seconds": round(time.perf_counter() - start, 4),
+            "output_dir": query_dir
+        }
+
+
+def _safe_name(query_id):
+    """Filesystem-safe directory name for a query id"""
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", query_id).strip("_") or "query"
+
+
+def _unique_name(query_id, taken):
+    """Safe name not yet in ``taken`` (compared case-insensitively), which it is added to"""
+    base = name = _safe_name(query_id)
+    n = 1
+    while name.lower() in taken:
+        n += 1
+        name = f"{base}-{n}"
+    taken.add(name.lower())
+    return name
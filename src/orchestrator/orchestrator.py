@@ -1,32 +1,132 @@
+import contextlib
+import contextvars
+import cProfile
 import json
 import os
+import threading
+import time
 import yaml
-import google.generativeai as genai
-from src.agents.planner import PlannerAgent
-from src.agents.data_agent import DataAgent
-from src.agents.insight_agent import InsightAgent
-from src.agents.evaluator_agent import EvaluatorAgent
-from src.agents.creative_generator import CreativeGenerator
+from concurrent.futures import ThreadPoolExecutor
+from src.orchestrator.scheduler import DAGScheduler
+from src.utils.plan import drop_agents
+from src.utils.tracing import Tracer, span, top_functions
+
+# Summary fields the markdown report's data overview reads
+REPORT_SUMMARY_FIELDS = ["date_range", "total_campaigns", "total_spend", "total_revenue", "overall_roas"]
+
+# Profilers see every thread's calls (and Python 3.12+ allows one active at a
+# time), so concurrent profiled runs in one process take turns
+_PROFILE_LOCK = threading.Lock()
 
 class Orchestrator:
-    def __init__(self):
-        """Initialize orchestrator with all agents and LLM model"""
+    def __init__(self, profile=False, config=None):
+        """Initialize orchestrator with config (``config`` replaces config/config.yaml), LLM model and lazily built agents"""
         # Load config
-        self.config = self._load_config("config/config.yaml")
+        self.config = config if config is not None else self._load_config("config/config.yaml")
         
         # Initialize LLM model
         self.model = self._initialize_llm()
         
-        # Initialize agents with model
-        self.planner = PlannerAgent(model=self.model)
-        self.data_agent = DataAgent(model=self.model)
-        self.insight_agent = InsightAgent(model=self.model)
-        self.evaluator = EvaluatorAgent(model=self.model)
-        self.creatives = CreativeGenerator(model=self.model)
+        # One client shared by all agents so the concurrency limit is global
+        self.llm = None
+        if self.model:
+            from src.llm.client import LLMClient
+            self.llm = LLMClient.from_config(self.model, self._client_config())
+        
+        # Agents are built on first use, so a plan that never references one
+        # doesn't pay for its imports or prompt file reads
+        self._agents = {}
+        self._agent_lock = threading.Lock()
+        
+        # Runs plan subtasks as their dependencies complete
+        self.scheduler = DAGScheduler(
+            max_workers=self.config.get("orchestrator", {}).get("max_workers", 4)
+        )
         
         # Logs
         self.logs = []
+        # Capture cProfile stats per agent (subtasks then run one at a time)
+        self.profile = profile
     
+    @property
+    def planner(self):
+        """Planner Agent (built on first access)"""
+        return self._get_agent("planner", self._build_planner)
+
+    @property
+    def data_agent(self):
+        """Data Agent (built on first access)"""
+        return self._get_agent("data_agent", self._build_data_agent)
+
+    @property
+    def insight_agent(self):
+        """Insight Agent (built on first access)"""
+        return self._get_agent("insight_agent", self._build_insight_agent)
+
+    @property
+    def evaluator(self):
+        """Evaluator Agent (built on first access)"""
+        return self._get_agent("evaluator", self._build_evaluator)
+
+    @property
+    def creatives(self):
+        """Creative Generator (built on first access)"""
+        return self._get_agent("creatives", self._build_creatives)
+
+    def _get_agent(self, name, build):
+        """Return the named agent, constructing it on first access (thread-safe)"""
+        with self._agent_lock:
+            if name not in self._agents:
+                self._agents[name] = build()
+            return self._agents[name]
+
+    def _build_planner(self):
+        """Build the Planner Agent (agent imports live in these factories)"""
+        from src.agents.planner import PlannerAgent
+        return PlannerAgent(model=self.llm, deadline=self._deadline("planner"))
+
+    def _build_data_agent(self):
+        """Build the Data Agent"""
+        from src.agents.data_agent import DataAgent
+        data_config = self.config.get("data", {})
+        return DataAgent(
+            model=self.llm,
+            cache_dir=data_config.get("cache_dir"),
+            incremental=data_config.get("incremental", False),
+            cube_dir=data_config.get("cube_dir"),
+            trend_days=self.config.get("thresholds", {}).get("roas_trend_days", 7),
+            names_path=data_config.get("campaign_names")
+        )
+
+    def _build_insight_agent(self):
+        """Build the Insight Agent"""
+        from src.agents.insight_agent import InsightAgent
+        token_budgets = self.config.get("llm", {}).get("token_budgets", {})
+        return InsightAgent(model=self.llm, token_budget=token_budgets.get("insight_agent"), deadline=self._deadline("insight_agent"))
+
+    def _build_evaluator(self):
+        """Build the Evaluator Agent"""
+        from src.agents.evaluator_agent import EvaluatorAgent
+        evaluator_config = self.config.get("evaluator", {})
+        return EvaluatorAgent(
+            model=self.llm,
+            random_seed=self.config.get("random_seed", 42),
+            n_resamples=evaluator_config.get("bootstrap_resamples", 10000),
+            bootstrap_workers=evaluator_config.get("bootstrap_workers", 0),
+            min_segment_rows=evaluator_config.get("min_segment_rows", 5),
+            trend_days=self.config.get("thresholds", {}).get("roas_trend_days", 7)
+        )
+
+    def _build_creatives(self):
+        """Build the Creative Generator"""
+        from src.agents.creative_generator import CreativeGenerator
+        token_budgets = self.config.get("llm", {}).get("token_budgets", {})
+        return CreativeGenerator(model=self.llm, token_budget=token_budgets.get("creative_generator"), deadline=self._deadline("creative_generator"))
+
+    def _deadline(self, stage):
+        """Latency budget in seconds for a stage's LLM call (None: wait for the answer)"""
+        return self.config.get("llm", {}).get("deadlines_s", {}).get(stage)
+
     def _load_config(self, config_path):
         """Load configuration from YAML file"""
         try:
@@ -51,99 +151,270 @@ class Orchestrator:
                 print("⚠️ GOOGLE_API_KEY not found. Agents will use fallback logic.")
                 return None
             
+            # Import the SDK only when a model is actually created (slow import)
+            import google.generativeai as genai
             genai.configure(api_key=api_key)
             model_name = llm_config.get("model", "gemini-1.5-flash")
             return genai.GenerativeModel(model_name)
         
+        elif provider == "fake":
+            # Local stand-in with injected latency/errors (load tests, no network)
+            from src.llm.fake_model import FakeModel
+            print("🧪 Using the fake LLM provider (no network calls)")
+            return FakeModel.from_config(llm_config.get("fake", {}), seed=self.config.get("random_seed", 42))
+        
         else:
             print(f"⚠️ Provider {provider} not supported. Using fallback.")
             return None
 
-    def run(self, query):
+    def _client_config(self):
+        """The ``llm`` config for the shared client; fake answers never share the real response cache"""
+        llm_config = self.config.get("llm", {})
+        if llm_config.get("provider") != "fake":
+            return llm_config
+        fake_config = llm_config.get("fake", {})
+        cache_config = dict(llm_config.get("cache", {}), enabled=fake_config.get("use_cache", False))
+        return dict(llm_config, model=f"fake/{llm_config.get('model', 'model')}", cache=cache_config)
+
+    def run(self, query, shared=None, output_dir=None, save=True):
         """
         Main orchestration loop using Planner-driven execution
+
+        ``shared`` pre-seeds intermediate results (e.g. a dataframe and
+        data_summary loaded once for a batch), and ``output_dir`` redirects
+        reports and logs to one directory for this query. With ``save=False``
+        nothing is written and the caller uses the returned results.
         """
         print(f"\n🚀 Starting analysis for query: '{query}'\n")
+        logs = []
+        # Spans for every stage of this run (exported as a Chrome trace)
+        tracer = Tracer(memory=self.config.get("tracing", {}).get("tracemalloc", False))
+        profiles = {} if self.profile else None
         
         # Step 1: Generate execution plan using Planner
         print("📋 Step 1: Generating execution plan...")
-        plan = self.planner.create_plan(query)
+        with tracer.activate(), span("plan", "plan"):
+            plan = self.planner.create_plan(query)
         print(f"✅ Plan created with {len(plan.get('subtasks', []))} subtasks\n")
-        self._log("plan_generated", plan)
+        self._log(logs, "plan_generated", plan)
+        chunked = bool(self.config.get("data", {}).get("chunksize")) and 'dataframe' not in (shared or {})
+        if chunked and any(s.get("agent") == "evaluator_agent" for s in plan.get("subtasks", [])):
+            # Chunked mode is summary-only: no rows are kept to validate hypotheses against
+            reason = "data.chunksize is set: chunked mode builds the summary only, without rows to validate against"
+            print(f"⚠️ Dropping evaluator_agent: {reason}\n")
+            self._log(logs, "subtask_dropped", {"agent": "evaluator_agent", "reason": reason})
+            plan = dict(plan, subtasks=drop_agents(plan.get("subtasks", []), {"evaluator_agent"}))
         
         # Storage for intermediate results
-        results = {}
+        results = dict(shared or {})
+        # Only load the frame columns this plan's agents read, and compute the
+        # summary fields it declares up front (others are computed on access)
+        columns = self._plan_columns(plan)
+        # With both agents planned, hypotheses are prevalidated while they stream in
+        agents = {subtask.get("agent") for subtask in plan.get("subtasks", [])}
+        prevalidate = {"insight_agent", "evaluator_agent"} <= agents
+        fields = plan.get("summary_fields")
+        if not isinstance(fields, list):
+            fields = None
+        elif save:
+            fields = fields + [f for f in REPORT_SUMMARY_FIELDS if f not in fields]
         
-        # Step 2: Execute plan subtasks in order
-        for subtask in plan.get("subtasks", []):
-            task_id = subtask.get("task_id")
-            task_desc = subtask.get("task")
-            agent_name = subtask.get("agent")
-            
-            print(f"▶ Task {task_id}: {task_desc} (Agent: {agent_name})")
-            
-            # Execute appropriate agent based on plan
-            if agent_name == "data_agent":
-                csv_path = self.config.get("data", {}).get("csv_path", "data/synthetic_fb_ads_undergarments.csv")
-                df, summary = self.data_agent.load_and_summarize(csv_path)
-                results['dataframe'] = df
-                results['data_summary'] = summary
-                print(f"  ✓ Loaded {len(df)} rows, {df['campaign_name'].nunique()} campaigns\n")
-                self._log("data_loaded", {"rows": len(df), "campaigns": df['campaign_name'].nunique()})
-            
-            elif agent_name == "insight_agent":
-                if 'data_summary' not in results:
-                    print("  ⚠️ Skipping: data_summary not available\n")
-                    continue
-                insights = self.insight_agent.generate_insights(results['data_summary'])
-                results['insights'] = insights
-                print(f"  ✓ Generated {len(insights)} hypotheses\n")
-                self._log("insights_generated", {"count": len(insights)})
-            
-            elif agent_name == "evaluator_agent":
-                if 'dataframe' not in results or 'insights' not in results:
-                    print("  ⚠️ Skipping: dataframe or insights not available\n")
-                    continue
-                validated = self.evaluator.evaluate(results['dataframe'], results['insights'])
-                results['validated_insights'] = validated
-                print(f"  ✓ Validated {len(validated)} insights (confidence ≥ 0.6)\n")
-                self._log("insights_validated", {"count": len(validated)})
-            
-            elif agent_name == "creative_generator":
-                if 'data_summary' not in results:
-                    print("  ⚠️ Skipping: data_summary not available\n")
-                    continue
-                creatives = self.creatives.generate(results['data_summary'])
-                results['creatives'] = creatives
-                print(f"  ✓ Generated {len(creatives)} creative recommendations\n")
-                self._log("creatives_generated", {"count": len(creatives)})
+        # Step 2: Execute plan subtasks, running independent ones concurrently
+        # (one at a time when profiling, so each profile holds one agent)
+        scheduler = DAGScheduler(max_workers=1) if self.profile else self.scheduler
+        with _PROFILE_LOCK if self.profile else contextlib.nullcontext(), tracer.activate():
+            timings = scheduler.run(
+                plan.get("subtasks", []),
+                lambda subtask: self._traced_subtask(subtask, results, logs, columns, fields, profiles, prevalidate)
+            )
+        self._log(logs, "task_timings", {
+            "tasks": timings,
+            "wall_time": max((t["end"] for t in timings.values()), default=0),
+            "sum_of_task_time": round(sum(t["duration"] for t in timings.values()), 4)
+        })
+        if 'data_summary' in results:
+            self._log(logs, "summary_fields", {"declared": fields, "computed": results['data_summary'].computed})
+        self._log(logs, "trace", {"spans": tracer.spans})
+        if self.llm:
+            # Cumulative for the shared client: how its calls ended so far
+            self._log(logs, "llm_paths", self.llm.path_stats())
+        if profiles:
+            self._log(logs, "profile", {agent: top_functions(profiler) for agent, profiler in profiles.items()})
 
+        self.logs = logs
+        
         # Step 3: Save outputs
-        print("\n💾 Saving results...")
-        self._save_results(results)
-        self._save_logs()
+        if save:
+            print("\n💾 Saving results...")
+            output_config = self.config.get("output", {})
+            self._save_results(results, output_dir or output_config.get("reports_dir", "reports"))
+            self._save_logs(logs, output_dir or output_config.get("logs_dir", "logs"))
+            self._save_trace(tracer, profiles, output_dir or output_config.get("logs_dir", "logs"))
         print("✅ Analysis complete!\n")
+        return results
+
+    def load_data(self, columns=None):
+        """
+        Load and summarize the configured dataset.
+        Returns {"dataframe", "data_summary", "cube", "metric_cache"} (summary
+        only in chunked mode, and in incremental mode when ``columns`` is empty). The cube and metric cache let every query
+        sharing this data reuse its aggregates. ``columns`` limits the frame
+        to what later agents read (None keeps every column).
+        """
+        data_config = self.config.get("data", {})
+        csv_path = data_config.get("csv_path", "data/synthetic_fb_ads_undergarments.csv")
+        chunksize = data_config.get("chunksize")
+        if chunksize:
+            # Out-of-core mode: summary only, the full frame is never materialized
+            return {"data_summary": self.data_agent.stream_summarize(csv_path, chunksize=chunksize)}
+        from src.utils.metric_cache import MetricCache
+        dataset = self.data_agent.load_dataset(csv_path, columns=columns)
+        if "dataframe" in dataset:
+            dataset["metric_cache"] = MetricCache(dataset["dataframe"], cube=dataset["cube"])
+        return dataset
+
+    def _plan_columns(self, plan):
+        """Frame columns read after loading by the agents in ``plan`` (the summary's own are added by the DataAgent)"""
+        agents = {subtask.get("agent") for subtask in plan.get("subtasks", [])}
+        if "evaluator_agent" not in agents:
+            return []
+        from src.agents.evaluator_agent import FRAME_COLUMNS, DEFAULT_SEGMENT_DIMENSIONS
+        columns = set(FRAME_COLUMNS)
+        evaluator_config = self.config.get("evaluator", {})
+        if evaluator_config.get("segment_validation"):
+            for keys in evaluator_config.get("segment_dimensions") or DEFAULT_SEGMENT_DIMENSIONS:
+                columns.update(keys)
+        return sorted(columns)
+
+    def _traced_subtask(self, subtask, results, logs, columns=None, fields=None, profiles=None, prevalidate=False):
+        """Run one subtask inside a span, under its agent's profiler when profiling"""
+        agent_name = subtask.get("agent")
+        with span(f"task {subtask.get('task_id')}: {agent_name}", "subtask", task=subtask.get("task")):
+            if profiles is None:
+                return self._execute_subtask(subtask, results, logs, columns, fields, prevalidate)
+            profiler = profiles.setdefault(agent_name, cProfile.Profile())
+            profiler.enable()
+            try:
+                return self._execute_subtask(subtask, results, logs, columns, fields, prevalidate)
+            finally:
+                profiler.disable()
 
-    def _save_results(self, results):
+    def _execute_subtask(self, subtask, results, logs, columns=None, fields=None, prevalidate=False):
+        """
+        Run the agent assigned to one plan subtask, reading and writing shared results
+
+        With ``prevalidate``, the evaluator's metrics for each hypothesis are
+        computed on a background thread while the insight response streams.
+        """
+        task_id = subtask.get("task_id")
+        task_desc = subtask.get("task")
+        agent_name = subtask.get("agent")
+        
+        print(f"▶ Task {task_id}: {task_desc} (Agent: {agent_name})")
+        
+        # Execute appropriate agent based on plan
+        if agent_name == "data_agent":
+            if 'data_summary' in results:
+                print("  ✓ Reusing already loaded dataset\n")
+                results['data_summary'].prefetch(fields)
+                self._log(logs, "data_reused", {"rows": len(results['dataframe']) if 'dataframe' in results else None})
+                return
+            results.update(self.load_data(columns=columns))
+            summary = results['data_summary'].prefetch(fields)
+            if 'dataframe' in results:
+                df = results['dataframe']
+                memory_mb = round(df.memory_usage(index=False, deep=True).sum() / 2**20, 2)
+                print(f"  ✓ Loaded {len(df)} rows, {summary['total_campaigns']} campaigns ({len(df.columns)} columns, {memory_mb} MB)\n")
+                self._log(logs, "data_loaded", {"rows": len(df), "campaigns": summary['total_campaigns'], "columns": list(df.columns), "memory_mb": memory_mb})
+            elif not self.config["data"].get("chunksize"):
+                print(f"  ✓ Summarized {summary['total_campaigns']} campaigns from the stored aggregates\n")
+                self._log(logs, "data_summarized_incremental", {"campaigns": summary['total_campaigns']})
+            else:
+                chunksize = self.config["data"]["chunksize"]
+                print(f"  ✓ Summarized {summary['total_campaigns']} campaigns in {chunksize:,}-row chunks\n")
+                self._log(logs, "data_summarized_streaming", {"campaigns": summary['total_campaigns'], "chunksize": chunksize})
+        
+        elif agent_name == "insight_agent":
+            if 'data_summary' not in results:
+                print("  ⚠️ Skipping: data_summary not available\n")
+                return
+            start = time.perf_counter()
+            first = []
+            # Validation work for each hypothesis starts as soon as it has streamed in
+            early = ThreadPoolExecutor(max_workers=1) if prevalidate and 'metric_cache' in results else None
+            futures = []
+            
+            def on_insight(item):
+                if not first:
+                    first.append(round(time.perf_counter() - start, 4))
+                if early:
+                    futures.append(early.submit(contextvars.copy_context().run, self._prevalidate, results, item))
+            
+            try:
+                insights = self.insight_agent.generate_insights(results['data_summary'], cube=results.get('cube'), on_insight=on_insight)
+            finally:
+                if early:
+                    early.shutdown(wait=True)
+            results['insights'] = insights
+            print(f"  ✓ Generated {len(insights)} hypotheses\n")
+            self._log(logs, "insights_generated", {
+                "count": len(insights),
+                "first_insight_s": first[0] if first else None,
+                "total_s": round(time.perf_counter() - start, 4),
+                "prevalidated": sum(1 for f in futures if f.exception() is None),
+                "prompt": self.insight_agent.last_prompt_stats
+            })
+        
+        elif agent_name == "evaluator_agent":
+            if 'dataframe' not in results or 'insights' not in results:
+                print("  ⚠️ Skipping: dataframe or insights not available\n")
+                return
+            evaluator_config = self.config.get("evaluator", {})
+            segments = evaluator_config.get("segment_dimensions") if evaluator_config.get("segment_validation") else None
+            validated = self.evaluator.evaluate(
+                results['dataframe'], results['insights'],
+                metrics=results.get('metric_cache'), segments=segments
+            )
+            results['validated_insights'] = validated
+            print(f"  ✓ Validated {len(validated)} insights (confidence ≥ 0.6)\n")
+            self._log(logs, "insights_validated", {"count": len(validated)})
+        
+        elif agent_name == "creative_generator":
+            if 'data_summary' not in results:
+                print("  ⚠️ Skipping: data_summary not available\n")
+                return
+            creatives = self.creatives.generate(results['data_summary'])
+            results['creatives'] = creatives
+            print(f"  ✓ Generated {len(creatives)} creative recommendations\n")
+            self._log(logs, "creatives_generated", {"count": len(creatives), "prompt": self.creatives.last_prompt_stats})
+
+    def _prevalidate(self, results, insight):
+        """Warm the shared metric cache with what validating ``insight`` needs"""
+        evaluator_config = self.config.get("evaluator", {})
+        segments = evaluator_config.get("segment_dimensions") if evaluator_config.get("segment_validation") else None
+        with span("prevalidate", "validate", hypothesis=insight.get("hypothesis")):
+            self.evaluator.prevalidate(results['metric_cache'], insight, segments=segments)
+
+    def _save_results(self, results, reports_dir="reports"):
         """Save JSON and Markdown outputs"""
-        os.makedirs("reports", exist_ok=True)
+        os.makedirs(reports_dir, exist_ok=True)
         
         # Save insights.json
         if 'validated_insights' in results:
-            with open("reports/insights.json", "w") as f:
+            with open(os.path.join(reports_dir, "insights.json"), "w") as f:
                 json.dump(results['validated_insights'], f, indent=4)
         
         # Save creatives.json
         if 'creatives' in results:
-            with open("reports/creatives.json", "w") as f:
+            with open(os.path.join(reports_dir, "creatives.json"), "w") as f:
                 json.dump(results['creatives'], f, indent=4)
         
         # Save report.md
-        self._generate_markdown_report(results)
+        self._generate_markdown_report(results, reports_dir)
     
-    def _generate_markdown_report(self, results):
+    def _generate_markdown_report(self, results, reports_dir="reports"):
         """Generate human-readable markdown report"""
-        with open("reports/report.md", "w") as f:
+        with open(os.path.join(reports_dir, "report.md"), "w") as f:
             f.write("# Facebook Ads Performance Analysis Report\n\n")
             f.write(f"**Generated**: {self._get_timestamp()}\n\n")
             
@@ -166,6 +437,11 @@ class Orchestrator:
                     f.write(f"**Reasoning**: {insight.get('reasoning', 'N/A')}\n\n")
                     f.write(f"**Evidence**: {insight.get('validation_evidence', 'N/A')}\n\n")
                     f.write(f"**Validation Method**: {insight.get('validation_method', 'N/A')}\n\n")
+                    if 'segments' in insight:
+                        f.write(f"**Holds in**: {len(insight['segments'])} of {insight['segments_checked']} segments\n")
+                        for segment in insight['segments'][:5]:
+                            f.write(f"- {segment['dimension']} = {segment['segment']}: {segment['evidence']}\n")
+                        f.write("\n")
                     f.write("---\n\n")
             
             # Creative Recommendations Section
@@ -184,19 +460,26 @@ class Orchestrator:
                     
                     f.write("---\n\n")
     
-    def _log(self, event, data):
-        """Add structured log entry"""
-        self.logs.append({
+    def _log(self, logs, event, data):
+        """Add structured log entry to a run's log"""
+        logs.append({
             "timestamp": self._get_timestamp(),
             "event": event,
             "data": data
         })
     
-    def _save_logs(self):
+    def _save_logs(self, logs, logs_dir="logs"):
         """Save logs to JSON file"""
-        os.makedirs("logs", exist_ok=True)
-        with open("logs/execution_log.json", "w") as f:
-            json.dump(self.logs, f, indent=4)
+        os.makedirs(logs_dir, exist_ok=True)
+        with open(os.path.join(logs_dir, "execution_log.json"), "w") as f:
+            json.dump(logs, f, indent=4)
+    
+    def _save_trace(self, tracer, profiles, logs_dir="logs"):
+        """Save the Chrome trace and, when profiling, one .prof file per agent"""
+        tracer.save_chrome_trace(os.path.join(logs_dir, "trace.json"))
+        for agent, profiler in (profiles or {}).items():
+            os.makedirs(os.path.join(logs_dir, "profile"), exist_ok=True)
+            profiler.dump_stats(os.path.join(logs_dir, "profile", f"{agent}.prof"))
     
     def _get_timestamp(self):
         """Get current timestamp"""
@@ -0,0 +1,76 @@
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from src.utils.plan import dependents_of, normalize_dependencies, validate_plan
+
+
+class DAGScheduler:
+    """
+    Run plan subtasks concurrently as soon as their dependencies finish.
+
+    Subtasks execute on a thread pool (agent work is dominated by LLM round
+    trips, which release the GIL), so independent stages overlap and the
+    run takes roughly as long as the critical path. Per-task start/end
+    offsets are recorded relative to the start of the run. Each task runs
+    in a copy of the caller's context, so context variables (e.g. the
+    active tracer) carry over into the worker threads.
+    """
+
+    def __init__(self, max_workers=4):
+        self.max_workers = max_workers
+
+    def run(self, subtasks, execute):
+        """
+        Call ``execute(subtask)`` for every subtask in dependency order.
+        Returns {task_id: {"agent", "start", "end", "duration", "status"}}.
+        If a task raises, no further tasks are started and the error is
+        re-raised once the running ones finish.
+        """
+        validate_plan(subtasks)
+        deps = normalize_dependencies(subtasks)
+        by_id = {subtask.get("task_id"): subtask for subtask in subtasks}
+        dependents = dependents_of(deps)
+        remaining = {task_id: len(set(task_deps)) for task_id, task_deps in deps.items()}
+
+        timings = {}
+        origin = time.perf_counter()
+        error = None
+
+        def timed(task_id):
+            start = time.perf_counter() - origin
+            try:
+                execute(by_id[task_id])
+            finally:
+                end = time.perf_counter() - origin
+                timings[task_id] = {
+                    "agent": by_id[task_id].get("agent"),
+                    "start": round(start, 4),
+                    "end": round(end, 4),
+                    "duration": round(end - start, 4)
+                }
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            running = {
+                pool.submit(contextvars.copy_context().run, timed, task_id): task_id
+                for task_id, count in remaining.items() if count == 0
+            }
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task_id = running.pop(future)
+                    if future.exception() is not None:
+                        timings[task_id]["status"] = "failed"
+                        error = error or future.exception()
+                        continue
+                    timings[task_id]["status"] = "completed"
+                    if error is not None:
+                        continue
+                    for child in dependents[task_id]:
+                        remaining[child] -= 1
+                        if remaining[child] == 0:
+                            running[pool.submit(contextvars.copy_context().run, timed, child)] = child
+
+        if error is not None:
+            raise error
+        return timings
@@ -0,0 +1,212 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class BadRequest(Exception):
+    """Raised for malformed or invalid request input (answered with 400)"""
+
+
+class LatencyStats:
+    """Per-endpoint request latencies over a bounded window of recent requests"""
+
+    def __init__(self, window=10000):
+        self.window = window
+        self._samples = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, seconds):
+        """Add one request latency"""
+        with self._lock:
+            self._samples.setdefault(endpoint, deque(maxlen=self.window)).append(seconds * 1000)
+            self._counts[endpoint] = self._counts.get(endpoint, 0) + 1
+
+    def snapshot(self):
+        """{endpoint: {count, p50_ms, p99_ms, max_ms}}"""
+        with self._lock:
+            samples = {endpoint: sorted(values) for endpoint, values in self._samples.items()}
+            counts = dict(self._counts)
+        return {
+            endpoint: {
+                "count": counts[endpoint],
+                "p50_ms": round(_percentile(values, 50), 3),
+                "p99_ms": round(_percentile(values, 99), 3),
+                "max_ms": round(values[-1], 3)
+            }
+            for endpoint, values in samples.items()
+        }
+
+
+class DataStore:
+    """
+    Keeps the loaded dataset warm and reloads it when the source file changes.
+
+    Requests get an immutable snapshot dict; a reload builds a new snapshot
+    and swaps it in, so in-flight queries keep using the data they started with.
+    """
+
+    def __init__(self, orchestrator):
+        self.orchestrator = orchestrator
+        self.csv_path = orchestrator.config.get("data", {}).get("csv_path", "data/synthetic_fb_ads_undergarments.csv")
+        self.reloads = 0
+        self._snapshot = None
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Current data snapshot, reloading first if the CSV changed on disk"""
+        signature = self._stat_signature()
+        if self._snapshot is not None and signature == self._signature:
+            return self._snapshot
+        with self._lock:
+            # Another request may have reloaded while we waited for the lock
+            if self._snapshot is None or signature != self._signature:
+                print(f"📦 Loading dataset {self.csv_path}")
+                self._snapshot = self.orchestrator.load_data()
+                self._signature = signature
+                self.reloads += 1
+            return self._snapshot
+
+    def _stat_signature(self):
+        """Cheap change detector; the ingest cache does the content hashing"""
+        stat = os.stat(self.csv_path)
+        return (stat.st_size, stat.st_mtime_ns)
+
+
+class AnalysisServer:
+    """
+    Resident HTTP server holding the Orchestrator, dataset and summary in memory.
+
+    Endpoints:
+        POST /query    {"query": "..."} -> validated insights and creatives
+        GET  /summary  current data summary
+        GET  /stats    p50/p99 latency per endpoint, reload count
+        GET  /health   liveness check
+    Requests are served concurrently on a thread per connection.
+    """
+
+    def __init__(self, orchestrator, host="127.0.0.1", port=8080):
+        self.orchestrator = orchestrator
+        self.data = DataStore(orchestrator)
+        self.latency = LatencyStats()
+        self.started_at = time.time()
+        self.httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self.httpd.daemon_threads = True
+
+    @property
+    def address(self):
+        """(host, port) actually bound (useful with port 0)"""
+        return self.httpd.server_address[:2]
+
+    def serve_forever(self):
+        """Warm the data, then block serving requests"""
+        self.data.get()
+        host, port = self.address
+        print(f"🌐 Serving on http://{host}:{port} (POST /query, GET /summary, /stats, /health)")
+        self.httpd.serve_forever()
+
+    def shutdown(self):
+        """Stop serving and release the socket"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def handle_query(self, payload):
+        """Run one query against the warm dataset"""
+        if not isinstance(payload, dict):
+            raise BadRequest("Request body must be a JSON object")
+        query = payload.get("query")
+        if not query or not isinstance(query, str):
+            raise BadRequest("Request body must include a 'query' string")
+        results = self.orchestrator.run(query, shared=self.data.get(), save=False)
+        return {
+            "query": query,
+            "validated_insights": results.get("validated_insights", []),
+            "creatives": results.get("creatives", [])
+        }
+
+    def handle_summary(self):
+        """Summary of the currently loaded dataset"""
+        return dict(self.data.get()["data_summary"])
+
+    def handle_stats(self):
+        """Uptime, reload count and latency percentiles"""
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "data_reloads": self.data.reloads,
+            "endpoints": self.latency.snapshot()
+        }
+
+
+def _make_handler(server):
+    """Request handler class bound to one AnalysisServer"""
+
+    routes = {
+        ("POST", "/query"): lambda body: server.handle_query(body),
+        ("GET", "/summary"): lambda body: server.handle_summary(),
+        ("GET", "/stats"): lambda body: server.handle_stats(),
+        ("GET", "/health"): lambda body: {"status": "ok"}
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def _dispatch(self, method):
+            start = time.perf_counter()
+            path = self.path.split("?", 1)[0]
+            route = routes.get((method, path))
+            if route is None:
+                status, payload = 404, {"error": f"No route for {method} {path}"}
+            else:
+                try:
+                    body = self._read_json() if method == "POST" else None
+                    status, payload = 200, route(body)
+                except BadRequest as e:
+                    status, payload = 400, {"error": str(e)}
+                except Exception as e:
+                    status, payload = 500, {"error": str(e)}
+            # Record before replying so a client's next /stats call sees this request
+            endpoint = f"{method} {path}" if route is not None else "unmatched"
+            server.latency.record(endpoint, time.perf_counter() - start)
+            self._send(status, payload)
+
+        def _read_json(self):
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                raise BadRequest("Invalid Content-Length header")
+            raw = self.rfile.read(length) if length > 0 else b""
+            try:
+                return json.loads(raw or b"{}")
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                raise BadRequest(f"Invalid JSON body: {e}")
+
+        def _send(self, status, payload):
+            data = json.dumps(payload, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            # Per-request access lines would drown out the agent progress output
+            pass
+
+    return Handler
+
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
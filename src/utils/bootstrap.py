@@ -0,0 +1,158 @@
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+class Bootstrap:
+    """
+    Batched bootstrap over block sufficient statistics.
+
+    Rows of a sample are scattered into ``n_blocks`` random blocks and reduced
+    to per-block sums (count first, then one sum per column). A resample draws
+    blocks with replacement, which is one (resamples x blocks) weight matrix
+    times the block sums, so cost depends on the block count rather than the
+    row count. Samples with at most ``n_blocks`` rows get one row per block,
+    i.e. the classic row bootstrap.
+
+    Resamples are generated in fixed-size chunks, each with its own seed
+    derived from ``seed`` and the statistic name, so results are identical
+    whether the chunks run serially or across ``workers`` processes.
+
+    ``resample_segment_sums`` does the same for every segment of a table at
+    once, with ``segment_blocks`` blocks per segment and one Poisson(1)
+    weight matrix shared by all segments (the Poisson approximation of the
+    multinomial draw, which lets segments of any size share it), so each
+    batch of segments is one matrix product. Batches hold at most
+    ``segment_batch_mb`` of resampled sums, so memory stays bounded with
+    thousands of segments. The weight matrix of each ``stream`` is drawn
+    once and reused by every table.
+    """
+
+    def __init__(self, seed=42, n_resamples=10000, n_blocks=1000, chunk_size=1000, workers=0, segment_blocks=100, segment_batch_mb=64):
+        self.seed = seed
+        self.n_resamples = n_resamples
+        self.n_blocks = n_blocks
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.segment_blocks = segment_blocks
+        self.segment_batch_mb = segment_batch_mb
+        self._weights = {}
+        self._lock = threading.Lock()
+
+    def resample_sums(self, name, columns):
+        """
+        Bootstrap distribution of column sums for one sample.
+
+        ``columns`` is an (n_rows x k) array. Returns an (n_resamples x (k+1))
+        array whose first column is the resampled row count.
+        """
+        seeds = np.random.SeedSequence([self.seed, zlib.crc32(name.encode("utf-8"))])
+        block_seed, *chunk_seeds = seeds.spawn(1 + -(-self.n_resamples // self.chunk_size))
+        blocks = self._block_sums(np.asarray(columns, dtype="float64"), np.random.default_rng(block_seed))
+
+        sizes = [min(self.chunk_size, self.n_resamples - start) for start in range(0, self.n_resamples, self.chunk_size)]
+        if self.workers and self.workers > 1 and len(sizes) > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                parts = list(pool.map(_resample_chunk, [blocks] * len(sizes), sizes, chunk_seeds))
+        else:
+            parts = [_resample_chunk(blocks, size, seed) for size, seed in zip(sizes, chunk_seeds)]
+        return np.vstack(parts)
+
+    def resample_segment_sums(self, name, codes, columns, n_segments, stream=0):
+        """
+        Bootstrap distributions of column sums for many samples at once.
+
+        ``codes`` gives each row's segment (0 to n_segments - 1; negative rows
+        are left out) and ``columns`` is (n_rows x k). Returns an
+        (n_segments x n_resamples x (k+1)) array whose last axis starts with
+        the resampled row count; a resample that drew no rows has count 0.
+        Samples compared with each other (e.g. two days of one segment) must
+        use different streams so their resamples are independent.
+        Holds every segment at once; see ``iter_segment_sums`` for large tables.
+        """
+        parts = [sums for _, sums in self.iter_segment_sums(name, codes, columns, n_segments, stream)]
+        if not parts:
+            return np.zeros((0, self.n_resamples, np.shape(columns)[-1] + 1 if np.ndim(columns) > 1 else 2))
+        return np.concatenate(parts)
+
+    def iter_segment_sums(self, name, codes, columns, n_segments, stream=0):
+        """
+        ``resample_segment_sums`` in bounded batches: yields (segment slice,
+        (batch x n_resamples x (k+1)) sums). Tables with the same segment
+        count and column count are split at the same boundaries.
+        """
+        codes = np.asarray(codes, dtype="int64")
+        columns = np.asarray(columns, dtype="float64").reshape(len(codes), -1)
+        keep = codes >= 0
+        rng = np.random.default_rng([self.seed, zlib.crc32(name.encode("utf-8"))])
+        blocks = self._segment_block_sums(codes[keep], columns[keep], n_segments, rng)
+        width = columns.shape[1] + 1
+        weights = self._segment_weights(stream)
+        batch = max(1, int(self.segment_batch_mb * 2**20) // (self.n_resamples * width * 8))
+        for start in range(0, n_segments, batch):
+            stop = min(start + batch, n_segments)
+            # (resamples x blocks) @ (blocks x this batch's segment sums)
+            part = blocks[start:stop].transpose(1, 0, 2).reshape(self.segment_blocks, (stop - start) * width)
+            sums = weights @ part
+            yield slice(start, stop), sums.reshape(self.n_resamples, stop - start, width).transpose(1, 0, 2)
+
+    def resample_means(self, name, values):
+        """Bootstrap distribution of the mean of a 1-D sample"""
+        sums = self.resample_sums(name, np.asarray(values, dtype="float64").reshape(-1, 1))
+        return sums[:, 1] / sums[:, 0]
+
+    def _block_sums(self, columns, rng):
+        """(blocks x (k+1)) sums with a leading row-count column"""
+        n_rows = len(columns)
+        if n_rows == 0:
+            raise ValueError("Cannot bootstrap an empty sample")
+        if n_rows <= self.n_blocks:
+            return np.column_stack([np.ones(n_rows), columns])
+        assignment = rng.integers(0, self.n_blocks, n_rows)
+        counts = np.bincount(assignment, minlength=self.n_blocks).astype("float64")
+        sums = [np.bincount(assignment, weights=columns[:, i], minlength=self.n_blocks) for i in range(columns.shape[1])]
+        return np.column_stack([counts] + sums)
+
+    def _segment_weights(self, stream):
+        """Poisson(1) block weights (n_resamples x segment_blocks) of one stream, drawn on first use"""
+        with self._lock:
+            if stream not in self._weights:
+                rng = np.random.default_rng([self.seed, self.segment_blocks, stream])
+                self._weights[stream] = rng.poisson(1.0, (self.n_resamples, self.segment_blocks)).astype("float64")
+            return self._weights[stream]
+
+    def _segment_block_sums(self, codes, columns, n_segments, rng):
+        """(segments x segment_blocks x (k+1)) sums; segments with few rows get one row per block"""
+        n_blocks = self.segment_blocks
+        sizes = np.bincount(codes, minlength=n_segments)
+        # Rank of each row within its segment, so small segments fill blocks 0..n-1
+        order = np.argsort(codes, kind="stable")
+        starts = np.cumsum(sizes) - sizes
+        rank = np.empty(len(codes), dtype="int64")
+        rank[order] = np.arange(len(codes)) - starts[codes[order]]
+        block = np.where(sizes[codes] <= n_blocks, rank, rng.integers(0, n_blocks, len(codes)))
+        flat = codes * n_blocks + block
+        sums = [np.bincount(flat, minlength=n_segments * n_blocks).astype("float64")]
+        sums += [np.bincount(flat, weights=columns[:, i], minlength=n_segments * n_blocks) for i in range(columns.shape[1])]
+        return np.stack(sums, axis=-1).reshape(n_segments, n_blocks, columns.shape[1] + 1)
+
+
+def interval(samples, level=0.95):
+    """Percentile confidence interval of a bootstrap distribution"""
+    tail = (1 - level) / 2 * 100
+    low, high = np.nanpercentile(samples, [tail, 100 - tail])
+    return float(low), float(high)
+
+
+def _resample_chunk(blocks, size, seed):
+    """Resampled sums for ``size`` resamples: multinomial block weights @ block sums"""
+    rng = np.random.default_rng(seed)
+    n_blocks = len(blocks)
+    picks = rng.integers(0, n_blocks, (size, n_blocks))
+    # Row r's weight for block b is how often b was drawn in resample r
+    offsets = (np.arange(size) * n_blocks)[:, None]
+    weights = np.bincount((picks + offsets).ravel(), minlength=size * n_blocks).reshape(size, n_blocks)
+    return weights.astype("float64") @ blocks
+
@@ -0,0 +1,94 @@
+import json
+import os
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+MAPPING_VERSION = 1
+# Runs of whitespace, underscores, pipes and hyphens all separate words
+SEPARATORS = r"[\s_|\-]+"
+
+
+class CampaignNames:
+    """
+    Canonical campaign names with a persisted raw -> canonical mapping.
+
+    Spelling variants of one campaign ("Men ComfortMax Launch",
+    "Men  ComfortMax  Launch", "Men_ComfortMax_Launch") share a key: the
+    name lowercased with separator runs collapsed to one space. A key's
+    canonical name is its most frequent spelling the first time it is seen
+    and stays fixed afterwards, so reports keep the same labels across runs.
+
+    Only distinct raw values are normalized (vectorized string operations),
+    and raw values already in the saved mapping are not normalized again.
+    Rows are relabelled by remapping categorical codes. Safe to share
+    between threads (e.g. concurrent batch or server queries).
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.raw = {}        # raw spelling -> canonical name
+        self.canonical = {}  # normalized key -> canonical name
+        self.last_new = 0    # raw spellings normalized by the last call
+        self._lock = threading.Lock()
+        if path:
+            self._read()
+
+    def canonicalize(self, names):
+        """Categorical Series of canonical names for ``names`` (same index)"""
+        values = names if isinstance(names.dtype, pd.CategoricalDtype) else names.astype("category")
+        raw_values = values.cat.categories
+        codes = values.cat.codes.to_numpy()
+
+        with self._lock:
+            new = ~raw_values.isin(list(self.raw))
+            self.last_new = int(new.sum())
+            if self.last_new:
+                counts = np.bincount(codes[codes >= 0], minlength=len(raw_values))
+                self._learn(raw_values[new], counts[new])
+                self._write()
+            labels = pd.Index([self.raw[r] for r in raw_values])
+
+        categories = labels.unique().sort_values()
+        remap = np.append(categories.get_indexer(labels), -1)  # -1 (missing) stays missing
+        return pd.Series(pd.Categorical.from_codes(remap[codes], categories), index=names.index, name=names.name)
+
+    def _learn(self, raw_values, counts):
+        """Add new raw spellings; unseen keys take their most frequent spelling as canonical"""
+        keys = normalize(pd.Series(raw_values, dtype=object))
+        spellings = pd.DataFrame({"raw": raw_values, "key": keys.to_numpy(), "rows": counts})
+        most_frequent = spellings.sort_values(["rows", "raw"], ascending=[False, True]).drop_duplicates("key")
+        for key, raw in zip(most_frequent["key"], most_frequent["raw"]):
+            self.canonical.setdefault(key, raw)
+        for raw, key in zip(spellings["raw"], spellings["key"]):
+            self.raw[raw] = self.canonical[key]
+
+    def _read(self):
+        """Load the saved mapping; a missing, unreadable or outdated file starts empty"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        if saved.get("version") != MAPPING_VERSION:
+            return
+        self.raw = saved["raw"]
+        self.canonical = saved["canonical"]
+
+    def _write(self):
+        """Atomically replace the saved mapping (callers hold the lock)"""
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        # A unique temp file per writer, so concurrent processes never share one
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, prefix=f"{os.path.basename(self.path)}.", suffix=".tmp", delete=False) as f:
+            json.dump({"version": MAPPING_VERSION, "raw": self.raw, "canonical": self.canonical}, f)
+        os.replace(f.name, self.path)
+
+
+def normalize(names):
+    """Lowercase, trimmed, single-spaced keys for a Series of names"""
+    return names.str.replace(SEPARATORS, " ", regex=True).str.strip().str.casefold()
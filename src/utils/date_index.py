@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+
+class DateIndex:
+    """
+    Row positions of a frame sorted by parsed date, partitioned per day.
+
+    Date strings are parsed once (only the distinct values), and rows are
+    argsorted by day a single time. After that, a day or a range of days is
+    a pair of binary searches returning a contiguous slice of positions, so
+    "last N dates" or period-over-period windows cost O(log n) plus the rows
+    in the window instead of a scan and sort of the whole table. Rows whose
+    date does not parse are left out.
+    """
+
+    def __init__(self, dates):
+        codes, uniques = pd.factorize(pd.Series(dates), sort=False)
+        parsed = pd.to_datetime(pd.Series(uniques, dtype=object), errors="coerce").to_numpy().astype("datetime64[D]")
+        row_days = np.where(codes >= 0, parsed[np.maximum(codes, 0)], np.datetime64("NaT"))
+
+        valid = np.flatnonzero(~np.isnat(row_days))
+        self.order = valid[np.argsort(row_days[valid], kind="stable")]
+        self.sorted_days = row_days[self.order]
+        # One partition per distinct day: rows order[starts[i]:ends[i]]
+        self.days, self.starts = np.unique(self.sorted_days, return_index=True)
+        self.ends = np.append(self.starts[1:], len(self.order))
+
+        # Label each day with its original value so outputs keep the source format
+        labels = {}
+        for value, day in zip(uniques, parsed):
+            if not np.isnat(day):
+                labels.setdefault(day, value)
+        self.labels = [labels[day] for day in self.days]
+
+    def __len__(self):
+        """Number of distinct days"""
+        return len(self.days)
+
+    def rows(self, start=None, end=None):
+        """Positions of rows dated within [start, end] (inclusive; None is open)"""
+        lo = 0 if start is None else np.searchsorted(self.sorted_days, np.datetime64(start, "D"), side="left")
+        hi = len(self.order) if end is None else np.searchsorted(self.sorted_days, np.datetime64(end, "D"), side="right")
+        return self.order[lo:hi]
+
+    def day_rows(self, label):
+        """Positions of the rows in one day's partition (empty if absent)"""
+        day = np.datetime64(pd.Timestamp(label), "D")
+        i = np.searchsorted(self.days, day)
+        if i == len(self.days) or self.days[i] != day:
+            return self.order[:0]
+        return self.order[self.starts[i]:self.ends[i]]
+
+    def window(self, n_dates, offset=0):
+        """
+        Indices into ``days`` of the ``n_dates`` most recent distinct dates,
+        shifted back ``offset`` whole windows (1 = the previous period).
+        """
+        end = len(self.days) - offset * n_dates
+        return np.arange(max(end - n_dates, 0), max(end, 0))
+
+    def window_rows(self, n_dates, offset=0):
+        """(positions, per-row day number within the window) for a date window"""
+        days = self.window(n_dates, offset)
+        if len(days) == 0:
+            return self.order[:0], np.empty(0, dtype=int)
+        lo, hi = self.starts[days[0]], self.ends[days[-1]]
+        day_numbers = np.repeat(np.arange(len(days)), self.ends[days] - self.starts[days])
+        return self.order[lo:hi], day_numbers
+
+    def window_labels(self, n_dates, offset=0):
+        """Original date values of a window, oldest first"""
+        return [self.labels[i] for i in self.window(n_dates, offset)]
+
+    def daily_mean(self, values, n_dates, offset=0):
+        """Mean of ``values`` per day over a window, as a Series keyed by date label"""
+        positions, day_numbers = self.window_rows(n_dates, offset)
+        window = pd.Series(np.asarray(values)[positions]).groupby(day_numbers).mean()
+        labels = self.window_labels(n_dates, offset)
+        return pd.Series(window.reindex(range(len(labels))).to_numpy(), index=pd.Index(labels, name="date"))
@@ -0,0 +1,149 @@
+import hashlib
+import os
+
+import pandas as pd
+
+from src.utils import summary_engine
+
+STATE_VERSION = 2
+TAIL_BYTES = 64 * 1024
+
+
+class IncrementalSummary:
+    """
+    Persisted summary aggregates for an append-only CSV.
+
+    The aggregate state (per-date, per-platform and per-campaign sums and
+    counts) is stored next to the dataset together with the byte offset
+    already folded in. Each update only parses and folds the rows appended
+    after that offset (whatever their date, so late rows for the last
+    folded day count too), so the cost follows the size of the new data
+    rather than the full history.
+
+    If the already-folded prefix of the file changed (rewrite, truncation)
+    or did not end on a line break (a row was still being written), the
+    state is rebuilt from scratch. ``clean`` (a chunk -> chunk function,
+    e.g. campaign name canonicalization) is applied before folding; toggling
+    it also rebuilds the state.
+    """
+
+    def __init__(self, csv_path, state_path=None, chunksize=500_000, clean=None):
+        self.csv_path = csv_path
+        self.state_path = state_path or f"{csv_path}.aggstate"
+        self.chunksize = chunksize
+        self.clean = clean
+        self.last_update = {}
+
+    def update(self):
+        """Fold in new rows, persist the state and return the aggregates"""
+        saved = self._load_state()
+        size = os.path.getsize(self.csv_path)
+
+        cleaned = self.clean is not None
+        if saved is not None and saved.get("cleaned", False) == cleaned and self._prefix_unchanged(saved, size):
+            if size == saved["offset"]:
+                self.last_update = {"mode": "unchanged", "rows_folded": 0}
+                return saved["aggregates"]
+            new_rows = self._read_appended(saved["columns"], saved["offset"])
+            aggregates, folded = self._fold(saved["aggregates"], new_rows)
+            mode = "incremental"
+            columns = saved["columns"]
+        else:
+            chunks = pd.read_csv(self.csv_path, usecols=summary_engine.SUMMARY_COLUMNS, chunksize=self.chunksize)
+            aggregates, folded = self._fold(None, chunks)
+            mode = "rebuild"
+            columns = self._read_header()
+
+        if aggregates is None:
+            raise ValueError(f"No rows found in {self.csv_path}")
+
+        self._save_state({
+            "version": STATE_VERSION,
+            "cleaned": cleaned,
+            "columns": columns,
+            "offset": size,
+            "tail_sha256": self._tail_hash(size),
+            "aggregates": aggregates
+        })
+        self.last_update = {"mode": mode, "rows_folded": folded}
+        return aggregates
+
+    def summary(self, trend_days=7):
+        """Update the state and return the finalized summary dict"""
+        return summary_engine.finalize_summary(self.update(), trend_days=trend_days)
+
+    def _fold(self, aggregates, chunks):
+        """Merge chunk aggregates into ``aggregates``"""
+        folded = 0
+        for chunk in chunks:
+            if self.clean is not None:
+                chunk = self.clean(chunk)
+            if chunk.empty:
+                continue
+            partial = summary_engine.compute_aggregates(chunk)
+            aggregates = partial if aggregates is None else summary_engine.merge_aggregates(aggregates, partial)
+            folded += len(chunk)
+        return aggregates, folded
+
+    def _read_appended(self, columns, offset):
+        """Parse only the bytes after ``offset``, in chunks, using the saved header"""
+        handle = open(self.csv_path, "rb")
+        handle.seek(offset)
+        reader = pd.read_csv(
+            handle,
+            header=None,
+            names=columns,
+            usecols=summary_engine.SUMMARY_COLUMNS,
+            chunksize=self.chunksize
+        )
+        try:
+            for chunk in reader:
+                yield chunk
+        finally:
+            handle.close()
+
+    def _read_header(self):
+        """Column names from the first line of the CSV"""
+        return list(pd.read_csv(self.csv_path, nrows=0).columns)
+
+    def _prefix_unchanged(self, saved, size):
+        """The folded prefix must still exist, end with the same bytes and end on a complete line"""
+        if saved["offset"] > size:
+            return False
+        if not self._ends_line(saved["offset"]):
+            return False
+        return self._tail_hash(saved["offset"]) == saved["tail_sha256"]
+
+    def _ends_line(self, offset):
+        """Whether the byte before ``offset`` is a newline, so parsing can resume there"""
+        if offset == 0:
+            return True
+        with open(self.csv_path, "rb") as f:
+            f.seek(offset - 1)
+            return f.read(1) == b"\n"
+
+    def _tail_hash(self, end):
+        """SHA-256 of the last TAIL_BYTES bytes before ``end``"""
+        start = max(0, end - TAIL_BYTES)
+        with open(self.csv_path, "rb") as f:
+            f.seek(start)
+            return hashlib.sha256(f.read(end - start)).hexdigest()
+
+    def _load_state(self):
+        """Load the saved state, or None if missing, unreadable or outdated"""
+        if not os.path.exists(self.state_path):
+            return None
+        try:
+            saved = pd.read_pickle(self.state_path)
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable summary state {self.state_path}: {e}")
+            return None
+        if not isinstance(saved, dict) or saved.get("version") != STATE_VERSION:
+            return None
+        return saved
+
+    def _save_state(self, state):
+        """Write the state atomically so readers never see a partial file"""
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        pd.to_pickle(state, tmp_path)
+        os.replace(tmp_path, self.state_path)
@@ -0,0 +1,204 @@
+import hashlib
+import io
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from src.utils.tracing import annotate
+
+CACHE_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+
+class IngestCache:
+    """
+    Binary columnar cache for CSV ingest.
+
+    The first load of a CSV parses it once and writes every column as a
+    ``.npy`` file (text columns as int32 codes plus a category list).
+    Later loads read those files back instead of parsing text again.
+    Entries are keyed by source path, size, mtime and content hash, so an
+    edited CSV is rebuilt automatically on the next load.
+    """
+
+    def __init__(self, cache_dir=".cache/ingest"):
+        self.cache_dir = cache_dir
+
+    def load(self, path, usecols=None, categories=()):
+        """
+        Return the CSV at ``path`` as a DataFrame, rebuilding the cache if
+        stale. Text columns named in ``categories`` come back as categoricals
+        built straight from the stored codes.
+        """
+        manifest = self._fresh_manifest(path)
+        return self._read_columns(self._entry_dir(path), manifest, usecols, categories)
+
+    def version(self, path):
+        """Content hash identifying the current version of the CSV (no rehash when unchanged)"""
+        return self._fresh_manifest(path)["sha256"]
+
+    def _fresh_manifest(self, path):
+        """Manifest describing the file as it is now, rebuilding the entry if stale"""
+        entry_dir = self._entry_dir(path)
+        manifest = self._read_manifest(entry_dir)
+        stat = os.stat(path)
+
+        fresh = self._is_fresh(path, stat, manifest)
+        annotate(cache_hit=fresh)
+        if not fresh:
+            manifest = self._build(path, stat, entry_dir)
+        return manifest
+
+    def _entry_dir(self, path):
+        """One cache entry per absolute source path"""
+        key = hashlib.sha256(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, key)
+
+    def _read_manifest(self, entry_dir):
+        """Load the entry manifest, or None if missing or unreadable"""
+        try:
+            with open(os.path.join(entry_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("version") != CACHE_VERSION:
+            return None
+        return manifest
+
+    def _is_fresh(self, path, stat, manifest):
+        """
+        Check whether the manifest still describes the source file.
+        Size and mtime are checked first; the content hash is only computed
+        when the size matches but the mtime moved (e.g. a touch or re-copy).
+        """
+        if manifest is None:
+            return False
+        if manifest["path"] != os.path.abspath(path) or manifest["size"] != stat.st_size:
+            return False
+        if manifest["mtime_ns"] == stat.st_mtime_ns:
+            return True
+
+        if hash_file(path) != manifest["sha256"]:
+            return False
+
+        # Same bytes, new mtime: refresh the manifest so the next load skips hashing
+        manifest["mtime_ns"] = stat.st_mtime_ns
+        self._write_manifest(self._entry_dir(path), manifest)
+        return True
+
+    def _build(self, path, stat, entry_dir):
+        """
+        Parse the CSV once and write one binary file per column. The hash and
+        size are taken from the bytes the parser read, so a file edited
+        mid-build is stored under what was actually parsed and rebuilt on
+        the next load.
+        """
+        with open(path, "rb") as f:
+            source = _HashingReader(f)
+            df = pd.read_csv(io.BufferedReader(source))
+            for _ in iter(lambda: source.read(1 << 20), b""):
+                pass
+        sha256 = source.digest.hexdigest()
+        data_dir = os.path.join(entry_dir, sha256[:16])
+        os.makedirs(data_dir, exist_ok=True)
+
+        columns = []
+        for idx, name in enumerate(df.columns):
+            series = df[name]
+            filename = f"col_{idx}.npy"
+            if series.dtype == object:
+                codes, uniques = pd.factorize(series, use_na_sentinel=True)
+                np.save(os.path.join(data_dir, filename), codes.astype(np.int32))
+                columns.append({
+                    "name": name,
+                    "kind": "text",
+                    "file": filename,
+                    "categories": [str(u) for u in uniques]
+                })
+            else:
+                np.save(os.path.join(data_dir, filename), series.to_numpy())
+                columns.append({"name": name, "kind": "numeric", "file": filename})
+
+        manifest = {
+            "version": CACHE_VERSION,
+            "path": os.path.abspath(path),
+            "size": source.size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": sha256,
+            "data_dir": os.path.basename(data_dir),
+            "rows": len(df),
+            "columns": columns
+        }
+        self._write_manifest(entry_dir, manifest)
+        self._remove_stale_data_dirs(entry_dir, manifest["data_dir"])
+        return manifest
+
+    def _read_columns(self, entry_dir, manifest, usecols=None, categories=()):
+        """Rebuild a DataFrame from the column files"""
+        data_dir = os.path.join(entry_dir, manifest["data_dir"])
+        wanted = set(usecols) if usecols is not None else None
+        categories = set(categories)
+
+        data = {}
+        for col in manifest["columns"]:
+            if wanted is not None and col["name"] not in wanted:
+                continue
+            # Plain reads, not memory maps: the frame must be writable and must
+            # not pin files that a later rebuild deletes (which fails on Windows)
+            values = np.load(os.path.join(data_dir, col["file"]))
+            if col["kind"] == "text" and col["name"] in categories:
+                # Sorted categories, as read_csv infers them, so groupby output order matches
+                values = pd.Categorical.from_codes(values, col["categories"]).reorder_categories(sorted(col["categories"]))
+            elif col["kind"] == "text":
+                # Append NaN so the -1 "missing" code indexes it directly
+                lookup = np.array(col["categories"] + [np.nan], dtype=object)
+                values = lookup[values]
+            data[col["name"]] = values
+
+        # Every array above is freshly read or built, so the frame can own them
+        return pd.DataFrame(data, copy=False)
+
+    def _write_manifest(self, entry_dir, manifest):
+        """Atomically replace the manifest (safe against concurrent readers)"""
+        os.makedirs(entry_dir, exist_ok=True)
+        tmp_path = os.path.join(entry_dir, f"{MANIFEST_NAME}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, os.path.join(entry_dir, MANIFEST_NAME))
+
+    def _remove_stale_data_dirs(self, entry_dir, keep):
+        """Drop column files left behind by previous versions of the source"""
+        for name in os.listdir(entry_dir):
+            full = os.path.join(entry_dir, name)
+            if name != keep and os.path.isdir(full):
+                shutil.rmtree(full, ignore_errors=True)
+
+
+class _HashingReader(io.RawIOBase):
+    """Read-only file wrapper that hashes and counts every byte read through it"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = self.raw.readinto(buffer)
+        self.digest.update(memoryview(buffer)[:n])
+        self.size += n
+        return n
+
+
+def hash_file(path, chunk_size=1 << 20):
+    """SHA-256 of the file contents, read in 1 MiB chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,139 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.utils.date_index import DateIndex
+from src.utils.tracing import span
+
+
+class MetricCache:
+    """
+    Memoized base aggregates over one DataFrame.
+
+    Validators ask for metrics by name (plus optional parameters) and each
+    distinct request is computed once, however many hypotheses need it.
+    Safe to share between threads, e.g. across batch or server queries
+    running against the same loaded frame.
+
+    With a RollupCube over the same frame, grouped metrics are read from
+    the cube instead of scanning the rows.
+    """
+
+    def __init__(self, df, cube=None):
+        self.df = df
+        self.cube = cube
+        self.computed = {}  # metric key -> times computed (for stats/tests)
+        self._values = {}
+        self._lock = threading.RLock()  # derived values may compute base metrics
+
+    def get(self, name, *params):
+        """Value of metric ``name``, computing it on first request"""
+        return self.memo((name,) + params, lambda: getattr(self, f"_compute_{name}")(*params))
+
+    def memo(self, key, compute):
+        """Memoize an arbitrary derived value (e.g. a validator's per-segment table) under ``key``"""
+        if key in self._values:
+            return self._values[key]
+        with self._lock:
+            if key not in self._values:
+                with span(f"metric.{key[0]}", "groupby", params=repr(key[1:]) if len(key) > 1 else None):
+                    self._values[key] = compute()
+                self.computed[key] = self.computed.get(key, 0) + 1
+            return self._values[key]
+
+    def _cube_covers(self, *dimensions):
+        """Whether the rollup cube can answer a query over these dimensions"""
+        return self.cube is not None and self.cube.has(*dimensions)
+
+    def _compute_roas_by_date(self):
+        if self._cube_covers("date"):
+            return self.cube.query(by=["date"])["avg_roas"].rename("roas")
+        return self.df.groupby("date", observed=True)["roas"].mean()
+
+    def _compute_date_index(self):
+        return DateIndex(self.df["date"])
+
+    def _compute_roas_trend(self, days):
+        """Daily mean ROAS over the ``days`` most recent dates (a range lookup, not a full groupby)"""
+        return self.get("date_index").daily_mean(self.df["roas"], days)
+
+    def _compute_roas_by_platform(self):
+        if self._cube_covers("platform"):
+            return self.cube.query(by=["platform"])["avg_roas"].rename("roas")
+        return self.df.groupby("platform", observed=True)["roas"].mean()
+
+    def _compute_ctr_mean(self):
+        if self.cube is not None:
+            return self.cube.query()["avg_ctr"]
+        return self.df["ctr"].mean()
+
+    def _compute_ctr_below_pct(self, threshold):
+        if self.cube is not None and threshold == self.cube.low_ctr_threshold:
+            totals = self.cube.query()
+            return totals["ctr_below_count"] / totals["rows"] * 100
+        return (self.df["ctr"] < threshold).sum() / len(self.df) * 100
+
+    def _compute_spend_roas_corr(self):
+        if self.cube is not None:
+            return self.cube.correlation(self.cube.query())
+        return self.df[["spend", "roas"]].corr().iloc[0, 1]
+
+    # Segment-level metrics: one grouped computation over every segment of
+    # ``keys`` (a tuple of columns), indexed by segment
+
+    def _compute_segment_codes(self, keys):
+        """(segment number per row, -1 where a key is missing; segment labels in number order)"""
+        grouped = self.df.groupby(list(keys), observed=True, sort=True)
+        codes = grouped.ngroup().fillna(-1).to_numpy(dtype="int64")
+        return codes, grouped.size().index
+
+    def _compute_roas_trend_by(self, keys, days):
+        """First/last daily mean ROAS per segment within the ``days`` most recent dates"""
+        keys = list(keys)
+        index = self.get("date_index")
+        if self._cube_covers(*keys, "date"):
+            labels = index.window_labels(days)
+            daily = self.cube.query(by=keys + ["date"], where={"date": labels})["avg_roas"]
+            daily = daily.rename(index={label: i for i, label in enumerate(labels)}, level="date")
+        else:
+            positions, day_numbers = index.window_rows(days)
+            rows = self.df.iloc[positions].assign(date=day_numbers)
+            daily = rows.groupby(keys + ["date"], observed=True)["roas"].mean()
+        window = daily.dropna().sort_index().groupby(level=list(range(len(keys))), observed=True)
+        return pd.DataFrame({"first": window.first(), "last": window.last(), "days": window.size()})
+
+    def _compute_ctr_by(self, keys, threshold):
+        """Mean CTR and percent of rows below ``threshold`` per segment"""
+        if self._cube_covers(*keys) and threshold == self.cube.low_ctr_threshold:
+            sums = self.cube.query(by=list(keys))
+            return pd.DataFrame({"mean": sums["avg_ctr"], "pct_below": sums["ctr_below_count"] / sums["rows"] * 100})
+        ctr = self.df["ctr"]
+        frame = pd.DataFrame({"ctr": ctr, "below": (ctr < threshold) * 100.0})
+        for key in keys:
+            frame[key] = self.df[key]
+        grouped = frame.groupby(list(keys), observed=True).mean()
+        return grouped.rename(columns={"ctr": "mean", "below": "pct_below"})
+
+    def _compute_platform_roas_by(self, keys):
+        """Segment x platform table of mean ROAS"""
+        if self._cube_covers(*keys, "platform"):
+            return self.cube.query(by=list(keys) + ["platform"])["avg_roas"].unstack("platform")
+        return self.df.groupby(list(keys) + ["platform"], observed=True)["roas"].mean().unstack("platform")
+
+    def _compute_spend_roas_corr_by(self, keys):
+        """Pearson spend/ROAS correlation per segment from grouped moment sums"""
+        if self._cube_covers(*keys):
+            return self.cube.correlation(self.cube.query(by=list(keys)))
+        valid = self.df[["spend", "roas"]].notna().all(axis=1)
+        x = self.df["spend"].where(valid).astype("float64")
+        y = self.df["roas"].where(valid).astype("float64")
+        moments = pd.DataFrame({"n": valid.astype("float64"), "x": x, "y": y, "xy": x * y, "xx": x * x, "yy": y * y})
+        for key in keys:
+            moments[key] = self.df[key]
+        sums = moments.groupby(list(keys), observed=True).sum()
+        n = sums["n"]
+        cov = n * sums["xy"] - sums["x"] * sums["y"]
+        var = (n * sums["xx"] - sums["x"] ** 2) * (n * sums["yy"] - sums["y"] ** 2)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return cov / np.sqrt(var.where(var > 0))
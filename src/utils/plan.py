@@ -0,0 +1,90 @@
+class PlanValidationError(ValueError):
+    """Raised when plan subtasks reference unknown tasks or form a cycle (planner and scheduler)"""
+
+
+def normalize_dependencies(subtasks):
+    """
+    Return {task_id: [dependency ids]} for a list of plan subtasks.
+    Subtasks without a ``dependencies`` field depend on the previous subtask,
+    which keeps plans written for sequential execution correct.
+    """
+    deps = {}
+    previous = None
+    for subtask in subtasks:
+        task_id = subtask.get("task_id")
+        if task_id in deps:
+            raise PlanValidationError(f"Duplicate task_id {task_id!r}")
+        if "dependencies" in subtask:
+            deps[task_id] = list(subtask.get("dependencies") or [])
+        else:
+            deps[task_id] = [previous] if previous is not None else []
+        previous = task_id
+    return deps
+
+
+def validate_plan(subtasks):
+    """
+    Check that every dependency exists and the graph is acyclic.
+    Returns a topological order of task ids.
+    """
+    deps = normalize_dependencies(subtasks)
+
+    for task_id, task_deps in deps.items():
+        missing = [d for d in task_deps if d not in deps]
+        if missing:
+            raise PlanValidationError(f"Task {task_id!r} depends on unknown task(s) {missing}")
+
+    # Kahn's algorithm: anything left unvisited sits on a cycle
+    remaining = {task_id: len(set(task_deps)) for task_id, task_deps in deps.items()}
+    dependents = dependents_of(deps)
+    ready = [task_id for task_id, count in remaining.items() if count == 0]
+    order = []
+    while ready:
+        task_id = ready.pop(0)
+        order.append(task_id)
+        for child in dependents[task_id]:
+            remaining[child] -= 1
+            if remaining[child] == 0:
+                ready.append(child)
+
+    if len(order) != len(deps):
+        cyclic = sorted(str(t) for t in deps if t not in order)
+        raise PlanValidationError(f"Dependency cycle between tasks {cyclic}")
+    return order
+
+
+def dependents_of(deps):
+    """Invert {task: deps} into {task: tasks that depend on it}"""
+    dependents = {task_id: [] for task_id in deps}
+    for task_id, task_deps in deps.items():
+        for dep in set(task_deps):
+            dependents[dep].append(task_id)
+    return dependents
+
+
+def drop_agents(subtasks, agents):
+    """
+    Return ``subtasks`` without those run by ``agents``. Kept subtasks get
+    explicit dependencies and inherit those of any dropped subtask they
+    waited on, so the remaining tasks still run in the same order.
+    """
+    deps = normalize_dependencies(subtasks)
+    dropped = {s.get("task_id") for s in subtasks if s.get("agent") in agents}
+
+    def resolve(task_ids, seen):
+        resolved = []
+        for dep in task_ids:
+            if dep not in dropped:
+                resolved.append(dep)
+            elif dep not in seen:
+                seen.add(dep)
+                resolved.extend(resolve(deps.get(dep, []), seen))
+        return resolved
+
+    kept = []
+    for subtask in subtasks:
+        if subtask.get("task_id") in dropped:
+            continue
+        resolved = resolve(deps[subtask.get("task_id")], set())
+        kept.append(dict(subtask, dependencies=list(dict.fromkeys(resolved))))
+    return kept
@@ -0,0 +1,237 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.utils.tracing import annotate
+
+CUBE_VERSION = 2
+
+DIMENSIONS = ["campaign_name", "adset_name", "date", "platform", "country", "creative_type", "audience_type"]
+# Additive measures: sums roll up to any level, ratios are derived afterwards
+MEASURES = ["spend", "impressions", "clicks", "purchases", "revenue"]
+# Row-level rates kept as sum/count so unweighted row means can be derived too
+ROW_RATES = ["roas", "ctr"]
+# Coarser levels materialized at build time; queries roll up from the
+# smallest stored level that contains their dimensions
+ROLLUP_LEVELS = [
+    ["date", "platform", "country", "creative_type", "audience_type"],
+    ["campaign_name", "date", "platform", "country"],
+    ["campaign_name", "platform", "country", "creative_type", "audience_type"]
+]
+# Spend/ROAS moments over rows where both are present, for correlations
+PAIR_COLUMNS = ["pair_count", "pair_spend_sum", "pair_roas_sum", "pair_spend_roas_sum", "pair_spend_sq_sum", "pair_roas_sq_sum"]
+
+
+class RollupCube:
+    """
+    Pre-aggregated rollup over the campaign dimensions.
+
+    The base cuboid holds one row per distinct combination of the
+    dimensions present in the frame, with additive columns only: row count,
+    ``<m>_sum``/``<m>_count`` per measure and row rate, rows below the
+    low-CTR threshold and spend/ROAS pair moments. Any coarser level is a
+    groupby-sum of a finer one, and ROAS/CTR (weighted or row-mean) and
+    correlations are derived after rolling up.
+
+    The ``ROLLUP_LEVELS`` are materialized when the cube is built; other
+    cuboids are memoized on first use. Each is rolled up from the smallest
+    stored cuboid that still contains the requested dimensions, so a
+    drill-down sequence never goes back to the raw rows. Dimensions are
+    stored as categoricals; query results are indexed by plain values.
+    """
+
+    def __init__(self, base, dimensions, low_ctr_threshold=0.02, cuboids=None):
+        self.base = base
+        self.dimensions = list(dimensions)
+        self.low_ctr_threshold = low_ctr_threshold
+        self.measure_columns = [c for c in base.columns if c not in self.dimensions]
+        self._cuboids = {frozenset(keys): cuboid for keys, cuboid in (cuboids or {}).items()}
+        self._cuboids[frozenset(self.dimensions)] = base
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, df, low_ctr_threshold=0.02):
+        """One grouped pass over the raw rows"""
+        dimensions = [d for d in DIMENSIONS if d in df.columns]
+        facts = {"rows": np.ones(len(df))}
+        for metric in MEASURES + ROW_RATES:
+            if metric in df.columns:
+                facts[f"{metric}_sum"] = df[metric]
+                facts[f"{metric}_count"] = df[metric].notna().astype("float64")
+        if "ctr" in df.columns:
+            facts["ctr_below_count"] = (df["ctr"] < low_ctr_threshold).astype("float64")
+        if "spend" in df.columns and "roas" in df.columns:
+            valid = df["spend"].notna() & df["roas"].notna()
+            x = df["spend"].where(valid).astype("float64")
+            y = df["roas"].where(valid).astype("float64")
+            facts.update(dict(zip(PAIR_COLUMNS, [valid.astype("float64"), x, y, x * y, x * x, y * y])))
+
+        frame = pd.DataFrame(facts, index=df.index)
+        for dim in dimensions:
+            frame[dim] = df[dim].astype("category")
+        if dimensions:
+            base = frame.groupby(dimensions, dropna=False, observed=True, sort=False).sum().reset_index()
+        else:
+            base = frame.sum().to_frame().T
+        cube = cls(base, dimensions, low_ctr_threshold)
+        for level in ROLLUP_LEVELS:
+            if cube.has(*level) and len(level) < len(dimensions):
+                cube._cuboid(set(level))
+        return cube
+
+    @property
+    def cuboids(self):
+        """Stored cuboids other than the base, by sorted dimension tuple (for persisting)"""
+        return {tuple(sorted(keys)): c for keys, c in self._cuboids.items() if c is not self.base}
+
+    def has(self, *dimensions):
+        """Whether every named dimension is in the cube"""
+        return set(dimensions) <= set(self.dimensions)
+
+    def query(self, by=(), where=None):
+        """
+        Measures rolled up to ``by`` (a list of dimensions), optionally
+        restricted by ``where`` ({dimension: value or list of values}).
+        Returns a frame indexed by ``by`` (a Series when ``by`` is empty)
+        with the additive columns plus derived ``roas``, ``ctr``,
+        ``avg_roas`` and ``avg_ctr``.
+        """
+        by = list(by)
+        where = where or {}
+        cuboid = self._cuboid(set(by) | set(where))
+        for dim, values in where.items():
+            values = values if isinstance(values, (list, tuple, set)) else [values]
+            cuboid = cuboid[cuboid[dim].isin(values)]
+        if not by:
+            return self._derive(cuboid[self.measure_columns].sum())
+        grouped = cuboid.groupby(by, observed=True)[self.measure_columns].sum()
+        return self._derive(_plain_index(grouped))
+
+    def correlation(self, sums):
+        """Pearson spend/ROAS correlation from pair moments (Series or frame)"""
+        n = sums["pair_count"]
+        sx, sy = sums["pair_spend_sum"], sums["pair_roas_sum"]
+        cov = n * sums["pair_spend_roas_sum"] - sx * sy
+        var = (n * sums["pair_spend_sq_sum"] - sx ** 2) * (n * sums["pair_roas_sq_sum"] - sy ** 2)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if np.ndim(var) == 0:
+                return cov / np.sqrt(var) if var > 0 else np.nan
+            return cov / np.sqrt(var.where(var > 0))
+
+    def _cuboid(self, dims):
+        """Cached cuboid over exactly ``dims``, rolled up from the smallest cached superset"""
+        key = frozenset(dims)
+        with self._lock:
+            if key in self._cuboids:
+                return self._cuboids[key]
+            source = min(
+                (c for keys, c in self._cuboids.items() if key <= keys),
+                key=len
+            )
+            if dims:
+                cuboid = source.groupby(sorted(dims), dropna=False, observed=True, sort=False)[self.measure_columns].sum().reset_index()
+            else:
+                cuboid = source[self.measure_columns].sum().to_frame().T
+            self._cuboids[key] = cuboid
+            return cuboid
+
+    def _derive(self, sums):
+        """Append ratio columns computed from the rolled-up sums"""
+        derived = {}
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if "revenue_sum" in sums and "spend_sum" in sums:
+                derived["roas"] = sums["revenue_sum"] / sums["spend_sum"]
+            if "clicks_sum" in sums and "impressions_sum" in sums:
+                derived["ctr"] = sums["clicks_sum"] / sums["impressions_sum"]
+            for rate in ROW_RATES:
+                if f"{rate}_sum" in sums:
+                    derived[f"avg_{rate}"] = sums[f"{rate}_sum"] / sums[f"{rate}_count"]
+        if isinstance(sums, pd.Series):
+            return pd.concat([sums, pd.Series(derived, dtype="float64")])
+        return sums.assign(**derived)
+
+
+class CubeStore:
+    """
+    Persisted cubes, one per source file and dataset version.
+
+    A cube is built the first time a dataset version (content hash) is
+    seen and pickled under ``cache_dir``; later runs load it instead of
+    aggregating the raw rows again. Cubes of older versions of the same
+    source are removed when a new one is written; other thresholds and
+    variants of the current version are kept, so configs sharing a dataset
+    don't evict each other. Safe for concurrent builders (threads or
+    processes): each writes its own temp file and renames it into place.
+    """
+
+    def __init__(self, cache_dir=".cache/cube"):
+        self.cache_dir = cache_dir
+
+    def get(self, source_path, version, build, low_ctr_threshold=0.02, variant=""):
+        """
+        Cube for this dataset version, building and persisting it on a miss.
+        ``variant`` tags cubes built from differently cleaned rows of the same data.
+        """
+        entry_dir = os.path.join(self.cache_dir, hashlib.sha256(os.path.abspath(source_path).encode("utf-8")).hexdigest()[:16])
+        filename = f"{version[:16]}-{low_ctr_threshold}{'-' + variant if variant else ''}.pkl"
+        path = os.path.join(entry_dir, filename)
+
+        cube = self._read(path)
+        annotate(cache_hit=cube is not None)
+        if cube is not None:
+            return cube
+
+        started = time.time()
+        cube = build()
+        os.makedirs(entry_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=f"{filename}.", suffix=".tmp", dir=entry_dir)
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump({
+                "version": CUBE_VERSION,
+                "dimensions": cube.dimensions,
+                "low_ctr_threshold": cube.low_ctr_threshold,
+                "base": cube.base,
+                "cuboids": cube.cuboids
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self._prune(entry_dir, version[:16], started)
+        return cube
+
+    def _prune(self, entry_dir, version, before):
+        """Remove cubes of other versions written before ``before`` (newer ones may be another builder's)"""
+        for name in os.listdir(entry_dir):
+            if not name.endswith(".pkl") or name.startswith(f"{version}-"):
+                continue
+            other = os.path.join(entry_dir, name)
+            try:
+                if os.path.getmtime(other) < before:
+                    os.remove(other)
+            except FileNotFoundError:
+                pass  # removed by a concurrent prune
+
+    def _read(self, path):
+        """Load a persisted cube, or None if missing, unreadable or from another format version"""
+        try:
+            with open(path, "rb") as f:
+                saved = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError, TypeError):
+            # Stale pickles can reference classes or modules that moved since
+            return None
+        if not isinstance(saved, dict) or saved.get("version") != CUBE_VERSION:
+            return None
+        return RollupCube(saved["base"], saved["dimensions"], saved["low_ctr_threshold"], saved["cuboids"])
+
+
+def _plain_index(frame):
+    """Replace categorical index levels with plain values, like a groupby on the raw columns"""
+    if isinstance(frame.index, pd.MultiIndex):
+        frame.index = frame.index.set_levels([level.astype(level.categories.dtype) if isinstance(level, pd.CategoricalIndex) else level for level in frame.index.levels])
+    elif isinstance(frame.index, pd.CategoricalIndex):
+        frame.index = frame.index.astype(frame.index.categories.dtype)
+    return frame
@@ -0,0 +1,88 @@
+import re
+import threading
+
+
+class Rule:
+    """
+    One hypothesis validator.
+
+    ``keywords`` is a list of keyword groups: a hypothesis matches when, for
+    every group, it contains at least one of the group's keywords (plain
+    lowercase substrings). ``categories`` are InsightAgent category values
+    that select the rule without any text matching. ``metrics`` lists the
+    MetricCache requests (name plus parameters) the validator reads, so
+    they can be prefetched for a whole batch of hypotheses.
+
+    ``validate(cache, insight)`` returns the validation dict; the optional
+    ``segments(cache, keys)`` returns a per-segment confidence/evidence table.
+    """
+
+    def __init__(self, name, keywords, validate, categories=(), metrics=(), segments=None):
+        self.name = name
+        self.keywords = [[k.lower() for k in group] for group in keywords]
+        self.validate = validate
+        self.categories = set(categories)
+        self.metrics = [tuple(m) for m in metrics]
+        self.segments = segments
+
+
+class RuleRegistry:
+    """
+    Ordered set of rules matched through one precompiled pattern.
+
+    All rule keywords are compiled into a single alternation behind a
+    lookahead, so one scan of the hypothesis finds every keyword occurrence
+    (including overlapping ones) no matter how many rules are registered.
+    Rules are tried in registration order, like the if/elif chain they replace.
+    """
+
+    def __init__(self, rules=()):
+        self.rules = []
+        self._pattern = None
+        self._contained = {}
+        self._lock = threading.Lock()
+        for rule in rules:
+            self.register(rule)
+
+    def register(self, rule):
+        """Add a rule (lowest priority so far) and invalidate the compiled pattern"""
+        with self._lock:
+            self.rules = [r for r in self.rules if r.name != rule.name] + [rule]
+            self._pattern = None
+
+    def match(self, hypothesis, category=None):
+        """The first rule for this insight: category fast path, then keywords; None if no rule applies"""
+        if category:
+            for rule in self.rules:
+                if category in rule.categories:
+                    return rule
+        found = self.keywords_in(hypothesis)
+        for rule in self.rules:
+            if all(found.intersection(group) for group in rule.keywords):
+                return rule
+        return None
+
+    def keywords_in(self, text):
+        """Set of registered keywords occurring anywhere in ``text`` (case-insensitive)"""
+        pattern, contained = self._compiled()
+        if pattern is None:
+            return set()
+        found = set()
+        for match in pattern.finditer(text.lower()):
+            found.update(contained[match.group(1)])
+        return found
+
+    def _compiled(self):
+        """(pattern, keyword -> registered keywords it contains), built on demand"""
+        pattern = self._pattern
+        if pattern is not None:
+            return pattern, self._contained
+        with self._lock:
+            keywords = sorted({k for rule in self.rules for group in rule.keywords for k in group}, key=len, reverse=True)
+            if not keywords:
+                return None, {}
+            # At each position only the longest keyword is reported, so record
+            # which shorter keywords (e.g. "low" in "below") it implies
+            self._contained = {k: {other for other in keywords if other in k} for k in keywords}
+            self._pattern = re.compile("(?=(" + "|".join(map(re.escape, keywords)) + "))")
+            return self._pattern, self._contained
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+# Explicit in-memory layout for the ads export. Repeated text columns become
+# categoricals; counts and rates use 32-bit types. Spend and revenue stay
+# float64 so totals over millions of rows keep their cents.
+CATEGORY_COLUMNS = ["campaign_name", "adset_name", "date", "creative_type", "creative_message", "audience_type", "platform", "country"]
+FLOAT32_COLUMNS = ["clicks", "ctr", "roas"]
+INT32_COLUMNS = ["impressions", "purchases"]
+FLOAT64_COLUMNS = ["spend", "revenue"]
+
+INT32_MIN, INT32_MAX = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+
+
+def read_csv(path, usecols=None):
+    """
+    Load a CSV with the explicit schema, keeping only ``usecols`` (None keeps
+    every column; names missing from the file are ignored).
+    """
+    if usecols is not None:
+        header = pd.read_csv(path, nrows=0).columns
+        usecols = [c for c in header if c in set(usecols)]
+    dtypes = {c: "category" for c in CATEGORY_COLUMNS}
+    dtypes.update({c: "float32" for c in FLOAT32_COLUMNS})
+    dtypes.update({c: "float64" for c in FLOAT64_COLUMNS})
+    # Integer columns are parsed with pandas' defaults (NaN makes them float)
+    # and narrowed afterwards, since read_csv rejects int32 with missing values
+    return downcast(pd.read_csv(path, usecols=usecols, dtype=dtypes))
+
+
+def downcast(df):
+    """Convert the schema's columns of an already loaded frame in place, returning it"""
+    for name in df.columns:
+        series = df[name]
+        if name in CATEGORY_COLUMNS and not isinstance(series.dtype, pd.CategoricalDtype):
+            df[name] = series.astype("category")
+        elif name in FLOAT32_COLUMNS and series.dtype != np.float32:
+            df[name] = series.astype("float32")
+        elif name in INT32_COLUMNS:
+            df[name] = _narrow_int(series)
+    return df
+
+
+def widen(series):
+    """
+    float64 copy of a float32 column that keeps the values as written in the
+    CSV (0.0183 rather than 0.018300000578...), for rows copied into reports.
+    """
+    if series.dtype != np.float32:
+        return series
+    return series.astype(str).astype("float64")
+
+
+def memory_report(path, usecols=None):
+    """
+    Bytes per column for the default ``pd.read_csv`` layout versus the
+    schema (with ``usecols`` projection), plus totals and the reduction.
+    """
+    default = pd.read_csv(path).memory_usage(index=False, deep=True)
+    lean = read_csv(path, usecols=usecols)
+    lean_usage = lean.memory_usage(index=False, deep=True)
+    columns = {
+        name: {
+            "default_bytes": int(default[name]),
+            "schema_bytes": int(lean_usage[name]) if name in lean_usage else 0,
+            "schema_dtype": str(lean[name].dtype) if name in lean else "dropped"
+        }
+        for name in default.index
+    }
+    default_total, lean_total = int(default.sum()), int(lean_usage.sum())
+    return {
+        "rows": len(lean),
+        "columns": columns,
+        "default_bytes": default_total,
+        "schema_bytes": lean_total,
+        "reduction": round(1 - lean_total / default_total, 4) if default_total else 0.0
+    }
+
+
+def _narrow_int(series):
+    """int32 when every value fits, float32 when the column has missing values"""
+    if series.isna().any():
+        return series.astype("float32")
+    if series.dtype.kind in "iu" or (series % 1 == 0).all():
+        if len(series) == 0 or (series.min() >= INT32_MIN and series.max() <= INT32_MAX):
+            return series.astype("int32")
+    return series
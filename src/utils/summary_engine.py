@@ -0,0 +1,279 @@
+import threading
+from collections.abc import Mapping
+
+import pandas as pd
+
+from src.utils import schema
+from src.utils.tracing import span
+
+# Columns accumulated as (sum, count) pairs for every grouping key
+GROUP_METRICS = {
+    "platform": ["roas", "ctr", "spend"],
+    "date": ["roas"],
+    "campaign_name": ["roas", "ctr", "spend"]
+}
+TOTAL_METRICS = ["spend", "revenue", "roas", "ctr", "purchases"]
+LOW_CTR_COLUMNS = ["campaign_name", "ctr", "creative_message"]
+# Every column the summary reads (used to project streamed chunks)
+SUMMARY_COLUMNS = sorted(set(GROUP_METRICS) | set(TOTAL_METRICS) | set(LOW_CTR_COLUMNS))
+# Independently computable parts of the aggregate state
+STATE_PARTS = ["totals", "low_ctr_rows"] + [f"by_{key}" for key in GROUP_METRICS]
+
+
+def compute_aggregates(df, low_ctr_threshold=0.02, top_k=5):
+    """
+    Reduce a frame to mergeable partial aggregates.
+
+    Every grouping key gets exactly one groupby, which collects the sum and
+    non-null count of each metric the summary needs. Means are derived from
+    these later, so partials from different chunks can simply be added up.
+    """
+    return {part: aggregate_part(df, part, low_ctr_threshold, top_k) for part in STATE_PARTS}
+
+
+def aggregate_part(df, part, low_ctr_threshold=0.02, top_k=5):
+    """One part of the aggregate state (see STATE_PARTS) computed from the rows"""
+    if part == "totals":
+        return _sum_count(df[TOTAL_METRICS])
+    if part == "low_ctr_rows":
+        return low_ctr_rows(df, low_ctr_threshold, top_k)
+    key = part[len("by_"):]
+    return _sum_count(df.groupby(key, observed=True)[GROUP_METRICS[key]])
+
+
+def aggregates_from_cube(cube, df, low_ctr_threshold=0.02, top_k=5):
+    """
+    Same state as compute_aggregates, with the grouped sums read from a
+    RollupCube. Only the low-CTR rows (which need row-level text) touch df.
+    """
+    return {part: cube_part(cube, df, part, low_ctr_threshold, top_k) for part in STATE_PARTS}
+
+
+def cube_part(cube, df, part, low_ctr_threshold=0.02, top_k=5):
+    """One part of the aggregate state read from a RollupCube"""
+    if part == "totals":
+        columns = [f"{metric}_{stat}" for metric in TOTAL_METRICS for stat in ("sum", "count")]
+        return cube.query()[columns].astype(float)
+    if part == "low_ctr_rows":
+        return low_ctr_rows(df, low_ctr_threshold, top_k)
+    key = part[len("by_"):]
+    columns = [f"{metric}_{stat}" for metric in GROUP_METRICS[key] for stat in ("sum", "count")]
+    return cube.query(by=[key])[columns].astype(float)
+
+
+def low_ctr_rows(df, low_ctr_threshold=0.02, top_k=5):
+    """The ``top_k`` lowest-CTR rows under the threshold"""
+    ctr = df["ctr"]
+    # Rank on the ctr column alone and only materialise the k winning rows
+    low_ctr_index = ctr[ctr < low_ctr_threshold].nsmallest(top_k).index
+    rows = df.loc[low_ctr_index, LOW_CTR_COLUMNS]
+    return rows.assign(ctr=schema.widen(rows["ctr"]))
+
+
+def merge_aggregates(left, right, top_k=5):
+    """Combine two partial aggregate states into one"""
+    merged = {"totals": left["totals"].add(right["totals"], fill_value=0)}
+    for key in GROUP_METRICS:
+        name = f"by_{key}"
+        merged[name] = pd.concat([left[name], right[name]]).groupby(level=0).sum()
+    merged["low_ctr_rows"] = pd.concat([left["low_ctr_rows"], right["low_ctr_rows"]]).nsmallest(top_k, "ctr")
+    return merged
+
+
+def finalize_summary(state, trend_days=7, top_k=5):
+    """Turn partial aggregates into the DataAgent summary (fields formatted on first access)"""
+    return LazySummary(state.__getitem__, trend_days=trend_days, top_k=top_k)
+
+
+def summarize(df, low_ctr_threshold=0.02, trend_days=7, top_k=5, cube=None):
+    """
+    Summary for an in-memory frame (from its rollup cube when given). Each
+    aggregate part is computed when a field that reads it is first accessed.
+    """
+    if cube is not None:
+        compute_part = lambda part: cube_part(cube, df, part, low_ctr_threshold, top_k)
+    else:
+        compute_part = lambda part: aggregate_part(df, part, low_ctr_threshold, top_k)
+    return LazySummary(compute_part, trend_days=trend_days, top_k=top_k)
+
+
+class LazySummary(Mapping):
+    """
+    Read-only DataAgent summary whose fields are computed on first access.
+
+    Every field reads one or more aggregate state parts (``SUMMARY_FIELDS``).
+    A part is computed once by ``compute_part(name)`` and shared by all the
+    fields that read it, and each formatted field is memoized, so a query
+    that only looks at low-CTR campaigns never groups by date or platform.
+    ``prefetch`` computes the parts for a declared list of fields in one go.
+
+    Iterating, comparing or ``dict(summary)`` computes every field; convert
+    with ``dict`` before JSON serialization. Safe to share between threads.
+    """
+
+    def __init__(self, compute_part, trend_days=7, top_k=5):
+        self.trend_days = trend_days
+        self.top_k = top_k
+        self._compute_part = compute_part
+        self._parts = {}
+        self._fields = {}
+        self._lock = threading.RLock()  # fields compute parts while holding it
+
+    def __getitem__(self, field):
+        if field not in SUMMARY_FIELDS:
+            raise KeyError(field)
+        if field not in self._fields:
+            with self._lock:
+                if field not in self._fields:
+                    self._fields[field] = _FIELD_BUILDERS[field](self._part, self.trend_days, self.top_k)
+        return self._fields[field]
+
+    def __iter__(self):
+        return iter(SUMMARY_FIELDS)
+
+    def __len__(self):
+        return len(SUMMARY_FIELDS)
+
+    def __repr__(self):
+        return f"LazySummary(computed={self.computed})"
+
+    @property
+    def computed(self):
+        """Fields computed so far, in summary order"""
+        return [field for field in SUMMARY_FIELDS if field in self._fields]
+
+    def prefetch(self, fields=None):
+        """Compute the parts and then the fields in ``fields`` (None means all); unknown names are ignored"""
+        fields = [f for f in SUMMARY_FIELDS if fields is None or f in fields]
+        for part in dict.fromkeys(part for field in fields for part in SUMMARY_FIELDS[field]):
+            self._part(part)
+        for field in fields:
+            self[field]
+        return self
+
+    def _part(self, name):
+        """Aggregate state part, computed on first use"""
+        if name not in self._parts:
+            with self._lock:
+                if name not in self._parts:
+                    with span(f"summary.{name}", "groupby"):
+                        self._parts[name] = self._compute_part(name)
+        return self._parts[name]
+
+
+def _date_range(part, trend_days, top_k):
+    dates = _chronological(part("by_date")).index
+    return f"{dates[0]} to {dates[-1]}"
+
+
+def _overall_roas(part, trend_days, top_k):
+    totals = part("totals")
+    return round(totals["revenue_sum"] / totals["spend_sum"], 4) if totals["spend_sum"] > 0 else 0
+
+
+def _avg_metrics(part, trend_days, top_k):
+    totals = part("totals")
+    return {
+        metric: round(totals[f"{metric}_sum"] / totals[f"{metric}_count"], 4)
+        for metric in ["roas", "ctr", "spend", "purchases"]
+    }
+
+
+def _platform_performance(part, trend_days, top_k):
+    platform = _means(part("by_platform"), ["roas", "ctr"])
+    platform["spend"] = part("by_platform")["spend_sum"]
+    return platform[["roas", "ctr", "spend"]].round(4).to_dict(orient="index")
+
+
+def _roas_trend(part, trend_days, top_k):
+    return _means(_chronological(part("by_date")), ["roas"])["roas"].tail(trend_days).round(4).to_dict()
+
+
+def _campaigns(part):
+    campaigns = _means(part("by_campaign_name"), ["roas", "ctr"])
+    campaigns["spend"] = part("by_campaign_name")["spend_sum"]
+    return campaigns
+
+
+def _top_campaigns(part, trend_days, top_k):
+    return _campaigns(part)[["roas", "spend"]].nlargest(top_k, "roas").round(4).reset_index().to_dict(orient="records")
+
+
+def _bottom_campaigns(part, trend_days, top_k):
+    return _campaigns(part)[["roas", "ctr"]].nsmallest(top_k, "roas").round(4).reset_index().to_dict(orient="records")
+
+
+def _low_ctr_campaigns(part, trend_days, top_k):
+    return part("low_ctr_rows")[LOW_CTR_COLUMNS].to_dict(orient="records")
+
+
+# Summary fields in output order, with the aggregate state parts each one reads
+SUMMARY_FIELDS = {
+    "date_range": ["by_date"],
+    "total_campaigns": ["by_campaign_name"],
+    "total_spend": ["totals"],
+    "total_revenue": ["totals"],
+    "overall_roas": ["totals"],
+    "avg_metrics": ["totals"],
+    "platform_performance": ["by_platform"],
+    "roas_trend_7d": ["by_date"],
+    "top_5_campaigns": ["by_campaign_name"],
+    "bottom_5_campaigns": ["by_campaign_name"],
+    "low_ctr_campaigns": ["low_ctr_rows"]
+}
+_FIELD_BUILDERS = {
+    "date_range": _date_range,
+    "total_campaigns": lambda part, trend_days, top_k: len(part("by_campaign_name")),
+    "total_spend": lambda part, trend_days, top_k: round(part("totals")["spend_sum"], 2),
+    "total_revenue": lambda part, trend_days, top_k: round(part("totals")["revenue_sum"], 2),
+    "overall_roas": _overall_roas,
+    "avg_metrics": _avg_metrics,
+    "platform_performance": _platform_performance,
+    "roas_trend_7d": _roas_trend,
+    "top_5_campaigns": _top_campaigns,
+    "bottom_5_campaigns": _bottom_campaigns,
+    "low_ctr_campaigns": _low_ctr_campaigns
+}
+
+
+def aggregate_chunks(chunks, low_ctr_threshold=0.02, top_k=5):
+    """
+    Fold an iterable of frames into one aggregate state.
+
+    Each chunk is reduced and merged before the next one is read, so memory
+    is bounded by the chunk size plus the number of distinct keys rather
+    than by the total row count. Returns None for an empty iterable.
+    """
+    state = None
+    for chunk in chunks:
+        partial = compute_aggregates(chunk, low_ctr_threshold=low_ctr_threshold, top_k=top_k)
+        state = partial if state is None else merge_aggregates(state, partial, top_k=top_k)
+    return state
+
+
+def _sum_count(obj):
+    """Sum and non-null count of every column, flattened to ``<col>_sum``/``<col>_count``"""
+    agg = obj.agg(["sum", "count"])
+    if isinstance(agg.columns, pd.MultiIndex):
+        # Grouped input: one row per key, (metric, stat) columns
+        agg.columns = [f"{metric}_{stat}" for metric, stat in agg.columns]
+        return agg.astype(float)
+    # Ungrouped input: a (stat x metric) frame, flattened into one Series
+    return pd.Series({
+        f"{metric}_{stat}": float(agg.at[stat, metric])
+        for metric in agg.columns for stat in agg.index
+    })
+
+
+def _chronological(frame):
+    """Per-date rows in calendar order rather than string order (unparseable dates first)"""
+    days = pd.to_datetime(pd.Series(frame.index, dtype=object), errors="coerce")
+    return frame.iloc[days.sort_values(na_position="first", kind="stable").index]
+
+
+def _means(frame, metrics):
+    """Derive per-row means from ``<metric>_sum`` / ``<metric>_count`` columns"""
+    return pd.DataFrame(
+        {metric: frame[f"{metric}_sum"] / frame[f"{metric}_count"] for metric in metrics},
+        index=frame.index
+    )
@@ -0,0 +1,171 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Column order of the bundled export
+COLUMNS = [
+    "campaign_name", "adset_name", "date", "spend", "impressions", "clicks", "ctr", "purchases",
+    "revenue", "roas", "creative_type", "creative_message", "audience_type", "platform", "country"
+]
+
+GENDERS = ["Men", "Women"]
+THEMES = [
+    "ComfortMax Launch", "Premium Modal", "Bold Colors Drop", "Signature Soft", "Athleisure Cooling",
+    "Seamless Everyday", "Cotton Classics", "Summer Invisible", "Fit & Lift", "Studio Sports",
+    "Organic Basics", "Night Lounge", "Travel Essentials", "Holiday Gift Sets", "Everyday Value"
+]
+PRODUCTS = {
+    "Men": ["briefs", "boxers", "trunks", "inner vests", "athletic briefs"],
+    "Women": ["bras", "wire-free bras", "briefs", "hipsters", "sports bras"]
+}
+BENEFITS = [
+    "Breathable organic cotton that moves with you", "No ride-up guarantee", "Ultra-soft waistband, no marks",
+    "Cooling mesh panels for workouts", "Invisible under tees", "All-day comfort, zero pinch",
+    "Seamless confidence for every day", "Hot & comfy: now 20% off"
+]
+# Adset suffix -> audience type
+ADSET_AUDIENCES = {"Retarget": "Retargeting", "Broad": "Broad", "LAL1": "Lookalike", "LAL3": "Lookalike"}
+CREATIVE_TYPES = ["Image", "Video", "UGC", "Carousel"]
+CREATIVE_WEIGHTS = [0.34, 0.35, 0.16, 0.15]
+PLATFORMS = ["Facebook", "Instagram", "Messenger", "Audience Network"]
+COUNTRIES = ["US", "UK", "IN", "CA", "AU", "DE", "FR", "BR", "MX", "JP"]
+# Columns that are sometimes blank in real exports
+MISSING_COLUMNS = ["spend", "clicks", "revenue", "roas"]
+
+
+def generate(rows, seed=42, **options):
+    """
+    Synthetic ads export of ``rows`` rows with the bundled CSV's schema.
+    ``options`` are those of ``iter_chunks``; the same seed and options
+    always produce the same frame.
+    """
+    return pd.concat(list(iter_chunks(rows, seed=seed, chunk_rows=max(rows, 1), **options)), ignore_index=True)
+
+
+def write_csv(path, rows, seed=42, chunk_rows=1_000_000, **options):
+    """
+    Write a synthetic export to ``path`` one chunk at a time, so 50M-row
+    files never sit in memory. The file is identical for the same seed,
+    options and ``chunk_rows``. Returns ``path``.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for i, chunk in enumerate(iter_chunks(rows, seed=seed, chunk_rows=chunk_rows, **options)):
+            chunk.to_csv(f, index=False, header=i == 0)
+    return path
+
+
+def iter_chunks(rows, seed=42, chunk_rows=1_000_000, campaigns=20, days=90, platforms=2, countries=3,
+                adsets=5, name_noise=0.35, missing=0.025, start="2025-01-01"):
+    """
+    Yield the export as DataFrames of at most ``chunk_rows`` rows.
+
+    Rows are in date order with an even number per day, so appending days
+    behaves like a growing daily export. Each campaign has its own ROAS
+    level and a daily drift (some decline, some improve), and a
+    ``name_noise`` share of rows spell the campaign name with case and
+    separator variants ("MEN | PREMIUM MODAL", "Men_Premium_Modal").
+    ``platforms`` and ``countries`` are counts or lists of names; ``missing``
+    is the share of blank spend, clicks, revenue and roas cells.
+    """
+    platforms = _names(platforms, PLATFORMS, "Platform")
+    countries = _names(countries, COUNTRIES, "C")
+    layout = _campaign_layout(np.random.default_rng(seed), campaigns, adsets)
+    dates = pd.date_range(start, periods=days).strftime("%Y-%m-%d").to_numpy()
+    for index, offset in enumerate(range(0, rows, chunk_rows)):
+        rng = np.random.default_rng([seed, index])
+        size = min(chunk_rows, rows - offset)
+        # Row i belongs to day i * days // rows, so days fill up in order
+        day = (np.arange(offset, offset + size) * days) // rows
+        yield _chunk(rng, size, day, dates, layout, platforms, countries, name_noise, missing)
+
+
+def _campaign_layout(rng, campaigns, adsets):
+    """Per-campaign names, spelling variants, adsets and performance parameters"""
+    names, genders = [], []
+    for i in range(campaigns):
+        gender = GENDERS[i % len(GENDERS)]
+        theme = THEMES[(i // len(GENDERS)) % len(THEMES)]
+        repeat = i // (len(GENDERS) * len(THEMES))
+        names.append(f"{gender} {theme}" + (f" {repeat + 1}" if repeat else ""))
+        genders.append(gender)
+    tags = list(ADSET_AUDIENCES)
+    adset_names = [f"Adset-{k + 1} {tags[k % len(tags)]}" for k in range(adsets)]
+    messages = {g: [f"{b} — {g.lower()} {p}." for b in BENEFITS for p in PRODUCTS[g]] for g in GENDERS}
+    return {
+        "names": names,
+        "variants": np.array([_spellings(n) for n in names], dtype=object),
+        "gender": np.array([GENDERS.index(g) for g in genders]),
+        "adsets": np.array(adset_names, dtype=object),
+        "audiences": np.array([ADSET_AUDIENCES[n.split(" ")[1]] for n in adset_names], dtype=object),
+        "messages": [np.array(messages[g], dtype=object) for g in GENDERS],
+        "roas_level": rng.lognormal(1.6, 0.45, campaigns),
+        "roas_drift": rng.normal(0.0, 0.004, campaigns),
+        "ctr_level": rng.beta(6, 450, campaigns)
+    }
+
+
+def _spellings(name):
+    """Spelling variants of a campaign name that normalize to the same key"""
+    words = name.split(" ")
+    rest = " ".join(words[1:])
+    return [
+        name.upper(), name.lower(), "  ".join(words), "_".join(words),
+        f"{words[0]} | {rest}", f"{words[0]}-{rest}", f"{words[0].upper()} {rest}"
+    ]
+
+
+def _chunk(rng, size, day, dates, layout, platforms, countries, name_noise, missing):
+    """One chunk of rows for the given day numbers"""
+    n_campaigns = len(layout["names"])
+    campaign = rng.integers(0, n_campaigns, size)
+    adset = rng.integers(0, len(layout["adsets"]), size)
+
+    names = np.array(layout["names"], dtype=object)[campaign]
+    noisy = rng.random(size) < name_noise
+    variant = rng.integers(0, len(layout["variants"][0]), size)
+    names[noisy] = np.array([layout["variants"][c][v] for c, v in zip(campaign[noisy], variant[noisy])], dtype=object)
+
+    gender = layout["gender"][campaign]
+    messages = np.empty(size, dtype=object)
+    for g, pool in enumerate(layout["messages"]):
+        rows = gender == g
+        messages[rows] = pool[rng.integers(0, len(pool), rows.sum())]
+
+    spend = np.round(rng.gamma(4.0, 120.0, size), 2)
+    impressions = rng.integers(10_000, 520_000, size)
+    ctr = np.round(np.clip(layout["ctr_level"][campaign] * rng.lognormal(0.0, 0.25, size), 0.002, 0.08), 4)
+    clicks = np.round(impressions * ctr)
+    roas_mean = layout["roas_level"][campaign] * np.exp(layout["roas_drift"][campaign] * day)
+    roas = np.round(roas_mean * rng.lognormal(0.0, 0.35, size), 2)
+    revenue = np.round(spend * roas, 2)
+    purchases = np.maximum(np.round(revenue / rng.uniform(30.0, 45.0, size)), 0).astype(np.int64)
+
+    df = pd.DataFrame({
+        "campaign_name": names,
+        "adset_name": layout["adsets"][adset],
+        "date": dates[day],
+        "spend": spend,
+        "impressions": impressions,
+        "clicks": clicks,
+        "ctr": ctr,
+        "purchases": purchases,
+        "revenue": revenue,
+        "roas": roas,
+        "creative_type": rng.choice(CREATIVE_TYPES, size, p=CREATIVE_WEIGHTS).astype(object),
+        "creative_message": messages,
+        "audience_type": layout["audiences"][adset],
+        "platform": np.array(platforms, dtype=object)[rng.integers(0, len(platforms), size)],
+        "country": np.array(countries, dtype=object)[rng.integers(0, len(countries), size)]
+    }, columns=COLUMNS)
+    for name in MISSING_COLUMNS:
+        df.loc[rng.random(size) < missing, name] = np.nan
+    return df
+
+
+def _names(value, known, prefix):
+    """A list of names, or the first ``value`` known names (numbered beyond the list)"""
+    if not isinstance(value, int):
+        return list(value)
+    return [known[i] if i < len(known) else f"{prefix} {i + 1}" for i in range(value)]
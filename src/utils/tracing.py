@@ -0,0 +1,191 @@
+import contextvars
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, RSS is not recorded
+    resource = None
+
+_tracer = contextvars.ContextVar("tracer", default=None)
+_parent = contextvars.ContextVar("parent_span", default=None)
+
+
+class Span:
+    """One timed stage; ``set`` adds attributes (sizes, cache hits) while it runs"""
+
+    def __init__(self, name, category, parent, attrs):
+        self.name = name
+        self.category = category
+        self.parent = parent
+        self.attrs = dict(attrs)
+        self.thread = threading.get_ident()
+        self.traced_peak = 0
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+class Tracer:
+    """
+    Span collector for one run.
+
+    ``span`` times a block: wall time, CPU time of the running thread, the
+    process RSS high-water mark (and how much the block raised it) and,
+    with ``memory=True``, the tracemalloc peak allocated inside the block.
+    Spans nest through context variables, so code deep inside an agent
+    calls the module-level ``span`` helper without being handed the tracer;
+    outside an active tracer that helper does nothing.
+
+    Threads started with a copied context (the plan scheduler does this)
+    report into the same tracer. tracemalloc peaks are process-wide, so
+    they are approximate for spans that overlap in different threads.
+    """
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.spans = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def activate(self):
+        """Make this the current tracer for the enclosed block (and contexts copied from it)"""
+        started = self.memory and not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        token = _tracer.set(self)
+        try:
+            yield self
+        finally:
+            _tracer.reset(token)
+            if started:
+                tracemalloc.stop()
+
+    @contextmanager
+    def span(self, name, category="stage", **attrs):
+        """Record the enclosed block as a span; yields the Span for ``set``"""
+        parent = _parent.get()
+        current = Span(name, category, parent, attrs)
+        token = _parent.set(current)
+        if self.memory and tracemalloc.is_tracing():
+            # The peak since the last reset belongs to the parent so far
+            if parent is not None:
+                parent.traced_peak = max(parent.traced_peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        rss_start = _max_rss()
+        cpu_start = time.thread_time()
+        start = time.perf_counter()
+        try:
+            yield current
+        except BaseException as e:
+            current.set(error=type(e).__name__)
+            raise
+        finally:
+            wall = time.perf_counter() - start
+            cpu = time.thread_time() - cpu_start
+            rss_end = _max_rss()
+            _parent.reset(token)
+            record = {
+                "name": name,
+                "cat": category,
+                "start_s": round(start - self._origin, 6),
+                "wall_s": round(wall, 6),
+                "cpu_s": round(cpu, 6),
+                "thread": current.thread,
+                "parent": parent.name if parent is not None else None
+            }
+            if rss_end is not None:
+                record["rss_peak_mb"] = round(rss_end, 2)
+                record["rss_growth_mb"] = round(rss_end - rss_start, 2)
+            if self.memory and tracemalloc.is_tracing():
+                current.traced_peak = max(current.traced_peak, tracemalloc.get_traced_memory()[1])
+                if parent is not None:
+                    parent.traced_peak = max(parent.traced_peak, current.traced_peak)
+                record["traced_peak_mb"] = round(current.traced_peak / 2**20, 2)
+            record.update(current.attrs)
+            with self._lock:
+                self.spans.append(record)
+
+    def chrome_trace(self):
+        """Spans as Chrome trace-event JSON (load in chrome://tracing or Perfetto)"""
+        pid = os.getpid()
+        events = []
+        for record in sorted(self.spans, key=lambda r: r["start_s"]):
+            args = {k: v for k, v in record.items() if k not in ("name", "cat", "start_s", "wall_s", "thread", "parent")}
+            events.append({
+                "name": record["name"],
+                "cat": record["cat"],
+                "ph": "X",
+                "ts": round(record["start_s"] * 1e6, 1),
+                "dur": round(record["wall_s"] * 1e6, 1),
+                "pid": pid,
+                "tid": record["thread"],
+                "args": args
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save_chrome_trace(self, path):
+        """Write the Chrome trace to ``path``"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f, default=str)
+
+
+def span(name, category="stage", **attrs):
+    """Span on the current tracer, or a no-op block when tracing is off"""
+    tracer = _tracer.get()
+    if tracer is None:
+        return _NullSpan()
+    return tracer.span(name, category, **attrs)
+
+
+def annotate(**attrs):
+    """Add attributes (e.g. cache_hit) to the innermost open span, if any"""
+    current = _parent.get()
+    if current is not None and _tracer.get() is not None:
+        current.set(**attrs)
+
+
+def top_functions(profiler, limit=15):
+    """The ``limit`` entries of a cProfile.Profile with the highest cumulative time"""
+    stats = pstats.Stats(profiler)
+    stats.sort_stats("cumulative")
+    rows = []
+    for func in stats.fcn_list[:limit]:
+        _, calls, own_time, cumulative, _ = stats.stats[func]
+        rows.append({
+            "function": pstats.func_std_string(func),
+            "calls": calls,
+            "own_s": round(own_time, 4),
+            "cumulative_s": round(cumulative, 4)
+        })
+    return rows
+
+
+class _NullSpan:
+    """Stand-in yielded when no tracer is active"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+def _max_rss():
+    """Process RSS high-water mark in MB (None where unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
@@ -0,0 +1,62 @@
+import pytest
+import json
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.orchestrator.orchestrator import Orchestrator
+from src.orchestrator.batch import BatchRunner, load_queries
+
+
+@pytest.fixture
+def queries_file(tmp_path):
+    path = tmp_path / "queries.jsonl"
+    lines = [
+        {"id": "roas", "query": "Why did ROAS drop?"},
+        {"request_id": "ctr/low", "title": "Why is CTR low?"},
+        {"query": "Analyze campaign performance"}
+    ]
+    path.write_text("\n".join(json.dumps(line) for line in lines) + "\n")
+    return path
+
+
+class TestBatchRunner:
+    """Test suite for batch query mode"""
+
+    def test_load_queries_accepts_requests_style_lines(self, queries_file):
+        """Test id/query field fallbacks"""
+        queries = load_queries(str(queries_file))
+        assert [q["id"] for q in queries] == ["roas", "ctr/low", "query-0003"]
+        assert queries[1]["query"] == "Why is CTR low?"
+
+    def test_colliding_ids_get_distinct_directories(self, tmp_path):
+        """Test that ids sharing a directory name are suffixed and duplicate ids rejected"""
+        path = tmp_path / "queries.jsonl"
+        lines = [{"id": "ctr/low", "query": "a"}, {"id": "ctr_low", "query": "b"}, {"id": "CTR_low", "query": "c"}]
+        path.write_text("\n".join(json.dumps(line) for line in lines))
+        assert [q["dir"] for q in load_queries(str(path))] == ["ctr_low", "ctr_low-2", "CTR_low-3"]
+
+        path.write_text(json.dumps({"id": "roas", "query": "a"}) + "\n" + json.dumps({"id": "roas", "query": "b"}))
+        with pytest.raises(ValueError, match="duplicate id 'roas'"):
+            load_queries(str(path))
+
+    def test_dataset_is_loaded_once_for_all_queries(self, queries_file, tmp_path, monkeypatch):
+        """Test that every query reuses one load and writes its own outputs"""
+        orchestrator = Orchestrator()
+        loads = []
+        original = orchestrator.load_data
+        monkeypatch.setattr(orchestrator, "load_data", lambda: loads.append(1) or original())
+
+        out_dir = tmp_path / "out"
+        stats = BatchRunner(orchestrator, workers=2).run(str(queries_file), output_dir=str(out_dir))
+
+        assert len(loads) == 1, "Dataset should be loaded once per batch"
+        assert stats["queries"] == 3 and stats["failed"] == 0
+        assert stats["queries_per_second"] > 0
+        for name in ["roas", "ctr_low", "query-0003"]:
+            assert (out_dir / name / "report.md").exists()
+            events = [e["event"] for e in json.loads((out_dir / name / "execution_log.json").read_text())]
+            assert "data_reused" in events and "data_loaded" not in events
+        assert (out_dir / "batch_summary.json").exists()
@@ -0,0 +1,89 @@
+import pytest
+import numpy as np
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.bootstrap import Bootstrap, interval
+
+
+class TestBootstrap:
+    """Test suite for the batched block bootstrap"""
+
+    def test_small_sample_is_classic_row_bootstrap(self):
+        """Test that a sample within the block count resamples individual rows"""
+        values = np.array([1.0, 2.0, 3.0, 10.0])
+        means = Bootstrap(seed=1, n_resamples=5000).resample_means("x", values)
+
+        assert means.shape == (5000,)
+        # Every resample draws exactly len(values) rows from the sample
+        assert set(np.round(means * 4, 6)) <= set(float(s) for s in range(4, 41))
+        assert abs(means.mean() - values.mean()) < 0.1
+        assert abs(means.std() - values.std() / 2) < 0.15
+
+    def test_large_sample_interval_covers_mean(self):
+        """Test that the block approximation gives a sensible standard error"""
+        rng = np.random.default_rng(0)
+        values = rng.normal(5.0, 2.0, 200_000)
+        means = Bootstrap(seed=1, n_resamples=4000).resample_means("x", values)
+
+        low, high = interval(means)
+        assert low < values.mean() < high
+        expected_se = values.std() / np.sqrt(len(values))
+        assert 0.8 < means.std() / expected_se < 1.2
+
+    def test_seeded_and_independent_of_workers(self):
+        """Test reproducibility and that a process pool yields identical draws"""
+        values = np.random.default_rng(3).random(5000)
+        serial = Bootstrap(seed=9, n_resamples=3000, chunk_size=1000).resample_means("x", values)
+        pooled = Bootstrap(seed=9, n_resamples=3000, chunk_size=1000, workers=2).resample_means("x", values)
+
+        assert np.array_equal(serial, pooled)
+        assert not np.array_equal(serial, Bootstrap(seed=10, n_resamples=3000).resample_means("x", values))
+
+    def test_empty_sample_rejected(self):
+        with pytest.raises(ValueError):
+            Bootstrap().resample_means("x", np.array([]))
+
+    def test_segment_sums_match_per_segment_spread(self):
+        """Test that one batched resample gives each segment its own standard error"""
+        rng = np.random.default_rng(0)
+        sizes = [20, 5000, 50_000]
+        codes = np.repeat([0, 1, 2], sizes)
+        values = rng.normal(3.0, 1.0, len(codes))
+        codes[:3] = -1  # rows without a segment are left out
+        bootstrap = Bootstrap(seed=1, n_resamples=4000)
+        sums = bootstrap.resample_segment_sums("x", codes, values, 3)
+
+        assert sums.shape == (3, 4000, 2)
+        means = sums[..., 1] / sums[..., 0]
+        for segment, size in enumerate(sizes):
+            size -= 3 if segment == 0 else 0
+            assert 0.8 < np.nanstd(means[segment]) / (1.0 / np.sqrt(size)) < 1.2
+        assert np.array_equal(sums, bootstrap.resample_segment_sums("x", codes, values, 3))
+        assert not np.array_equal(sums, bootstrap.resample_segment_sums("x", codes, values, 3, stream=1))
+
+    def test_thousands_of_segments_stay_in_bounded_memory(self):
+        """Test that segment resamples are produced in batches without materializing every segment"""
+        import tracemalloc
+
+        rng = np.random.default_rng(0)
+        n_segments = 3000
+        codes = rng.integers(0, n_segments, 200_000)
+        values = rng.normal(3.0, 1.0, len(codes))
+        bootstrap = Bootstrap(seed=1, n_resamples=1000, segment_batch_mb=4)
+        below = np.zeros(n_segments)
+
+        tracemalloc.start()
+        for batch, sums in bootstrap.iter_segment_sums("x", codes, values, n_segments):
+            below[batch] = np.mean(sums[..., 1] / sums[..., 0] < 3.0, axis=1)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        # Every segment at once would be 3000 x 1000 x 2 float64 = 48 MB
+        assert peak < 20 * 2**20
+        assert 0.3 < below.mean() < 0.7
+        whole = Bootstrap(seed=1, n_resamples=1000).resample_segment_sums("x", codes, values, n_segments)
+        assert np.allclose(below, np.mean(whole[..., 1] / whole[..., 0] < 3.0, axis=1))
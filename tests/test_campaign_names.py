@@ -0,0 +1,79 @@
+import json
+import pytest
+import pandas as pd
+import sys
+import os
+import threading
+
+# Add src to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.data_agent import DataAgent
+from src.utils.campaign_names import CampaignNames
+
+
+CSV_PATH = "data/synthetic_fb_ads_undergarments.csv"
+
+
+class TestCampaignNames:
+    """Test suite for campaign name canonicalization"""
+
+    def test_variants_share_most_frequent_spelling(self):
+        """Test that case, spacing and separator variants map to the most common spelling"""
+        names = pd.Series([
+            "Men ComfortMax Launch", "Men ComfortMax Launch", "Men  ComfortMax  Launch",
+            "Men_ComfortMax_Launch", "MEN | COMFORTMAX-LAUNCH", "Women Fit & Lift", None
+        ])
+        canonical = CampaignNames().canonicalize(names)
+
+        assert isinstance(canonical.dtype, pd.CategoricalDtype)
+        assert canonical.iloc[:5].eq("Men ComfortMax Launch").all()
+        assert canonical.iloc[5] == "Women Fit & Lift"
+        assert pd.isna(canonical.iloc[6])
+        assert list(canonical.cat.categories) == ["Men ComfortMax Launch", "Women Fit & Lift"]
+
+    def test_mapping_persists_across_runs(self, tmp_path):
+        """Test that a saved mapping keeps labels stable and only new spellings are normalized"""
+        path = str(tmp_path / "names.json")
+        first = CampaignNames(path)
+        first.canonicalize(pd.Series(["Men Premium Modal", "Men Premium Modal", "men premium modal"]))
+        assert first.last_new == 2
+
+        second = CampaignNames(path)
+        # "MEN_PREMIUM_MODAL" now outnumbers the original spelling, but the label stays fixed
+        canonical = second.canonicalize(pd.Series(["MEN_PREMIUM_MODAL"] * 3 + ["Men Premium Modal"]))
+        assert second.last_new == 1
+        assert canonical.eq("Men Premium Modal").all()
+
+    def test_concurrent_callers_share_one_mapping(self, tmp_path):
+        """Test that threads learning different campaigns all land in the saved mapping"""
+        path = str(tmp_path / "names.json")
+        names = CampaignNames(path)
+        batches = [pd.Series([f"Campaign {t} Variant {i}" for i in range(50)]) for t in range(8)]
+        start = threading.Barrier(len(batches))
+
+        def run(batch):
+            start.wait()
+            for _ in range(5):
+                names.canonicalize(batch)
+
+        threads = [threading.Thread(target=run, args=(batch,)) for batch in batches]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+        assert len(saved["raw"]) == len(names.raw) == 400
+        assert os.listdir(tmp_path) == ["names.json"]
+
+    def test_data_agent_groups_by_canonical_name(self, tmp_path):
+        """Test that the DataAgent summary counts canonical campaigns, in memory and streamed"""
+        agent = DataAgent(model=None, names_path=str(tmp_path / "names.json"))
+        df, summary = agent.load_and_summarize(CSV_PATH)
+
+        raw_campaigns = pd.read_csv(CSV_PATH)["campaign_name"].nunique()
+        assert summary["total_campaigns"] == df["campaign_name"].nunique() < raw_campaigns
+        assert "Men_ComfortMax_Launch" not in set(df["campaign_name"])
+        assert agent.stream_summarize(CSV_PATH, chunksize=1000) == summary
@@ -0,0 +1,66 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+
+from src.utils.date_index import DateIndex
+from src.utils import summary_engine
+
+
+class TestDateIndex:
+    """Test suite for date-partitioned row lookups"""
+
+    @pytest.fixture
+    def df(self):
+        rng = np.random.default_rng(0)
+        dates = pd.date_range("2025-01-01", periods=20).strftime("%Y-%m-%d")
+        return pd.DataFrame({
+            "date": rng.choice(dates, 500),
+            "roas": rng.uniform(0.5, 5.0, 500)
+        })
+
+    def test_window_matches_groupby_tail(self, df):
+        """Test that the last-N window equals a full groupby + tail"""
+        index = DateIndex(df["date"])
+        expected = df.groupby("date")["roas"].mean()
+
+        assert len(index) == 20
+        assert index.daily_mean(df["roas"], 7).equals(expected.tail(7))
+        assert index.daily_mean(df["roas"], 7, offset=1).equals(expected.iloc[-14:-7])
+        assert len(index.daily_mean(df["roas"], 7, offset=3)) == 0
+
+    def test_day_and_range_rows(self, df):
+        """Test that day and range lookups return exactly the matching rows"""
+        index = DateIndex(df["date"])
+
+        assert sorted(index.day_rows("2025-01-05")) == list(np.flatnonzero(df["date"] == "2025-01-05"))
+        assert len(index.day_rows("2024-12-31")) == 0
+        in_range = df["date"].between("2025-01-03", "2025-01-09")
+        assert sorted(index.rows("2025-01-03", "2025-01-09")) == list(np.flatnonzero(in_range))
+
+    def test_non_iso_dates_in_calendar_order(self):
+        """Test that windows follow calendar order, not string order, and skip unparseable dates"""
+        dates = ["12/30/2024", "01/02/2025", "12/31/2024", "01/01/2025", "not a date"]
+        df = pd.DataFrame({"date": dates, "roas": [1.0, 4.0, 2.0, 3.0, 9.0]})
+        index = DateIndex(df["date"])
+
+        assert index.window_labels(3) == ["12/31/2024", "01/01/2025", "01/02/2025"]
+        assert list(index.daily_mean(df["roas"], 2)) == [3.0, 4.0]
+        assert len(index.rows()) == 4
+
+    def test_summary_trend_in_calendar_order(self):
+        """Test that the summary's date range and ROAS trend use calendar order"""
+        df = pd.DataFrame({
+            "date": ["12/30/2024", "12/31/2024", "01/01/2025", "01/02/2025"],
+            "campaign_name": ["A"] * 4, "platform": ["Facebook"] * 4, "creative_message": ["m"] * 4,
+            "spend": [10.0] * 4, "revenue": [20.0] * 4, "roas": [1.0, 2.0, 3.0, 4.0],
+            "ctr": [0.01] * 4, "purchases": [1] * 4
+        })
+        summary = summary_engine.summarize(df, trend_days=2)
+
+        assert summary["date_range"] == "12/30/2024 to 01/02/2025"
+        assert summary["roas_trend_7d"] == {"01/01/2025": 3.0, "01/02/2025": 4.0}
@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 import pandas as pd
 import sys
 import os
@@ -8,6 +9,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from src.agents.evaluator_agent import EvaluatorAgent
 from src.agents.data_agent import DataAgent
+from src.utils.metric_cache import MetricCache
 
 
 class TestEvaluatorAgent:
@@ -192,6 +194,128 @@ class TestEvaluatorAgent:
             assert 'validation_method' in insight, "Each insight should have validation_method"
             assert insight['validation_method'] in ['trend_confirmation', 'threshold_test', 'comparative_analysis', 'correlation', 'rule_based']
 
+    def test_base_aggregates_computed_once_per_evaluate(self):
+        """Test that repeated hypotheses reuse cached aggregates"""
+        
+        df = pd.DataFrame({
+            'campaign_name': ['A', 'B', 'C', 'D'],
+            'date': ['2024-01-01', '2024-01-02', '2024-01-03', '2024-01-04'],
+            'platform': ['Instagram', 'Facebook', 'Instagram', 'Facebook'],
+            'roas': [3.0, 2.5, 2.0, 1.5],
+            'ctr': [0.015, 0.018, 0.012, 0.011],
+            'spend': [100, 120, 140, 160]
+        })
+        insights = [
+            {"hypothesis": "ROAS declined last week"},
+            {"hypothesis": "CTR is below benchmark"},
+            {"hypothesis": "Instagram platform performs better"},
+            {"hypothesis": "Higher spend lowers returns"}
+        ] * 50
+        
+        metrics = MetricCache(df)
+        validated = EvaluatorAgent(model=None).evaluate(df, insights, metrics=metrics)
+        
+        assert validated == EvaluatorAgent(model=None).evaluate(df, insights), "Cached and fresh results should match"
+        assert {key for key in metrics.computed if key[0] != "bootstrap"} == {
+            ("date_index",), ("roas_trend", 7), ("ctr_mean",), ("ctr_below_pct", 0.02), ("roas_by_platform",), ("spend_roas_corr",)
+        }
+        assert all(count == 1 for count in metrics.computed.values()), "Each aggregate should be computed once"
+
+    def test_segment_validation_reports_where_hypothesis_holds(self):
+        """Test per-segment validation across campaigns and crossed dimensions"""
+        
+        df = pd.DataFrame({
+            'campaign_name': ['A'] * 4 + ['B'] * 4,
+            'country': ['US', 'US', 'UK', 'UK'] * 2,
+            'date': ['2024-01-01', '2024-01-02'] * 4,
+            'platform': ['Instagram', 'Facebook'] * 4,
+            'roas': [3.0, 2.0, 3.0, 2.5, 1.0, 2.0, 1.0, 1.5],  # A declines, B grows
+            'ctr': [0.01] * 4 + [0.03] * 4,
+            'spend': [100, 120, 140, 160] * 2
+        })
+        insights = [
+            {"hypothesis": "ROAS has declined", "confidence": 0.7},
+            {"hypothesis": "CTR is below benchmark", "confidence": 0.7}
+        ]
+        
+        # One or two rows per segment sample: below the default minimum, nothing holds
+        assert EvaluatorAgent(model=None).validate_segments(MetricCache(df), insights[0], [["campaign_name"]])["segments"] == []
+        
+        evaluator = EvaluatorAgent(model=None, min_segment_rows=1)
+        cache = MetricCache(df)
+        decline = evaluator.validate_segments(cache, insights[0], [["campaign_name"], ["campaign_name", "country"]])
+        low_ctr = evaluator.validate_segments(cache, insights[1], [["campaign_name"]])
+        
+        assert decline["segments_checked"] == 2 + 4
+        assert {s["segment"] for s in decline["segments"]} == {"A", "A / US", "A / UK"}
+        by_segment = {s["segment"]: s for s in decline["segments"]}
+        assert "dropped from 3.00 to 2.25" in by_segment["A"]["evidence"]
+        assert [s["segment"] for s in low_ctr["segments"]] == ["A"]
+        assert low_ctr["segments"][0]["confidence"] >= 0.8
+        
+        # Segment-level mean ROAS trend matches validating the slice on its own
+        slice_result = evaluator.evaluate(df[df['campaign_name'] == 'A'], insights[:1])[0]
+        assert "dropped from 3.00 to 2.25" in slice_result["validation_evidence"]
+        
+        validated = evaluator.evaluate(df, insights, segments=[["campaign_name"]])
+        assert all("segments" in v and "segments_checked" in v for v in validated)
+
+    def test_bootstrap_confidence_reflects_noise(self):
+        """Test that confidence comes from resampling, not fixed constants"""
+        
+        rng = np.random.default_rng(0)
+        dates = np.repeat(['2024-01-01', '2024-01-02'], 200)
+        df = pd.DataFrame({
+            'date': dates,
+            'platform': np.tile(['Instagram', 'Facebook'], 200),
+            'roas': rng.normal(2.0, 1.0, 400),  # no real change between days
+            'ctr': rng.normal(0.0199, 0.005, 400),  # borderline
+            'spend': rng.gamma(2.0, 50.0, 400)
+        })
+        insights = [{"hypothesis": "CTR is below benchmark"}, {"hypothesis": "ROAS dropped"}]
+        
+        first = EvaluatorAgent(model=None, random_seed=7, n_resamples=2000)
+        ctr = first._validate_hypothesis(MetricCache(df), insights[0])
+        assert ctr["confidence"] < 0.92, "Borderline CTR should not get a fixed high confidence"
+        assert "95% CI" in ctr["evidence"]
+        
+        # Same seed, same answer; the process pool doesn't change the draws
+        pooled = EvaluatorAgent(model=None, random_seed=7, n_resamples=2000, bootstrap_workers=2)
+        assert pooled._validate_hypothesis(MetricCache(df), insights[0]) == ctr
+        assert first._validate_hypothesis(MetricCache(df), insights[1]) == pooled._validate_hypothesis(MetricCache(df), insights[1])
+
+
+    def test_segment_confidence_reflects_noise(self):
+        """Test that per-segment confidences come from resampling each segment's rows"""
+        rng = np.random.default_rng(1)
+        rows = 100
+        df = pd.DataFrame({
+            'campaign_name': np.repeat(['Clear', 'Noisy', 'Tiny'], 2 * rows),
+            'date': np.tile(np.repeat(['2024-01-01', '2024-01-02'], rows), 3),
+            'platform': np.tile(['Instagram', 'Facebook'], 3 * rows),
+            'roas': np.concatenate([
+                np.repeat([3.0, 2.0], rows) + rng.normal(0, 0.1, 2 * rows),  # clear decline
+                np.repeat([2.05, 2.0], rows) + rng.normal(0, 1.0, 2 * rows),  # within noise
+                np.repeat([2.5, 2.0], rows) + rng.normal(0, 0.1, 2 * rows)
+            ]),
+            'ctr': np.concatenate([rng.normal(0.01, 0.002, 2 * rows), rng.normal(0.0199, 0.01, 2 * rows), rng.normal(0.03, 0.002, 2 * rows)]),
+            'spend': rng.gamma(2.0, 50.0, 6 * rows)
+        })
+        evaluator = EvaluatorAgent(model=None, n_resamples=2000)
+        cache = MetricCache(df)
+
+        decline = evaluator._segments_roas_decline(cache, ("campaign_name",))
+        assert decline.at["Clear", "confidence"] > 0.99
+        assert decline.at["Noisy", "confidence"] < 0.9, "A decline within the noise should not be near-certain"
+
+        ctr = evaluator._segments_low_ctr(cache, ("campaign_name",))
+        assert ctr.at["Clear", "confidence"] > 0.99 and ctr.at["Tiny", "confidence"] <= 0.3
+        assert ctr.at["Noisy", "confidence"] < 0.86
+
+        platforms = evaluator._segments_platform_comparison(cache, ("campaign_name",))
+        assert platforms["confidence"].nunique() > 1, "Platform comparisons should not share one flat confidence"
+        assert (evaluator._segments_roas_decline(cache, ("campaign_name",))["confidence"] == decline["confidence"]).all()
+
 
 class TestDataAgent:
     """Test suite for DataAgent"""
@@ -0,0 +1,115 @@
+import pytest
+import pandas as pd
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils import summary_engine
+from src.utils.incremental_state import IncrementalSummary
+
+
+CSV_PATH = "data/synthetic_fb_ads_undergarments.csv"
+
+
+@pytest.fixture
+def daily_frames():
+    """The sample data split into (history, last day)"""
+    df = pd.read_csv(CSV_PATH)
+    last_day = df["date"].max()
+    return df[df["date"] < last_day], df[df["date"] == last_day]
+
+
+class TestIncrementalSummary:
+    """Test suite for append-only incremental summary updates"""
+
+    def test_appended_day_is_folded_incrementally(self, tmp_path, daily_frames):
+        """Test that only appended rows are parsed and the result equals a full recompute"""
+        history, last_day = daily_frames
+        csv_path = tmp_path / "ads.csv"
+        history.to_csv(csv_path, index=False)
+
+        tracker = IncrementalSummary(str(csv_path))
+        tracker.update()
+        assert tracker.last_update["mode"] == "rebuild"
+
+        last_day.to_csv(csv_path, mode="a", header=False, index=False)
+        summary = tracker.summary()
+
+        assert tracker.last_update == {"mode": "incremental", "rows_folded": len(last_day)}
+        assert summary == summary_engine.summarize(pd.read_csv(csv_path))
+
+    def test_unchanged_file_folds_nothing(self, tmp_path, daily_frames):
+        """Test that a rerun without new data reuses the stored aggregates"""
+        history, _ = daily_frames
+        csv_path = tmp_path / "ads.csv"
+        history.to_csv(csv_path, index=False)
+
+        first = IncrementalSummary(str(csv_path)).summary()
+        tracker = IncrementalSummary(str(csv_path))
+
+        assert tracker.summary() == first
+        assert tracker.last_update["mode"] == "unchanged"
+
+    def test_late_rows_for_the_last_day_are_folded(self, tmp_path, daily_frames):
+        """Test that rows appended for an already folded day count like any other appended rows"""
+        _, last_day = daily_frames
+        csv_path = tmp_path / "ads.csv"
+        early, late = last_day.iloc[:-10], last_day.iloc[-10:]
+        early.to_csv(csv_path, index=False)
+
+        tracker = IncrementalSummary(str(csv_path))
+        tracker.update()
+        late.to_csv(csv_path, mode="a", header=False, index=False)
+
+        assert tracker.summary() == summary_engine.summarize(pd.read_csv(csv_path))
+        assert tracker.last_update == {"mode": "incremental", "rows_folded": 10}
+
+    def test_partial_last_line_triggers_rebuild(self, tmp_path, daily_frames):
+        """Test that a load that ended mid-row is not resumed inside that row"""
+        history, last_day = daily_frames
+        csv_path = tmp_path / "ads.csv"
+        text = history.to_csv(index=False)
+        cut = len(text) - 20  # a writer was still appending the last row
+        csv_path.write_text(text[:cut])
+
+        tracker = IncrementalSummary(str(csv_path))
+        tracker.update()
+        with open(csv_path, "a") as f:
+            f.write(text[cut:] + last_day.to_csv(index=False, header=False))
+
+        assert tracker.summary() == summary_engine.summarize(pd.read_csv(csv_path))
+        assert tracker.last_update["mode"] == "rebuild"
+
+    def test_rewritten_file_triggers_rebuild(self, tmp_path, daily_frames):
+        """Test that changing already folded rows rebuilds the state"""
+        history, _ = daily_frames
+        csv_path = tmp_path / "ads.csv"
+        history.to_csv(csv_path, index=False)
+        tracker = IncrementalSummary(str(csv_path))
+        tracker.update()
+
+        changed = history.copy()
+        changed.loc[changed.index[-1], "spend"] = 99999.0
+        changed.to_csv(csv_path, index=False)
+
+        assert tracker.summary() == summary_engine.summarize(changed.reset_index(drop=True))
+        assert tracker.last_update["mode"] == "rebuild"
+
+    def test_summary_only_plan_skips_frame_and_cube(self, tmp_path, daily_frames, monkeypatch):
+        """Test that an incremental load for a plan without frame columns never parses the full history"""
+        from src.agents.data_agent import DataAgent
+
+        history, last_day = daily_frames
+        csv_path = tmp_path / "ads.csv"
+        history.to_csv(csv_path, index=False)
+        agent = DataAgent(model=None, incremental=True, cube_dir=str(tmp_path / "cube"))
+        assert "dataframe" in agent.load_dataset(str(csv_path))
+
+        last_day.to_csv(csv_path, mode="a", header=False, index=False)
+        monkeypatch.setattr(agent, "load", lambda *args, **kwargs: pytest.fail("full history reloaded"))
+        dataset = agent.load_dataset(str(csv_path), columns=[])
+
+        assert set(dataset) == {"data_summary"}
+        assert dataset["data_summary"] == summary_engine.summarize(pd.read_csv(csv_path))
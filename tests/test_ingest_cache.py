@@ -0,0 +1,95 @@
+import pytest
+import pandas as pd
+import sys
+import os
+import time
+
+# Add src to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.ingest_cache import IngestCache
+
+
+CSV_PATH = "data/synthetic_fb_ads_undergarments.csv"
+
+
+class TestIngestCache:
+    """Test suite for the binary CSV ingest cache"""
+
+    def test_cached_load_matches_read_csv(self, tmp_path):
+        """Test that a cold and a warm load both reproduce pd.read_csv exactly"""
+        cache = IngestCache(str(tmp_path / "cache"))
+        expected = pd.read_csv(CSV_PATH)
+
+        cold = cache.load(CSV_PATH)
+        warm = cache.load(CSV_PATH)
+
+        pd.testing.assert_frame_equal(cold, expected)
+        pd.testing.assert_frame_equal(warm, expected)
+
+    def test_warm_load_skips_parsing(self, tmp_path, monkeypatch):
+        """Test that a warm load never calls the CSV parser"""
+        cache = IngestCache(str(tmp_path / "cache"))
+        cache.load(CSV_PATH)
+
+        def fail_read_csv(*args, **kwargs):
+            raise AssertionError("read_csv should not run on a warm cache")
+
+        monkeypatch.setattr(pd, "read_csv", fail_read_csv)
+        df = cache.load(CSV_PATH)
+        assert len(df) > 0, "Warm load should return the cached rows"
+
+    def test_rebuilds_when_source_changes(self, tmp_path):
+        """Test that editing the CSV invalidates the cache entry"""
+        csv_path = tmp_path / "ads.csv"
+        pd.DataFrame({"campaign_name": ["A", "B"], "spend": [1.0, 2.0]}).to_csv(csv_path, index=False)
+        cache = IngestCache(str(tmp_path / "cache"))
+        assert cache.load(str(csv_path))["spend"].sum() == 3.0
+
+        pd.DataFrame({"campaign_name": ["A", "B", None], "spend": [1.0, 2.0, 4.0]}).to_csv(csv_path, index=False)
+        df = cache.load(str(csv_path))
+
+        assert df["spend"].sum() == 7.0, "Cache should be rebuilt after the source changes"
+        assert df["campaign_name"].isna().sum() == 1, "Missing text values should round-trip as NaN"
+
+    def test_touch_without_edit_reuses_entry(self, tmp_path, monkeypatch):
+        """Test that a new mtime with identical bytes is detected via the content hash"""
+        csv_path = tmp_path / "ads.csv"
+        pd.DataFrame({"campaign_name": ["A"], "spend": [1.0]}).to_csv(csv_path, index=False)
+        cache = IngestCache(str(tmp_path / "cache"))
+        cache.load(str(csv_path))
+
+        later = time.time() + 60
+        os.utime(csv_path, (later, later))
+        monkeypatch.setattr(pd, "read_csv", lambda *a, **k: pytest.fail("unchanged content should not be re-parsed"))
+
+        assert cache.load(str(csv_path))["spend"].iloc[0] == 1.0
+
+    def test_source_replaced_mid_build_is_not_mislabelled(self, tmp_path, monkeypatch):
+        """Test that the rows returned by a build are the bytes it hashed, and a later load rebuilds"""
+        csv_path = tmp_path / "ads.csv"
+        replacement = tmp_path / "new.csv"
+        pd.DataFrame({"campaign_name": ["A", "B"], "spend": [1.0, 2.0]}).to_csv(csv_path, index=False)
+        pd.DataFrame({"campaign_name": ["C"], "spend": [8.0]}).to_csv(replacement, index=False)
+        read_csv = pd.read_csv
+
+        def replace_then_parse(*args, **kwargs):
+            os.replace(replacement, csv_path)
+            return read_csv(*args, **kwargs)
+
+        cache = IngestCache(str(tmp_path / "cache"))
+        monkeypatch.setattr(pd, "read_csv", replace_then_parse)
+        first = cache.load(str(csv_path))
+        monkeypatch.setattr(pd, "read_csv", read_csv)
+
+        assert first["spend"].sum() == 3.0, "The build should parse the file it opened and hashed"
+        assert cache.load(str(csv_path))["spend"].sum() == 8.0, "The replaced file should trigger a rebuild"
+
+    def test_loaded_frame_is_writable(self, tmp_path):
+        """Test that cached columns come back as writable arrays owned by the frame"""
+        cache = IngestCache(str(tmp_path / "cache"))
+        cache.load(CSV_PATH)
+        df = cache.load(CSV_PATH)
+
+        df.loc[0, "spend"] = -1.0
+        assert df["spend"].iloc[0] == -1.0
@@ -0,0 +1,138 @@
+import pytest
+import json
+import sys
+import os
+import time
+
+# Add src to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.data_agent import DataAgent
+from src.agents.insight_agent import InsightAgent
+from src.llm.cache import ResponseCache
+from src.llm.client import LLMClient, LLMTimeoutError
+from src.llm.fake_model import FakeModel
+from src.llm.json_stream import ObjectArrayParser
+
+
+CSV_PATH = "data/synthetic_fb_ads_undergarments.csv"
+
+
+class ResourceExhausted(Exception):
+    """Same class name as google.api_core's 429 error"""
+
+
+class Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class ChunkedModel:
+    """Streams scripted chunks; ``fail_after`` raises once that many chunks were sent"""
+
+    def __init__(self, chunks, errors=(), fail_after=None, pause=0.0):
+        self.chunks = chunks
+        self.errors = list(errors)
+        self.fail_after = fail_after
+        self.pause = pause
+        self.calls = 0
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return self._chunks()
+
+    def _chunks(self):
+        for n, text in enumerate(self.chunks):
+            if n == self.fail_after:
+                raise ResourceExhausted("429")
+            time.sleep(self.pause)
+            yield Chunk(text)
+
+
+class TestObjectArrayParser:
+    """Test suite for the incremental JSON array parser"""
+
+    def test_objects_complete_as_chunks_arrive(self):
+        """Test that each object is returned by the chunk that closes it, whatever the chunking"""
+        text = 'Here [2] you go:\n```json\n[{"a": "x]}\\"{", "b": [1, {"c": 2}]},\n {"d": 1}]\n```'
+        for size in (1, 5, len(text)):
+            parser = ObjectArrayParser()
+            items = []
+            for i in range(0, len(text), size):
+                items.extend(parser.feed(text[i:i + size]))
+            assert items == [{"a": 'x]}"{', "b": [1, {"c": 2}]}, {"d": 1}]
+            assert parser.done
+
+        parser = ObjectArrayParser()
+        assert parser.feed('[{"a": 1}, {"b"') == [{"a": 1}]
+        assert not parser.done
+
+    def test_non_object_items_are_rejected(self):
+        """Test that scalars and nested arrays are errors, not items, even across chunks"""
+        for text in ('[{"a": 1}, 2]', '[{"a": 1}, [{"b": 2}]]', '[{"a": 1}} ]'):
+            parser = ObjectArrayParser()
+            with pytest.raises(ValueError):
+                parser.feed(text)
+
+        parser = ObjectArrayParser()
+        assert parser.feed('[{"a": 1}, ') == [{"a": 1}]
+        with pytest.raises(ValueError, match="offset 11"):
+            parser.feed('"x"]')
+
+
+class TestStreaming:
+    """Test suite for streamed LLM responses"""
+
+    def test_chunks_are_delivered_and_cached_once_complete(self, tmp_path):
+        """Test that chunks reach the callback in order and only full responses are cached"""
+        cache = ResponseCache(str(tmp_path / "responses.sqlite"))
+        client = LLMClient(ChunkedModel(["ab", "cd", "ef"]), cache=cache)
+        received = []
+
+        assert client.stream("p", received.append) == "abcdef"
+        assert received == ["ab", "cd", "ef"]
+
+        received.clear()
+        assert client.stream("p", received.append) == "abcdef"
+        assert received == ["abcdef"] and client.model.calls == 1
+
+    def test_retries_only_before_the_first_chunk(self, tmp_path):
+        """Test that errors are retried before any text arrives and propagate after"""
+        model = ChunkedModel(["ab", "cd"], errors=[ResourceExhausted("429")])
+        assert LLMClient(model, backoff_base=0.001).stream("p", lambda c: None) == "abcd"
+        assert model.calls == 2
+
+        cache = ResponseCache(str(tmp_path / "responses.sqlite"))
+        model = ChunkedModel(["ab", "cd"], fail_after=1)
+        received = []
+        with pytest.raises(ResourceExhausted):
+            LLMClient(model, backoff_base=0.001, cache=cache).stream("p", received.append)
+        assert received == ["ab"] and model.calls == 1
+        assert cache.get(LLMClient(model, cache=cache)._cache_key("p")) is None
+
+    def test_timeout_applies_per_chunk(self):
+        """Test that a long response of quick chunks is fine but a stalled chunk times out"""
+        assert LLMClient(ChunkedModel(["a"] * 10, pause=0.02), timeout=0.15).stream("p", lambda c: None) == "a" * 10
+        with pytest.raises(LLMTimeoutError):
+            LLMClient(ChunkedModel(["a"], pause=0.5), timeout=0.05, max_retries=0).stream("p", lambda c: None)
+
+    def test_first_insight_arrives_before_the_response_ends(self):
+        """Test that hypotheses are handed over while later ones are still generating"""
+        summary = DataAgent(model=None).load_and_summarize(CSV_PATH)[1]
+        model = FakeModel(latency={"distribution": "constant", "mean_s": 0.4}, chunk_chars=32, first_chunk_share=0.1)
+        arrivals = []
+        start = time.perf_counter()
+        insights = InsightAgent(model=model).generate_insights(summary, on_insight=lambda item: arrivals.append(time.perf_counter() - start))
+        total = time.perf_counter() - start
+
+        assert len(arrivals) == len(insights) == 3
+        assert arrivals[0] < total * 0.6
+
+    def test_truncated_response_keeps_complete_items(self):
+        """Test that a response cut mid-array keeps its complete objects and skips the fallback"""
+        text = "```json\n" + json.dumps([{"hypothesis": "CTR is below 2%", "category": "ctr_issue"}]) + "\n"
+        cut = text[:-2] + ', {"hypothesis": "ROAS has dec'
+        agent = InsightAgent(model=ChunkedModel([cut[:20], cut[20:]]))
+        assert agent.generate_insights({"avg_metrics": {"ctr": 0.01}}) == [{"hypothesis": "CTR is below 2%", "category": "ctr_issue"}]
@@ -0,0 +1,77 @@
+import pytest
+import sys
+import os
+import time
+
+# Add src to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.llm.cache import ResponseCache, cache_key
+from src.llm.client import LLMClient
+
+
+class CountingModel:
+    """Model that counts provider calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, prompt, **kwargs):
+        self.calls += 1
+        return type("Response", (), {"text": f"answer to {prompt}"})()
+
+
+class TestResponseCache:
+    """Test suite for the persistent LLM response cache"""
+
+    def test_key_covers_model_params_and_prompt(self):
+        """Test that any change to model, params or prompt changes the key"""
+        base = cache_key("gemini", {"temperature": 0.7}, "prompt")
+        assert base == cache_key("gemini", {"temperature": 0.7}, "prompt")
+        assert base != cache_key("gemini-pro", {"temperature": 0.7}, "prompt")
+        assert base != cache_key("gemini", {"temperature": 0.2}, "prompt")
+        assert base != cache_key("gemini", {"temperature": 0.7}, "prompt!")
+
+    def test_entries_persist_across_instances(self, tmp_path):
+        """Test that a second cache on the same file (another process) sees entries"""
+        path = str(tmp_path / "responses.sqlite")
+        ResponseCache(path).put("k", "v")
+
+        other = ResponseCache(path)
+        assert other.get("k") == "v"
+        assert other.get("missing") is None
+        assert (other.hits, other.misses) == (1, 1)
+
+    def test_least_recently_used_entries_are_evicted(self, tmp_path):
+        """Test that the size cap evicts the entry read least recently"""
+        cache = ResponseCache(str(tmp_path / "responses.sqlite"), max_bytes=25)
+        cache.put("a", "x" * 10)
+        time.sleep(0.01)
+        cache.put("b", "x" * 10)
+        time.sleep(0.01)
+        cache.get("a")
+        time.sleep(0.01)
+        cache.put("c", "x" * 10)
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None, "Least recently used entry should be evicted"
+        assert cache.get("c") is not None
+
+    def test_expired_entries_are_misses(self, tmp_path):
+        """Test that entries older than max_age are not served"""
+        cache = ResponseCache(str(tmp_path / "responses.sqlite"), max_age_s=0.05)
+        cache.put("k", "v")
+        time.sleep(0.1)
+        assert cache.get("k") is None
+
+    def test_client_serves_repeats_from_cache(self, tmp_path):
+        """Test that identical prompts hit the provider only once"""
+        model = CountingModel()
+        client = LLMClient(model, model_name="gemini", cache=ResponseCache(str(tmp_path / "responses.sqlite")))
+
+        assert client.generate("q") == client.generate("q") == "answer to q"
+        assert model.calls == 1
+
+        client.invalidate("q")
+        client.generate("q")
+        assert model.calls == 2
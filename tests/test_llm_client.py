@@ -0,0 +1,152 @@
+import pytest
+import sys
+import os
+import threading
+import time
+
+# Add src to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.llm.client import LLMClient, LLMDeadlineExceeded, LLMTimeoutError
+
+
+class ResourceExhausted(Exception):
+    """Same class name as google.api_core's 429 error"""
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class ScriptedModel:
+    """Model that raises the scripted errors first, then echoes the prompt"""
+
+    def __init__(self, errors=(), delay=0.0):
+        self.errors = list(errors)
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, **kwargs):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self._delay_for(prompt))
+            if self.errors:
+                raise self.errors.pop(0)
+            return FakeResponse(f"echo: {prompt}")
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _delay_for(self, prompt):
+        return self.delay
+
+
+class HangingModel(ScriptedModel):
+    """Model that takes ``hang`` seconds for prompts starting with "hung" and answers others at once"""
+
+    def __init__(self, hang):
+        super().__init__()
+        self.hang = hang
+
+    def _delay_for(self, prompt):
+        return self.hang if prompt.startswith("hung") else 0.0
+
+
+class TestLLMClient:
+    """Test suite for the shared LLM client"""
+
+    def test_transient_errors_are_retried(self):
+        """Test that rate-limit errors are retried until the call succeeds"""
+        model = ScriptedModel(errors=[ResourceExhausted("429"), ResourceExhausted("429")])
+        client = LLMClient(model, backoff_base=0.001)
+
+        assert client.generate("hi") == "echo: hi"
+        assert model.calls == 3
+
+    def test_permanent_errors_are_not_retried(self):
+        """Test that non-transient errors surface immediately"""
+        model = ScriptedModel(errors=[ValueError("bad request")])
+        client = LLMClient(model, backoff_base=0.001)
+
+        with pytest.raises(ValueError):
+            client.generate("hi")
+        assert model.calls == 1
+
+    def test_timeout_is_enforced(self):
+        """Test that a slow call raises once retries are exhausted"""
+        client = LLMClient(ScriptedModel(delay=0.5), timeout=0.05, max_retries=0)
+
+        with pytest.raises(LLMTimeoutError):
+            client.generate("hi")
+
+    def test_concurrency_is_bounded(self):
+        """Test that generate_many overlaps calls without exceeding the limit"""
+        model = ScriptedModel(delay=0.05)
+        client = LLMClient(model, max_concurrency=3)
+
+        results = client.generate_many([f"p{i}" for i in range(9)])
+
+        assert results == [f"echo: p{i}" for i in range(9)]
+        assert model.max_in_flight == 3
+
+    def test_abandoned_calls_keep_their_slots(self):
+        """Test that callers giving up at their deadline don't let more requests into flight"""
+        model = ScriptedModel(delay=0.3)
+        client = LLMClient(model, max_concurrency=2)
+
+        outcomes = []
+
+        def call(i):
+            try:
+                client.generate(f"p{i}", deadline=0.1)
+            except LLMDeadlineExceeded:
+                outcomes.append("deadline")
+
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        time.sleep(0.4)
+
+        assert outcomes == ["deadline"] * 8
+        assert model.max_in_flight == 2 and model.calls == 2
+
+    def test_hung_calls_hold_one_slot_each(self):
+        """Test that retries of a hung prompt wait for it instead of taking more slots"""
+        model = HangingModel(hang=0.6)
+        client = LLMClient(model, max_concurrency=2, timeout=0.05, max_retries=3, backoff_base=0.001)
+        answers = []
+        threads = [threading.Thread(target=lambda i=i: answers.append(client.generate(f"hung {i}"))) for i in range(3)]
+        for thread in threads:
+            thread.start()
+
+        time.sleep(0.2)
+        assert model.in_flight == 2
+        for thread in threads:
+            thread.join(timeout=5)
+        # Each hung prompt was sent once and its late answer used
+        assert sorted(answers) == ["echo: hung 0", "echo: hung 1", "echo: hung 2"]
+        assert model.calls == 3 and model.max_in_flight == 2
+
+        start = time.perf_counter()
+        thread = threading.Thread(target=lambda: client.generate("hung 3"))
+        thread.start()
+        time.sleep(0.2)
+        assert client.generate("ok", deadline=0.2) == "echo: ok"
+        assert time.perf_counter() - start < 0.5
+        thread.join(timeout=5)
+
+    def test_wrap_passes_clients_through(self):
+        """Test that agents can be given either a raw model or a client"""
+        client = LLMClient(ScriptedModel())
+        assert LLMClient.wrap(None) is None
+        assert LLMClient.wrap(client) is client
+        assert isinstance(LLMClient.wrap(ScriptedModel()), LLMClient)
@@ -0,0 +1,182 @@
+import pytest
+import json
+import subprocess
+import sys
+import os
+import time
+
+# Add src to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.insight_agent import InsightAgent
+from src.agents.planner import PlannerAgent
+from src.llm.cache import ResponseCache
+from src.llm.client import LLMClient, LLMDeadlineExceeded
+
+
+CSV_PATH = "data/synthetic_fb_ads_undergarments.csv"
+
+
+class Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class SlowModel:
+    """Answers call n after ``delays[n]`` seconds (the last delay repeats), streamed in ``chunks`` pieces"""
+
+    def __init__(self, text, delays, chunks=1):
+        self.text = text
+        self.delays = list(delays)
+        self.chunks = chunks
+        self.calls = 0
+        self.streaming = 0
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        delay = self.delays[min(self.calls, len(self.delays) - 1)]
+        self.calls += 1
+        if stream:
+            return self._stream(delay)
+        time.sleep(delay)
+        return Chunk(self.text)
+
+    def _stream(self, delay):
+        size = -(-len(self.text) // self.chunks)
+        self.streaming += 1
+        try:
+            for i in range(0, len(self.text), size):
+                time.sleep(delay / self.chunks)
+                yield Chunk(self.text[i:i + size])
+        finally:
+            self.streaming -= 1
+
+
+def wait_for(condition, timeout=2.0):
+    end = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < end:
+        time.sleep(0.01)
+    return condition()
+
+
+class TestDeadlines:
+    """Test suite for per-call latency budgets"""
+
+    def test_deadline_raises_and_caches_the_late_answer(self, tmp_path):
+        """Test that a slow call gives up at its deadline and its answer is cached when it lands"""
+        cache = ResponseCache(str(tmp_path / "responses.sqlite"))
+        client = LLMClient(SlowModel("late", [0.3]), cache=cache)
+
+        start = time.perf_counter()
+        with pytest.raises(LLMDeadlineExceeded):
+            client.generate("p", deadline=0.05)
+        assert time.perf_counter() - start < 0.2
+
+        assert wait_for(lambda: client.path_stats()["late_cached"] == 1)
+        assert client.generate("p", deadline=0.05) == "late"
+        assert client.path_stats() == {"cache": 1, "primary": 0, "hedge": 0, "deadline": 1, "failed": 0, "late_cached": 1}
+
+    def test_stream_deadline_keeps_draining(self, tmp_path):
+        """Test that a stream cut at its deadline is finished in the background and cached whole"""
+        cache = ResponseCache(str(tmp_path / "responses.sqlite"))
+        client = LLMClient(SlowModel("abcdef", [0.3], chunks=3), cache=cache)
+        received = []
+
+        with pytest.raises(LLMDeadlineExceeded):
+            client.stream("p", received.append, deadline=0.15)
+        assert received == ["ab"]
+
+        assert wait_for(lambda: client.path_stats()["late_cached"] == 1)
+        assert cache.get(client._cache_key("p")) == "abcdef"
+
+    def test_abandoned_stream_keeps_its_slot(self, tmp_path):
+        """Test that a stream finishing after its deadline still counts against the concurrency limit"""
+        cache = ResponseCache(str(tmp_path / "responses.sqlite"))
+        client = LLMClient(SlowModel("abcdef", [0.3], chunks=3), max_concurrency=1, cache=cache)
+
+        with pytest.raises(LLMDeadlineExceeded):
+            client.stream("p", lambda chunk: None, deadline=0.05)
+        with pytest.raises(LLMDeadlineExceeded, match="slot"):
+            client.generate("q", deadline=0.05)
+        assert client.model.calls == 1
+        assert wait_for(lambda: client.path_stats()["late_cached"] == 1)
+
+    def test_abandoned_calls_do_not_delay_exit(self):
+        """Test that the process exits at once after a deadline, without waiting for the slow call"""
+        script = (
+            "import time\n"
+            "from src.llm.client import LLMClient, LLMDeadlineExceeded\n"
+            "class Model:\n"
+            "    def generate_content(self, prompt, **kwargs):\n"
+            "        time.sleep(5)\n"
+            "try:\n"
+            "    LLMClient(Model()).generate('p', deadline=0.1)\n"
+            "except LLMDeadlineExceeded:\n"
+            "    print('fell back')\n"
+        )
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", script], cwd=root, capture_output=True, text=True, timeout=30)
+
+        assert result.stdout.strip() == "fell back"
+        assert time.perf_counter() - start < 3
+
+    def test_planner_falls_back_within_budget(self):
+        """Test that the planner returns its rule-based plan once the budget is spent"""
+        plan = json.dumps({"user_query": "q", "subtasks": [{"agent": "data_agent", "task": "load"}]})
+        agent = PlannerAgent(model=SlowModel(f"```json\n{plan}\n```", [0.5]), deadline=0.05)
+
+        start = time.perf_counter()
+        assert agent.create_plan("Why is CTR low?") == agent._fallback_plan("Why is CTR low?")
+        assert time.perf_counter() - start < 0.3
+
+    def test_insights_keep_complete_items_at_the_deadline(self):
+        """Test that hypotheses streamed before the deadline are kept instead of the fallback"""
+        items = [{"hypothesis": "CTR is below 2%", "category": "ctr_issue"}, {"hypothesis": "ROAS fell over the last seven days across most campaigns", "category": "roas_decline"}]
+        text = json.dumps(items)
+        model = SlowModel(text, [0.6], chunks=2)
+        agent = InsightAgent(model=model, deadline=0.45)
+
+        assert agent.generate_insights({"avg_metrics": {"ctr": 0.01}}) == items[:1]
+
+
+class TestHedging:
+    """Test suite for hedged duplicate requests"""
+
+    def test_hedge_wins_over_a_slow_primary(self):
+        """Test that a duplicate request answers first when the original is stuck in the tail"""
+        client = LLMClient(SlowModel("ok", [0.5, 0.01]), hedge_after=0.05)
+
+        start = time.perf_counter()
+        assert client.generate("p") == "ok"
+        assert time.perf_counter() - start < 0.3
+        assert client.path_stats()["hedge"] == 1 and client.model.calls == 2
+
+        client = LLMClient(SlowModel("ok", [0.01]), hedge_after=0.05)
+        client.generate("p")
+        assert client.path_stats()["primary"] == 1 and client.model.calls == 1
+
+    def test_stream_hedge_wins_on_first_chunk(self):
+        """Test that streaming follows whichever request produces the first chunk"""
+        client = LLMClient(SlowModel("abcd", [1.0, 0.02], chunks=2), hedge_after=0.05)
+        received = []
+
+        assert client.stream("p", received.append) == "abcd"
+        assert received == ["ab", "cd"]
+        assert client.path_stats()["hedge"] == 1
+
+    def test_losing_stream_stops_early(self):
+        """Test that the slower stream stops reading once the other request has won"""
+        model = SlowModel("abcdefghij", [1.0, 0.1], chunks=10)
+        client = LLMClient(model, hedge_after=0.05)
+
+        start = time.perf_counter()
+        assert client.stream("p", lambda chunk: None) == "abcdefghij"
+        assert wait_for(lambda: model.streaming == 0, timeout=0.3)
+        assert time.perf_counter() - start < 0.6
+
+    def test_no_hedge_without_a_free_slot(self):
+        """Test that hedges only use spare concurrency"""
+        client = LLMClient(SlowModel("ok", [0.15, 0.01]), max_concurrency=1, hedge_after=0.02)
+
+        assert client.generate("p") == "ok"
+        assert client.model.calls == 1 and client.path_stats()["primary"] == 1
@@ -0,0 +1,58 @@
+import pytest
+import json
+import sys
+import os
+import subprocess
+
+# Add src to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+class TestOrchestratorStartup:
+    """Test suite for lazy imports and lazy agent construction"""
+
+    def test_construction_loads_no_heavy_modules(self):
+        """Test that building the Orchestrator without an API key skips pandas and the SDK"""
+        probe = (
+            "import json, sys\n"
+            "from src.orchestrator.orchestrator import Orchestrator\n"
+            "o = Orchestrator()\n"
+            "print(json.dumps({'modules': [m for m in ('pandas', 'google.generativeai') if m in sys.modules],"
+            " 'agents': sorted(o._agents)}))\n"
+        )
+        env = {k: v for k, v in os.environ.items() if k not in ("GOOGLE_API_KEY", "GEMINI_API_KEY")}
+        out = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, env=env,
+                             capture_output=True, text=True, check=True).stdout
+
+        result = json.loads(out.strip().splitlines()[-1])
+        assert result == {"modules": [], "agents": []}
+
+    def test_agents_are_built_once_on_first_access(self):
+        """Test that agent properties construct lazily and memoize"""
+        from src.orchestrator.orchestrator import Orchestrator
+
+        orchestrator = Orchestrator()
+        assert "evaluator" not in orchestrator._agents
+        assert orchestrator.evaluator is orchestrator.evaluator
+        assert list(orchestrator._agents) == ["evaluator"]
+
+
+class TestChunkedMode:
+    """Test suite for summary-only chunked runs"""
+
+    def test_evaluator_is_dropped_with_a_logged_reason(self):
+        """Test that chunked mode drops validation up front instead of skipping it silently"""
+        from src.orchestrator.orchestrator import Orchestrator
+
+        orchestrator = Orchestrator()
+        orchestrator.config["data"]["chunksize"] = 1000
+        results = orchestrator.run("Analyze ROAS drop", save=False)
+
+        dropped = [log["data"] for log in orchestrator.logs if log["event"] == "subtask_dropped"]
+        assert dropped and dropped[0]["agent"] == "evaluator_agent"
+        assert "chunksize" in dropped[0]["reason"]
+        timings = next(log["data"]["tasks"] for log in orchestrator.logs if log["event"] == "task_timings")
+        assert len(timings) == 3
+        assert 'insights' in results and 'validated_insights' not in results
@@ -0,0 +1,63 @@
+import pytest
+import json
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.data_agent import DataAgent
+from src.llm.prompt_encoder import (
+    PromptEncoder, INSIGHT_PRIORITY, CREATIVE_PRIORITY, INSIGHT_FIELDS, CREATIVE_FIELDS, estimate_tokens, render_template
+)
+
+
+@pytest.fixture(scope="module")
+def summary():
+    _, summary = DataAgent(model=None).load_and_summarize("data/synthetic_fb_ads_undergarments.csv")
+    return summary
+
+
+class TestPromptEncoder:
+    """Test suite for compact summary serialization"""
+
+    def test_compact_encoding_is_smaller_and_parseable(self, summary):
+        """Test that every encoded section is valid minified JSON and tokens drop"""
+        text, stats = PromptEncoder(INSIGHT_PRIORITY, measure_baseline=True).encode(summary)
+
+        assert stats["encoded_tokens"] < stats["baseline_tokens"]
+        assert "baseline_tokens" not in PromptEncoder(INSIGHT_PRIORITY).encode(summary)[1]
+        assert stats["encoded_tokens"] == estimate_tokens(text)
+        for line in text.splitlines():
+            name, payload = line.split(": ", 1)
+            json.loads(payload)
+
+        platforms = json.loads(text.splitlines()[3].split(": ", 1)[1])
+        assert platforms["cols"] == ["key", "roas", "ctr", "spend"], "Nested dicts should become tables"
+
+    def test_budget_drops_lowest_priority_sections_first(self, summary):
+        """Test that trimming follows the agent's priority order"""
+        text, stats = PromptEncoder(CREATIVE_PRIORITY, token_budget=250).encode(summary)
+
+        assert estimate_tokens(text) <= 250
+        assert stats["dropped_sections"][0] == CREATIVE_PRIORITY[-1]
+        assert text.startswith("overview:")
+        assert "low_ctr_campaigns:" in text, "Creative prompts keep low-CTR rows longest"
+
+    def test_prompts_compute_only_their_declared_fields(self):
+        """Test that encoding a lazy summary for a prompt leaves undeclared fields uncomputed"""
+        from src.agents.creative_generator import CreativeGenerator
+        from src.llm.fake_model import FakeModel
+
+        agent = DataAgent(model=None)
+        summary = agent.summarize(agent.load("data/synthetic_fb_ads_undergarments.csv"))
+        CreativeGenerator(model=FakeModel()).generate(summary)
+
+        assert set(summary.computed) == set(CREATIVE_FIELDS)
+        text, _ = PromptEncoder(INSIGHT_PRIORITY).encode(summary, fields=INSIGHT_FIELDS)
+        assert "low_ctr_campaigns" not in text and "roas_trend_7d:" in text
+
+    def test_render_template_keeps_literal_braces(self):
+        """Test that JSON examples in prompt files survive rendering"""
+        template = 'Data: {data_summary}\nFormat: [{"hypothesis": "..."}]'
+        assert render_template(template, data_summary="x") == 'Data: x\nFormat: [{"hypothesis": "..."}]'
@@ -0,0 +1,137 @@
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.data_agent import DataAgent
+from src.agents.evaluator_agent import EvaluatorAgent
+from src.agents.insight_agent import InsightAgent
+from src.utils import summary_engine
+from src.utils.metric_cache import MetricCache
+from src.utils.rollup_cube import CubeStore, RollupCube
+
+CSV_PATH = "data/synthetic_fb_ads_undergarments.csv"
+
+
+@pytest.fixture(scope="module")
+def df():
+    return pd.read_csv(CSV_PATH)
+
+
+class TestRollupCube:
+    """Test suite for the pre-aggregated rollup cube"""
+
+    def test_rollups_match_raw_groupbys(self, df):
+        """Test that any level and filter matches a groupby over the raw rows"""
+        cube = RollupCube.build(df)
+        result = cube.query(by=["platform", "country"], where={"date": ["2025-03-30", "2025-03-31"]})
+        rows = df[df["date"].isin(["2025-03-30", "2025-03-31"])]
+        expected = rows.groupby(["platform", "country"])[["spend", "revenue", "clicks", "impressions"]].sum()
+
+        assert np.allclose(result["spend_sum"], expected["spend"])
+        assert np.allclose(result["roas"], expected["revenue"] / expected["spend"])
+        assert np.allclose(result["ctr"], expected["clicks"] / expected["impressions"])
+        assert np.allclose(result["avg_roas"], rows.groupby(["platform", "country"])["roas"].mean())
+
+        # A coarser query rolls up from the cached finer cuboid, not the base
+        totals = cube.query(by=["platform"], where={"date": ["2025-03-30", "2025-03-31"]})
+        assert np.allclose(totals["spend_sum"], rows.groupby("platform")["spend"].sum())
+
+    def test_summary_and_metrics_from_cube(self, df):
+        """Test that DataAgent summaries and evaluator metrics are unchanged by the cube"""
+        cube = RollupCube.build(df)
+        assert summary_engine.summarize(df, cube=cube) == summary_engine.summarize(df)
+
+        raw, cached = MetricCache(df), MetricCache(df, cube=cube)
+        assert np.allclose(raw.get("roas_by_date"), cached.get("roas_by_date"))
+        assert np.isclose(raw.get("spend_roas_corr"), cached.get("spend_roas_corr"))
+        assert np.allclose(raw.get("roas_trend_by", ("platform",), 7), cached.get("roas_trend_by", ("platform",), 7))
+        assert np.isclose(raw.get("ctr_below_pct", 0.02), cached.get("ctr_below_pct", 0.02))
+
+    def test_persisted_once_per_dataset_version(self, tmp_path, df):
+        """Test that a cube is built once per version and replaced when the data changes"""
+        store = CubeStore(str(tmp_path / "cube"))
+        builds = []
+
+        def build(rows):
+            builds.append(rows)
+            return RollupCube.build(df.head(rows))
+
+        first = store.get(CSV_PATH, "version-a", lambda: build(500))
+        again = store.get(CSV_PATH, "version-a", lambda: build(500))
+        assert builds == [500], "Same version should load the persisted cube"
+        assert again.base.equals(first.base)
+
+        changed = store.get(CSV_PATH, "version-b", lambda: build(800))
+        assert builds == [500, 800]
+        assert changed.query()["rows"] == 800
+        (entry_dir,) = os.listdir(tmp_path / "cube")
+        assert len(os.listdir(tmp_path / "cube" / entry_dir)) == 1, "Older versions should be removed"
+
+    def test_variants_of_one_version_are_kept(self, tmp_path, df):
+        """Test that thresholds/variants of the current version survive each other's builds"""
+        store = CubeStore(str(tmp_path / "cube"))
+        builds = []
+
+        def build():
+            builds.append(1)
+            return RollupCube.build(df.head(200))
+
+        for _ in range(2):
+            store.get(CSV_PATH, "version-a", build, low_ctr_threshold=0.02)
+            store.get(CSV_PATH, "version-a", build, low_ctr_threshold=0.03)
+            store.get(CSV_PATH, "version-a", build, variant="canonical")
+        assert len(builds) == 3
+
+        (entry_dir,) = os.listdir(tmp_path / "cube")
+        with open(tmp_path / "cube" / entry_dir / "version-a-0.02.pkl", "wb") as f:
+            f.write(b"cmoved_module\nOldCube\n.")  # stale pickle of a class that moved: a miss
+        store.get(CSV_PATH, "version-a", build)
+        assert len(builds) == 4
+
+    def test_data_agent_summary_uses_cube(self, tmp_path, df):
+        """Test that DataAgent builds the cube and its summary matches the frame path"""
+        csv_path = tmp_path / "ads.csv"
+        df.to_csv(csv_path, index=False)
+        dataset = DataAgent(model=None, cube_dir=str(tmp_path / "cube")).load_dataset(str(csv_path))
+
+        assert dataset["cube"] is not None
+        assert dataset["data_summary"] == DataAgent(model=None).summarize(dataset["dataframe"])
+
+    def test_insight_fallback_drills_down(self, df):
+        """Test that the fallback names the platform/country with the steepest ROAS drop"""
+        cube = RollupCube.build(df)
+        summary = summary_engine.summarize(df)
+        insights = InsightAgent(model=None).generate_insights(summary, cube=cube)
+
+        drilldown = [i for i in insights if "concentrated" in i["hypothesis"]]
+        assert len(drilldown) == 1
+        assert drilldown[0]["category"] == "roas_concentration"
+        segment = drilldown[0]["segment"]
+        assert drilldown[0]["hypothesis"].endswith(f"on {segment['platform']} in {segment['country']}")
+
+    def test_drilldown_is_validated_against_its_segment(self, df):
+        """Test that the evaluator checks the named platform/country, not the account-wide trend"""
+        cube = RollupCube.build(df)
+        summary = summary_engine.summarize(df)
+        insights = InsightAgent(model=None).generate_insights(summary, cube=cube)
+        drilldown = next(i for i in insights if i["category"] == "roas_concentration")
+        decline = next(i for i in insights if i["category"] == "roas_decline")
+        evaluator = EvaluatorAgent(model=None, n_resamples=2000)
+        cache = MetricCache(df, cube=cube)
+
+        result = evaluator._validate_hypothesis(cache, drilldown)
+        account = evaluator._validate_hypothesis(cache, decline)
+        assert result["method"] == "segment_comparison"
+        assert f"{drilldown['segment']['platform']} / {drilldown['segment']['country']} ROAS dropped" in result["evidence"]
+        assert result["evidence"] != account["evidence"]
+
+        # A segment that did not decline is rejected, whatever the account-wide trend
+        trend = cache.get("roas_trend_by", ("platform", "country"), 7)
+        grew = trend[trend["last"] >= trend["first"]].index[0]
+        claim = {"hypothesis": f"ROAS decline is concentrated on {grew[0]} in {grew[1]}", "category": "roas_concentration"}
+        assert evaluator._validate_hypothesis(cache, claim)["confidence"] <= 0.2
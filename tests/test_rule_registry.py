@@ -0,0 +1,54 @@
+import pytest
+import pandas as pd
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.evaluator_agent import EvaluatorAgent
+from src.utils.metric_cache import MetricCache
+from src.utils.rule_registry import Rule, RuleRegistry
+
+
+def constant(confidence):
+    return lambda cache, insight: {"confidence": confidence, "evidence": "", "metrics": [], "method": "custom"}
+
+
+class TestRuleRegistry:
+    """Test suite for the compiled hypothesis-rule registry"""
+
+    def test_overlapping_keywords_are_all_found(self):
+        """Test that one scan reports keywords nested in longer ones"""
+        registry = RuleRegistry([
+            Rule("a", [["below"]], constant(1)),
+            Rule("b", [["low"], ["ctr"]], constant(1))
+        ])
+        assert registry.keywords_in("CTR is BELOW target") == {"below", "low", "ctr"}
+        assert registry.match("ctr below target").name == "a", "Earlier rules take priority"
+        assert registry.match("ctr is low").name == "b"
+        assert registry.match("nothing relevant") is None
+
+    def test_category_fast_path(self):
+        """Test that an InsightAgent category selects a rule without keywords"""
+        registry = EvaluatorAgent(model=None).rules
+        assert registry.match("Audience is saturating", category="ctr_issue").name == "low_ctr"
+        assert registry.match("ROAS dropped sharply", category="creative_fatigue").name == "roas_decline"
+
+    def test_custom_rule_plugs_into_evaluator(self):
+        """Test registering a validator and prefetching its declared metrics"""
+        df = pd.DataFrame({
+            'date': ['2024-01-01', '2024-01-02'],
+            'roas': [2.0, 1.0],
+            'ctr': [0.03, 0.03],
+            'spend': [100, 120]
+        })
+        evaluator = EvaluatorAgent(model=None)
+        evaluator.rules.register(Rule("fatigue", [["fatigue"]], constant(0.9), categories=["creative_fatigue"], metrics=[("ctr_mean",)]))
+
+        cache = MetricCache(df)
+        validated = evaluator.evaluate(df, [{"hypothesis": "Creative fatigue is setting in", "confidence": 0.2}], metrics=cache)
+
+        assert validated[0]["validation_method"] == "custom"
+        assert validated[0]["confidence"] == 0.9
+        assert ("ctr_mean",) in cache.computed, "Declared metrics should be prefetched"
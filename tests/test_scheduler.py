@@ -0,0 +1,73 @@
+import pytest
+import sys
+import os
+import threading
+import time
+
+# Add src to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.orchestrator.scheduler import DAGScheduler
+from src.utils.plan import PlanValidationError, drop_agents, validate_plan
+from src.agents.planner import PlannerAgent
+
+
+def task(task_id, deps, agent="noop"):
+    return {"task_id": task_id, "task": f"task {task_id}", "agent": agent, "dependencies": deps}
+
+
+class TestDAGScheduler:
+    """Test suite for dependency-aware subtask execution"""
+
+    def test_independent_tasks_overlap(self):
+        """Test that tasks sharing only a parent run concurrently"""
+        subtasks = [task(1, []), task(2, [1]), task(3, [1])]
+        barrier = threading.Barrier(2, timeout=2)
+
+        def execute(subtask):
+            if subtask["task_id"] in (2, 3):
+                barrier.wait()  # deadlocks (and times out) if 2 and 3 run one after another
+
+        timings = DAGScheduler(max_workers=4).run(subtasks, execute)
+        assert all(t["status"] == "completed" for t in timings.values())
+
+    def test_dependencies_finish_before_dependents_start(self):
+        """Test that recorded timings respect the dependency order"""
+        subtasks = PlannerAgent(model=None)._fallback_plan("Analyze ROAS")["subtasks"]
+        timings = DAGScheduler(max_workers=4).run(subtasks, lambda subtask: time.sleep(0.01))
+
+        for subtask in subtasks:
+            for dep in subtask["dependencies"]:
+                assert timings[dep]["end"] <= timings[subtask["task_id"]]["start"]
+
+    def test_cycle_is_rejected(self):
+        """Test that cyclic plans raise before any task runs"""
+        with pytest.raises(PlanValidationError, match="cycle"):
+            validate_plan([task(1, [3]), task(2, [1]), task(3, [2])])
+
+    def test_missing_dependency_is_rejected(self):
+        """Test that dependencies on unknown task ids are reported"""
+        with pytest.raises(PlanValidationError, match="unknown"):
+            validate_plan([task(1, []), task(2, [7])])
+
+    def test_dropped_tasks_pass_on_their_dependencies(self):
+        """Test that tasks waiting on a dropped agent wait on its dependencies instead"""
+        subtasks = [task(1, []), task(2, [1], agent="evaluator_agent"), {"task_id": 3, "task": "task 3", "agent": "noop"}]
+        kept = drop_agents(subtasks, {"evaluator_agent"})
+
+        assert [s["task_id"] for s in kept] == [1, 3]
+        assert kept[1]["dependencies"] == [1]
+        assert validate_plan(kept) == [1, 3]
+
+    def test_failure_stops_dependents(self):
+        """Test that a failing task re-raises and its dependents never start"""
+        started = []
+
+        def execute(subtask):
+            started.append(subtask["task_id"])
+            if subtask["task_id"] == 1:
+                raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError, match="boom"):
+            DAGScheduler().run([task(1, []), task(2, [1])], execute)
+        assert started == [1]
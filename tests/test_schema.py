@@ -0,0 +1,55 @@
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.data_agent import DataAgent
+from src.utils import schema, summary_engine
+
+
+CSV_PATH = "data/synthetic_fb_ads_undergarments.csv"
+
+
+class TestSchema:
+    """Test suite for the memory-lean load schema"""
+
+    def test_explicit_dtypes(self):
+        """Test that text becomes categorical and counts/rates are 32-bit"""
+        df = schema.read_csv(CSV_PATH)
+
+        assert all(isinstance(df[c].dtype, pd.CategoricalDtype) for c in schema.CATEGORY_COLUMNS)
+        assert df["roas"].dtype == np.float32 and df["ctr"].dtype == np.float32
+        assert df["impressions"].dtype == np.int32 and df["purchases"].dtype == np.int32
+        assert df["spend"].dtype == np.float64
+        assert schema.memory_report(CSV_PATH)["reduction"] > 0.5
+
+    def test_summary_unchanged(self):
+        """Test that the lean layout produces the same summary as the default one"""
+        expected = summary_engine.summarize(pd.read_csv(CSV_PATH))
+
+        assert summary_engine.summarize(schema.read_csv(CSV_PATH)) == expected
+        assert DataAgent(model=None).load_and_summarize(CSV_PATH)[1] == expected
+
+    def test_ingest_cache_matches_csv(self, tmp_path):
+        """Test that the cached and CSV loads produce identical lean frames"""
+        cached = DataAgent(model=None, cache_dir=str(tmp_path / "cache")).load(CSV_PATH)
+        pd.testing.assert_frame_equal(cached, schema.read_csv(CSV_PATH))
+
+    def test_plan_column_projection(self, tmp_path):
+        """Test that only the summary's columns plus what the plan needs are loaded"""
+        agent = DataAgent(model=None)
+        df = agent.load_dataset(CSV_PATH, columns=["country"])["dataframe"]
+        assert set(df.columns) == set(summary_engine.SUMMARY_COLUMNS) | {"country"}
+
+        with_cube = DataAgent(model=None, cube_dir=str(tmp_path / "cube"))
+        assert with_cube.load_dataset(CSV_PATH, columns=[])["cube"].has("country", "adset_name")
+
+    def test_widen_keeps_written_values(self):
+        """Test that float32 values widen to the decimals written in the CSV"""
+        widened = schema.widen(pd.Series([0.0183, 2.37], dtype="float32"))
+        assert widened.dtype == np.float64
+        assert widened.tolist() == [0.0183, 2.37]
@@ -0,0 +1,96 @@
+import pytest
+import json
+import sys
+import os
+import shutil
+import threading
+import time
+import urllib.request
+import urllib.error
+
+# Add src to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.orchestrator.orchestrator import Orchestrator
+from src.orchestrator.server import AnalysisServer, LatencyStats
+
+
+@pytest.fixture
+def server(tmp_path):
+    csv_path = tmp_path / "ads.csv"
+    shutil.copy("data/synthetic_fb_ads_undergarments.csv", csv_path)
+    orchestrator = Orchestrator()
+    orchestrator.config["data"]["csv_path"] = str(csv_path)
+    orchestrator.config["data"]["cache_dir"] = None
+    orchestrator.config["data"]["cube_dir"] = str(tmp_path / "cube")
+
+    server = AnalysisServer(orchestrator, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+
+
+def request(server, path, body=None):
+    host, port = server.address
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(f"http://{host}:{port}{path}", data=data, method="POST" if data else "GET")
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+class TestAnalysisServer:
+    """Test suite for the resident analysis server"""
+
+    def test_query_uses_warm_data_and_reports_latency(self, server):
+        """Test that queries are answered without reloading and stats are tracked"""
+        for _ in range(3):
+            status, body = request(server, "/query", {"query": "Why did ROAS drop?"})
+            assert status == 200
+            assert "validated_insights" in body and "creatives" in body
+
+        status, stats = request(server, "/stats")
+        assert stats["data_reloads"] == 1
+        assert stats["endpoints"]["POST /query"]["count"] == 3
+        assert stats["endpoints"]["POST /query"]["p99_ms"] >= stats["endpoints"]["POST /query"]["p50_ms"]
+
+    def test_source_change_triggers_reload(self, server):
+        """Test that editing the CSV reloads the dataset on the next request"""
+        _, before = request(server, "/summary")
+        csv_path = server.data.csv_path
+        with open(csv_path) as f:
+            lines = f.readlines()
+        with open(csv_path, "w") as f:
+            f.writelines(lines[:1000])
+
+        _, after = request(server, "/summary")
+        assert server.data.reloads == 2
+        assert after["total_spend"] < before["total_spend"]
+
+    def test_bad_requests_are_rejected(self, server):
+        """Test 400 for a missing query and 404 for unknown routes"""
+        assert request(server, "/query", {})[0] == 400
+        assert request(server, "/query", [1])[0] == 400
+        assert request(server, "/nope")[0] == 404
+
+    def test_internal_value_errors_are_server_errors(self, server, monkeypatch):
+        """Test that a ValueError raised while running a query is a 500, not the client's fault"""
+        def fail(*args, **kwargs):
+            raise ValueError("could not convert string to float")
+        monkeypatch.setattr(server.orchestrator, "run", fail)
+        status, body = request(server, "/query", {"query": "Why did ROAS drop?"})
+        assert status == 500 and "float" in body["error"]
+
+
+class TestLatencyStats:
+    """Test suite for latency percentile tracking"""
+
+    def test_percentiles(self):
+        stats = LatencyStats()
+        for ms in range(1, 101):
+            stats.record("GET /x", ms / 1000)
+        snapshot = stats.snapshot()["GET /x"]
+        assert snapshot["p50_ms"] == 50 and snapshot["p99_ms"] == 99 and snapshot["count"] == 100
@@ -0,0 +1,81 @@
+import pytest
+import pandas as pd
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils import summary_engine
+from src.agents.data_agent import DataAgent
+
+
+CSV_PATH = "data/synthetic_fb_ads_undergarments.csv"
+
+
+@pytest.fixture(scope="module")
+def df():
+    return pd.read_csv(CSV_PATH)
+
+
+class TestSummaryEngine:
+    """Test suite for the single-pass summary engine"""
+
+    def test_matches_direct_pandas_computation(self, df):
+        """Test that derived means and rankings equal plain pandas groupbys"""
+        summary = summary_engine.summarize(df)
+
+        platform = df.groupby("platform").agg({"roas": "mean", "ctr": "mean", "spend": "sum"}).round(4)
+        assert summary["platform_performance"] == platform.to_dict(orient="index")
+        assert summary["roas_trend_7d"] == df.groupby("date")["roas"].mean().tail(7).round(4).to_dict()
+        assert summary["total_campaigns"] == df["campaign_name"].nunique()
+        assert summary["avg_metrics"]["roas"] == round(df["roas"].mean(), 4)
+
+        top = df.groupby("campaign_name")["roas"].mean().nlargest(5).round(4)
+        assert [c["campaign_name"] for c in summary["top_5_campaigns"]] == list(top.index)
+
+        low = df[df["ctr"] < 0.02].nsmallest(5, "ctr")[["campaign_name", "ctr", "creative_message"]]
+        assert summary["low_ctr_campaigns"] == low.to_dict(orient="records")
+
+    def test_merged_chunks_equal_whole_frame(self, df):
+        """Test that partial aggregates merged across chunks give the same summary"""
+        chunks = (df.iloc[start:start + 1000] for start in range(0, len(df), 1000))
+        state = summary_engine.aggregate_chunks(chunks)
+
+        assert summary_engine.finalize_summary(state) == summary_engine.summarize(df)
+
+    def test_streaming_summary_matches_in_memory(self):
+        """Test that chunked CSV summarization equals the in-memory path"""
+        agent = DataAgent(model=None)
+        _, expected = agent.load_and_summarize(CSV_PATH)
+
+        assert agent.stream_summarize(CSV_PATH, chunksize=333) == expected
+
+    def test_fields_computed_on_first_access(self, df):
+        """Test that reading one field only computes the aggregate parts it needs"""
+        parts = []
+
+        def compute_part(part):
+            parts.append(part)
+            return summary_engine.aggregate_part(df, part)
+
+        summary = summary_engine.LazySummary(compute_part)
+        assert summary["low_ctr_campaigns"] == summary_engine.summarize(df)["low_ctr_campaigns"]
+        assert parts == ["low_ctr_rows"]
+
+        summary.prefetch(["total_spend", "overall_roas", "not_a_field"])
+        assert parts == ["low_ctr_rows", "totals"]
+        assert summary.computed == ["total_spend", "overall_roas", "low_ctr_campaigns"]
+
+        assert dict(summary) == dict(summary_engine.summarize(df))
+        assert sorted(parts) == sorted(summary_engine.STATE_PARTS), "Each part should be computed once"
+
+    def test_plan_declares_summary_fields(self):
+        """Test that fallback plans declare the fields their agents read"""
+        from src.agents.planner import PlannerAgent
+        planner = PlannerAgent(model=None)
+
+        plan = planner._fallback_plan("Analyze ROAS")
+        assert set(plan["summary_fields"]) <= set(summary_engine.SUMMARY_FIELDS)
+        assert "low_ctr_campaigns" in plan["summary_fields"]
+        assert planner.summary_fields([{"agent": "data_agent"}, {"agent": "creative_generator"}]) == ["total_campaigns", "low_ctr_campaigns"]
@@ -0,0 +1,62 @@
+import pytest
+import pandas as pd
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.data_agent import DataAgent
+from src.utils import schema, synthetic_data
+from src.utils.campaign_names import CampaignNames
+
+
+CSV_PATH = "data/synthetic_fb_ads_undergarments.csv"
+
+
+class TestSyntheticData:
+    """Test suite for the synthetic export generator"""
+
+    def test_schema_matches_bundled_export(self, tmp_path):
+        """Test that generated files have the bundled CSV's columns and load with the explicit schema"""
+        path = synthetic_data.write_csv(str(tmp_path / "ads.csv"), 5000)
+        df = schema.read_csv(path)
+
+        assert list(df.columns) == list(pd.read_csv(CSV_PATH, nrows=0).columns)
+        assert len(df) == 5000
+        assert df["impressions"].notna().all() and df["purchases"].notna().all()
+        assert df["roas"].isna().any()  # blank cells like real exports
+
+    def test_seeded(self):
+        """Test that the same seed reproduces the frame and another seed does not"""
+        pd.testing.assert_frame_equal(synthetic_data.generate(2000, seed=1), synthetic_data.generate(2000, seed=1))
+        assert not synthetic_data.generate(2000, seed=1).equals(synthetic_data.generate(2000, seed=2))
+
+    def test_dimensions_are_configurable(self):
+        """Test the campaign, day, platform and country options"""
+        df = synthetic_data.generate(3000, campaigns=40, days=30, platforms=3, countries=["US", "DE"], name_noise=0)
+
+        assert df["campaign_name"].nunique() == 40
+        assert df["date"].nunique() == 30
+        assert set(df["platform"]) == {"Facebook", "Instagram", "Messenger"}
+        assert set(df["country"]) == {"US", "DE"}
+
+    def test_chunks_stay_in_date_order(self, tmp_path):
+        """Test that chunked writes keep rows chronological with every day present"""
+        path = synthetic_data.write_csv(str(tmp_path / "ads.csv"), 9000, chunk_rows=1000, days=45)
+        dates = pd.read_csv(path, usecols=["date"])["date"]
+
+        assert len(dates) == 9000
+        assert dates.is_monotonic_increasing
+        assert dates.nunique() == 45
+
+    def test_name_noise_canonicalizes_back(self, tmp_path):
+        """Test that noisy spellings collapse to one canonical name per campaign"""
+        df = synthetic_data.generate(4000, campaigns=12)
+
+        assert df["campaign_name"].nunique() > 12
+        assert CampaignNames().canonicalize(df["campaign_name"]).nunique() == 12
+
+        path = synthetic_data.write_csv(str(tmp_path / "ads.csv"), 4000, campaigns=12)
+        _, summary = DataAgent(model=None, names_path=str(tmp_path / "names.json")).load_and_summarize(path)
+        assert summary["total_campaigns"] == 12
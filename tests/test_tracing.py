@@ -0,0 +1,144 @@
+import pytest
+import sys
+import os
+import cProfile
+import threading
+
+# Add src to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.data_agent import DataAgent
+from src.llm.client import LLMClient
+from src.orchestrator import orchestrator as orchestrator_module
+from src.orchestrator.orchestrator import Orchestrator
+from src.orchestrator.scheduler import DAGScheduler
+from src.utils.tracing import Tracer, annotate, span
+
+
+CSV_PATH = "data/synthetic_fb_ads_undergarments.csv"
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class EchoModel:
+    def generate_content(self, prompt, **kwargs):
+        return FakeResponse(f"echo: {prompt}")
+
+
+class TestTracing:
+    """Test suite for run tracing"""
+
+    def test_nested_spans_record_time_and_parent(self):
+        """Test that spans nest and carry wall/CPU time and attributes"""
+        tracer = Tracer()
+        with tracer.activate():
+            with span("outer", "task"):
+                with span("inner", "io", rows=3) as inner:
+                    inner.set(columns=2)
+                    annotate(cache_hit=True)
+
+        spans = {s["name"]: s for s in tracer.spans}
+        assert spans["inner"]["parent"] == "outer"
+        assert spans["outer"]["parent"] is None
+        assert spans["inner"]["rows"] == 3 and spans["inner"]["columns"] == 2
+        assert spans["inner"]["cache_hit"] is True and "cache_hit" not in spans["outer"]
+        assert spans["outer"]["wall_s"] >= spans["inner"]["wall_s"] >= 0
+        assert "cpu_s" in spans["inner"]
+
+    def test_no_tracer_is_a_no_op(self):
+        """Test that span and annotate do nothing outside an active tracer"""
+        with span("untraced") as current:
+            current.set(rows=1)
+            annotate(cache_hit=False)
+
+    def test_errors_are_recorded(self):
+        """Test that a span closed by an exception is kept with the error type"""
+        tracer = Tracer()
+        with tracer.activate():
+            with pytest.raises(ValueError):
+                with span("failing"):
+                    raise ValueError("boom")
+        assert tracer.spans[0]["error"] == "ValueError"
+
+    def test_memory_peak(self):
+        """Test that tracemalloc peaks are reported when memory tracing is on"""
+        tracer = Tracer(memory=True)
+        with tracer.activate():
+            with span("alloc"):
+                block = bytearray(4 * 2**20)
+        del block
+        assert tracer.spans[0]["traced_peak_mb"] >= 4
+
+    def test_chrome_trace_format(self, tmp_path):
+        """Test that the export is complete ('X') trace events in microseconds"""
+        tracer = Tracer()
+        with tracer.activate():
+            with span("load_csv", "io", rows=10):
+                pass
+        path = str(tmp_path / "trace.json")
+        tracer.save_chrome_trace(path)
+
+        event = tracer.chrome_trace()["traceEvents"][0]
+        assert event["ph"] == "X" and event["cat"] == "io"
+        assert event["ts"] >= 0 and event["dur"] >= 0
+        assert event["args"]["rows"] == 10
+        assert os.path.getsize(path) > 0
+
+    def test_scheduler_threads_report_into_tracer(self):
+        """Test that subtasks run on worker threads still nest under the caller's span"""
+        tracer = Tracer()
+        subtasks = [{"task_id": i, "task": "t", "agent": "noop", "dependencies": []} for i in (1, 2)]
+
+        def execute(subtask):
+            with span(f"task_{subtask['task_id']}", "task"):
+                pass
+
+        with tracer.activate():
+            with span("run"):
+                DAGScheduler(max_workers=2).run(subtasks, execute)
+
+        spans = {s["name"]: s for s in tracer.spans}
+        assert spans["task_1"]["parent"] == spans["task_2"]["parent"] == "run"
+        assert spans["run"]["thread"] == threading.get_ident()
+
+    def test_llm_and_load_spans(self):
+        """Test that LLM calls record sizes and cache hits and the CSV load records its shape"""
+        tracer = Tracer()
+        client = LLMClient(EchoModel())
+        with tracer.activate():
+            client.generate("hello")
+            DataAgent(model=None).load(CSV_PATH)
+
+        spans = {s["name"]: s for s in tracer.spans}
+        assert spans["llm.generate"]["prompt_chars"] == 5
+        assert spans["llm.generate"]["response_chars"] == len("echo: hello")
+        assert spans["load_csv"]["rows"] > 0 and spans["load_csv"]["cat"] == "io"
+
+    def test_profiled_runs_take_turns(self, monkeypatch):
+        """Test that concurrent profiled runs never have two profilers enabled at once"""
+        active, peak = [], []
+
+        class TrackingProfile(cProfile.Profile):
+            def enable(self, *args, **kwargs):
+                active.append(self)
+                peak.append(len(active))
+                super().enable(*args, **kwargs)
+
+            def disable(self):
+                super().disable()
+                if self in active:  # pstats disables again when reading the profile
+                    active.remove(self)
+
+        monkeypatch.setattr(orchestrator_module.cProfile, "Profile", TrackingProfile)
+        orchestrator = Orchestrator(profile=True)
+        shared = orchestrator.load_data()
+        threads = [threading.Thread(target=orchestrator.run, args=("Analyze ROAS",), kwargs={"shared": shared, "save": False}) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert peak and max(peak) == 1